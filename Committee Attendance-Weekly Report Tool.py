@@ -1,524 +1,754 @@
-import sys
-import os
-import csv
-import json
-from datetime import datetime
-from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QPushButton, QMessageBox, QFileDialog, QComboBox, QScrollArea, QTextEdit,
-    QDateEdit, QGridLayout, QSizePolicy, QSpacerItem, QTabWidget
-)
-from PyQt6.QtGui import QFont, QPixmap, QColor
-from PyQt6.QtCore import Qt, QDate
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import (
-    Table, TableStyle, SimpleDocTemplate, Paragraph, Spacer, Image as RLImage, PageBreak
-)
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.utils import ImageReader
-
-class AttendanceApp(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Tech Fee Committee Attendance/Weekly Report Generator")
-        self.setMinimumSize(1200, 800)
-        self.attendance_options = ["Attending", "Absent"]
-        self.attending_as_options = ["In-Person", "Virtual"]
-        self.entries = []
-
-        # Load preloaded names and positions
-        self.load_preloaded_members()
-
-        self.init_ui()
-
-    def load_preloaded_members(self):
-        self.preloaded_members = []
-        if os.path.exists('members.json'):
-            with open('members.json', 'r') as f:
-                self.preloaded_members = json.load(f)
-        else:
-            # If the file doesn't exist, create an empty list
-            self.preloaded_members = []
-
-    def save_preloaded_members(self):
-        with open('members.json', 'w') as f:
-            json.dump(self.preloaded_members, f, indent=4)
-
-    def init_ui(self):
-        main_layout = QVBoxLayout()
-        self.setLayout(main_layout)
-
-        # Header without Image
-        header_layout = QHBoxLayout()
-        main_layout.addLayout(header_layout)
-
-        title_label = QLabel("Tech Fee Committee Attendance/Weekly Report Generator")
-        title_font = QFont("Arial", 20, QFont.Weight.Bold)
-        title_label.setFont(title_font)
-        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        header_layout.addWidget(title_label)
-
-        # Tab Widget
-        self.tabs = QTabWidget()
-        main_layout.addWidget(self.tabs)
-
-        # Attendance Tab
-        self.attendance_tab = QWidget()
-        self.tabs.addTab(self.attendance_tab, "Attendance")
-        self.init_attendance_tab()
-
-        # Weekly Report Tab
-        self.report_tab = QWidget()
-        self.tabs.addTab(self.report_tab, "Weekly Report")
-        self.init_report_tab()
-
-    def init_attendance_tab(self):
-        layout = QVBoxLayout()
-        self.attendance_tab.setLayout(layout)
-
-        # Date Input
-        date_layout = QHBoxLayout()
-        layout.addLayout(date_layout)
-
-        date_label = QLabel("Date:")
-        date_label.setFont(QFont("Arial", 12))
-        date_layout.addWidget(date_label)
-
-        self.date_edit_attendance = QDateEdit()
-        self.date_edit_attendance.setCalendarPopup(True)
-        self.date_edit_attendance.setDate(QDate.currentDate())
-        self.date_edit_attendance.setDisplayFormat("MM/dd/yyyy")
-        date_layout.addWidget(self.date_edit_attendance)
-
-        # Spacer
-        date_layout.addStretch()
-
-        # Scroll Area for Form
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        layout.addWidget(scroll)
-
-        form_widget = QWidget()
-        scroll.setWidget(form_widget)
-        form_layout = QVBoxLayout()
-        form_widget.setLayout(form_layout)
-
-        # Grid for Attendance Records
-        grid_layout = QGridLayout()
-        form_layout.addLayout(grid_layout)
-
-        # Headers
-        headers = ["Member Name", "Position", "Virtual/In-Person", "Attendance"]
-        for col, header in enumerate(headers):
-            label = QLabel(header)
-            label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            label.setStyleSheet("background-color: red; color: white; padding: 5px;")
-            grid_layout.addWidget(label, 0, col)
-
-        # Add member rows
-        for i, member in enumerate(self.preloaded_members, start=1):
-            self.add_member_row(grid_layout, i, member['name'], member['position'])
-        # If there are less than 20 members, fill the rest
-        for i in range(len(self.preloaded_members)+1, 21):
-            self.add_member_row(grid_layout, i)
-
-        # Buttons Layout
-        button_layout = QHBoxLayout()
-        form_layout.addLayout(button_layout)
-
-        save_button = QPushButton("Save Attendance")
-        save_button.setStyleSheet("background-color: #007BFF; color: white; padding: 10px;")
-        save_button.clicked.connect(self.save_data_attendance)
-        button_layout.addWidget(save_button)
-
-        export_csv_button = QPushButton("Export to CSV")
-        export_csv_button.setStyleSheet("background-color: #28A745; color: white; padding: 10px;")
-        export_csv_button.clicked.connect(self.export_to_csv)
-        button_layout.addWidget(export_csv_button)
-
-        export_attendance_pdf_button = QPushButton("Export Attendance to PDF")
-        export_attendance_pdf_button.setStyleSheet("background-color: #17A2B8; color: white; padding: 10px;")
-        export_attendance_pdf_button.clicked.connect(self.export_to_pdf)
-        button_layout.addWidget(export_attendance_pdf_button)
-
-        # Spacer
-        button_layout.addStretch()
-
-        # Add and Delete Member Buttons
-        manage_layout = QHBoxLayout()
-        form_layout.addLayout(manage_layout)
-
-        add_member_button = QPushButton("Add Member")
-        add_member_button.setStyleSheet("background-color: #17A2B8; color: white; padding: 10px;")
-        add_member_button.clicked.connect(self.add_member)
-        manage_layout.addWidget(add_member_button)
-
-        delete_member_button = QPushButton("Delete Member")
-        delete_member_button.setStyleSheet("background-color: #DC3545; color: white; padding: 10px;")
-        delete_member_button.clicked.connect(self.delete_member)
-        manage_layout.addWidget(delete_member_button)
-
-    def init_report_tab(self):
-        layout = QVBoxLayout()
-        self.report_tab.setLayout(layout)
-
-        # Date Input
-        date_layout = QHBoxLayout()
-        layout.addLayout(date_layout)
-
-        date_label = QLabel("Date:")
-        date_label.setFont(QFont("Arial", 12))
-        date_layout.addWidget(date_label)
-
-        self.date_edit_report = QDateEdit()
-        self.date_edit_report.setCalendarPopup(True)
-        self.date_edit_report.setDate(QDate.currentDate())
-        self.date_edit_report.setDisplayFormat("MM/dd/yyyy")
-        date_layout.addWidget(self.date_edit_report)
-
-        # Spacer
-        date_layout.addStretch()
-
-        # Weekly Report Input
-        report_layout = QVBoxLayout()
-        layout.addLayout(report_layout)
-
-        report_label = QLabel("Weekly Report:")
-        report_label.setFont(QFont("Arial", 12))
-        report_layout.addWidget(report_label)
-
-        self.report_text = QTextEdit()
-        self.report_text.setFixedHeight(400)  # Increased height for better input
-        report_layout.addWidget(self.report_text)
-
-        # Export Button
-        export_layout = QHBoxLayout()
-        layout.addLayout(export_layout)
-
-        export_report_pdf_button = QPushButton("Export Report to PDF")
-        export_report_pdf_button.setStyleSheet("background-color: #FFC107; color: white; padding: 10px;")
-        export_report_pdf_button.clicked.connect(self.export_weekly_report_pdf)
-        export_layout.addWidget(export_report_pdf_button)
-
-        # Spacer
-        export_layout.addStretch()
-
-    def add_member_row(self, layout, row_number, name='', position=''):
-        row_entries = []
-        name_entry = QLineEdit()
-        name_entry.setPlaceholderText("Enter name")
-        name_entry.setText(name)
-        layout.addWidget(name_entry, row_number, 0)
-        row_entries.append(name_entry)
-
-        position_entry = QLineEdit()
-        position_entry.setPlaceholderText("Enter position")
-        position_entry.setText(position)
-        layout.addWidget(position_entry, row_number, 1)
-        row_entries.append(position_entry)
-
-        attending_as_combo = QComboBox()
-        attending_as_combo.addItems(self.attending_as_options)
-        attending_as_combo.setCurrentIndex(0)
-        layout.addWidget(attending_as_combo, row_number, 2)
-        row_entries.append(attending_as_combo)
-
-        attendance_combo = QComboBox()
-        attendance_combo.addItems(self.attendance_options)
-        attendance_combo.setCurrentIndex(0)
-        layout.addWidget(attendance_combo, row_number, 3)
-        row_entries.append(attendance_combo)
-
-        self.entries.append(row_entries)
-
-    def save_data_attendance(self):
-        self.saved_data = []
-        new_preloaded_members = []
-        for row in self.entries:
-            name = row[0].text().strip()
-            position = row[1].text().strip()
-            attending_as = row[2].currentText()
-            attendance = row[3].currentText()
-            if name or position:
-                if not name:
-                    QMessageBox.warning(self, "Incomplete Data", "Member name cannot be empty.")
-                    return
-                self.saved_data.append([name, position, attending_as, attendance])
-                new_preloaded_members.append({'name': name, 'position': position})
-        # Save preloaded members
-        self.preloaded_members = new_preloaded_members
-        self.save_preloaded_members()
-        QMessageBox.information(self, "Data Saved", "Attendance data saved successfully!")
-
-    def export_to_csv(self):
-        try:
-            default_filename = f"Tech_Fee_Committee_Attendance_{datetime.now().strftime('%m-%d-%Y')}.csv"
-            file_path, _ = QFileDialog.getSaveFileName(self, "Save CSV", default_filename, "CSV Files (*.csv)")
-
-            if file_path:
-                with open(file_path, mode='w', newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    writer.writerow([f"Tech Fee Committee Attendance Record ({self.date_edit_attendance.date().toString('MM/dd/yyyy')})"])
-                    writer.writerow(["Member Name", "Position", "Virtual/In-Person", "Attendance"])
-
-                    for row in self.entries:
-                        member_name = row[0].text()
-                        position = row[1].text()
-                        virtual_in_person = row[2].currentText()
-                        attendance = row[3].currentText()
-                        writer.writerow([member_name, position, virtual_in_person, attendance])
-
-                QMessageBox.information(self, "CSV Exported", f"Attendance data exported to {file_path}")
-            else:
-                QMessageBox.warning(self, "No File Selected", "Please choose a file path.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error exporting data: {e}")
-
-    def export_to_pdf(self):
-        try:
-            default_filename = f"Tech_Fee_Committee_Attendance_{datetime.now().strftime('%m-%d-%Y')}.pdf"
-            file_path, _ = QFileDialog.getSaveFileName(self, "Save PDF", default_filename, "PDF Files (*.pdf)")
-
-            if file_path:
-                # Create a PDF document with margins
-                doc = SimpleDocTemplate(file_path, pagesize=letter,
-                                        rightMargin=72, leftMargin=72,
-                                        topMargin=72, bottomMargin=72)
-                elements = []
-
-                # Styles
-                styles = getSampleStyleSheet()
-                title_style = ParagraphStyle(
-                    'TitleStyle',
-                    parent=styles['Title'],
-                    fontName='Helvetica-Bold',
-                    fontSize=24,
-                    textColor=colors.red,
-                    alignment=1,  # Center
-                    spaceAfter=12
-                )
-                subtitle_style = ParagraphStyle(
-                    'SubtitleStyle',
-                    parent=styles['Normal'],
-                    fontName='Helvetica',
-                    fontSize=14,
-                    textColor=colors.black,
-                    alignment=1,  # Center
-                    spaceAfter=24
-                )
-                normal_style = ParagraphStyle(
-                    'NormalCentered',
-                    parent=styles['Normal'],
-                    alignment=1,  # Center
-                    spaceAfter=12
-                )
-
-                # Title
-                title = Paragraph("Tech Fee Committee Attendance Record", title_style)
-                elements.append(title)
-
-                # Date as Subtitle
-                date_paragraph = Paragraph(f"Date: {self.date_edit_attendance.date().toString('MM/dd/yyyy')}", subtitle_style)
-                elements.append(date_paragraph)
-
-                # Table Data
-                data = [["Member Name", "Position", "Virtual/In-Person", "Attendance"]]
-                for row in self.entries:
-                    member_name = row[0].text()
-                    position = row[1].text()
-                    virtual_in_person = row[2].currentText()
-                    attendance = row[3].currentText()
-                    data.append([member_name, position, virtual_in_person, attendance])
-
-                # Table Style with Red Headers and Alternating Row Colors
-                table = Table(data, colWidths=[2 * inch, 2 * inch, 1.5 * inch, 1.5 * inch])
-                table_style = TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.red),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ])
-
-                # Add alternating row colors
-                for i in range(1, len(data)):
-                    if i % 2 == 0:
-                        bg_color = colors.lightgrey
-                    else:
-                        bg_color = colors.whitesmoke
-                    table_style.add('BACKGROUND', (0, i), (-1, i), bg_color)
-
-                table.setStyle(table_style)
-
-                # Center the table
-                table.hAlign = 'CENTER'
-
-                elements.append(table)
-                elements.append(Spacer(1, 0.2 * inch))
-
-                # Build PDF with full-page watermark
-                doc.build(elements, onFirstPage=self.add_watermark, onLaterPages=self.add_watermark)
-
-                QMessageBox.information(self, "PDF Exported", f"Attendance data exported to {file_path}")
-            else:
-                QMessageBox.warning(self, "No File Selected", "Please choose a file path.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error exporting data: {e}")
-
-    def export_weekly_report_pdf(self):
-        try:
-            default_filename = f"Tech_Fee_Committee_Weekly_Report_{datetime.now().strftime('%m-%d-%Y')}.pdf"
-            file_path, _ = QFileDialog.getSaveFileName(self, "Save Weekly Report PDF", default_filename, "PDF Files (*.pdf)")
-
-            if file_path:
-                # Create a PDF document with margins
-                doc = SimpleDocTemplate(file_path, pagesize=letter,
-                                        rightMargin=72, leftMargin=72,
-                                        topMargin=72, bottomMargin=72)
-                elements = []
-
-                # Styles
-                styles = getSampleStyleSheet()
-                title_style = ParagraphStyle(
-                    'TitleStyle',
-                    parent=styles['Title'],
-                    fontName='Helvetica-Bold',
-                    fontSize=24,
-                    textColor=colors.red,
-                    alignment=1,  # Center
-                    spaceAfter=12
-                )
-                subtitle_style = ParagraphStyle(
-                    'SubtitleStyle',
-                    parent=styles['Normal'],
-                    fontName='Helvetica',
-                    fontSize=14,
-                    textColor=colors.black,
-                    alignment=1,  # Center
-                    spaceAfter=24
-                )
-                body_style = ParagraphStyle(
-                    'BodyStyle',
-                    parent=styles['Normal'],
-                    fontName='Helvetica',
-                    fontSize=12,
-                    textColor=colors.black,
-                    leading=15,
-                    alignment=0,  # Left align
-                    spaceAfter=12
-                )
-
-                # Title
-                title = Paragraph("Tech Fee Committee Weekly Report", title_style)
-                elements.append(title)
-
-                # Date as Subtitle
-                date_paragraph = Paragraph(f"Date: {self.date_edit_report.date().toString('MM/dd/yyyy')}", subtitle_style)
-                elements.append(date_paragraph)
-
-                # Weekly Report Content
-                report_content = self.report_text.toPlainText().strip()
-                if report_content:
-                    # Split the report into paragraphs based on double newlines
-                    paragraphs = report_content.split('\n\n')
-                    for para in paragraphs:
-                        # Replace single newlines with <br/> to preserve line breaks
-                        formatted_para = para.replace('\n', '<br/>')
-                        p = Paragraph(formatted_para, body_style)
-                        elements.append(p)
-                        elements.append(Spacer(1, 0.1 * inch))
-                else:
-                    p = Paragraph("No weekly report content provided.", body_style)
-                    elements.append(p)
-                    elements.append(Spacer(1, 0.1 * inch))
-
-                # Build PDF with full-page watermark
-                doc.build(elements, onFirstPage=self.add_watermark, onLaterPages=self.add_watermark)
-
-                QMessageBox.information(self, "PDF Exported", f"Weekly report exported to {file_path}")
-            else:
-                QMessageBox.warning(self, "No File Selected", "Please choose a file path.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error exporting weekly report: {e}")
-
-    def add_watermark(self, canvas_obj, doc):
-        """Adds a full-page watermark using the sga.jpg image."""
-        canvas_obj.saveState()
-        watermark_path = r"C:\scsuimage\sga.jpg"  # Ensure this path is correct or make it configurable
-        if os.path.exists(watermark_path):
-            try:
-                # Read the image
-                watermark = ImageReader(watermark_path)
-                # Get the dimensions of the page
-                page_width, page_height = letter
-                # Calculate scale to cover the entire page
-                img_width, img_height = watermark.getSize()
-                scale_x = page_width / img_width
-                scale_y = page_height / img_height
-                scale = max(scale_x, scale_y)
-                # Calculate position to center the image
-                x = (page_width - img_width * scale) / 2
-                y = (page_height - img_height * scale) / 2
-                # Set transparency
-                canvas_obj.setFillAlpha(0.1)  # Adjust transparency as needed
-                # Draw the image
-                canvas_obj.drawImage(
-                    watermark,
-                    x,
-                    y,
-                    width=img_width * scale,
-                    height=img_height * scale,
-                    mask='auto'
-                )
-            except Exception as img_e:
-                QMessageBox.warning(self, "Watermark Error", f"Failed to add watermark image: {img_e}")
-        else:
-            QMessageBox.warning(self, "Watermark Image Not Found", f"Watermark image not found at {watermark_path}.")
-        canvas_obj.restoreState()
-
-    def add_member(self):
-        # Add a new member row at the end
-        row_number = len(self.entries) + 1
-        grid_layout = self.find_child_layout_attendance()
-        if grid_layout:
-            self.add_member_row(grid_layout, row_number)
-            self.on_frame_configure()
-            QMessageBox.information(self, "Member Added", f"Added a new member row ({row_number}).")
-        else:
-            QMessageBox.warning(self, "Error", "Unable to add member row.")
-
-    def delete_member(self):
-        if self.entries:
-            row_entries = self.entries.pop()
-            for widget in row_entries:
-                widget.deleteLater()
-            self.on_frame_configure()
-            QMessageBox.information(self, "Member Deleted", "Last member row has been deleted.")
-        else:
-            QMessageBox.warning(self, "No Members", "There are no members to delete.")
-
-    def find_child_layout_attendance(self):
-        """Finds the grid layout inside the attendance tab."""
-        for child in self.attendance_tab.findChildren(QGridLayout):
-            return child
-        return None
-
-    def on_frame_configure(self, event=None):
-        """Reset the scroll region to encompass the inner frame"""
-        # In PyQt6, QScrollArea automatically handles the scroll region
-        pass
-
-# Initialize the application
-def main():
-    app = QApplication(sys.argv)
-    window = AttendanceApp()
-    window.show()
-    sys.exit(app.exec())
-
-if __name__ == "__main__":
-    main()
+import sys
+import os
+import argparse
+from datetime import date
+import importlib
+import threading
+from PyQt6.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+    QPushButton, QMessageBox, QFileDialog, QTextEdit,
+    QDateEdit, QTabWidget, QProgressDialog, QComboBox, QInputDialog, QCheckBox, QLineEdit
+)
+from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QDate, QTimer, QObject, pyqtSignal
+
+# ReportLab (via attendance_export) is deliberately not imported here: it is
+# loaded by the first export, or by prewarm_exports() once the window is up.
+import app_config
+import attendance_records
+import attendance_grid
+import attendance_store
+import committee_workspace
+import export_archive
+import export_worker
+import file_watch
+import instrumentation
+import member_search
+import report_preview
+
+class _WatchSignals(QObject):
+    # Carries file watcher callbacks over to the GUI thread
+    changed = pyqtSignal(str)
+
+class _DirectorySignals(QObject):
+    # Hands the member directory built on a background thread to the GUI thread
+    loaded = pyqtSignal(object)
+
+class AttendanceApp(QWidget):
+    def __init__(self, committee=None, config=None):
+        super().__init__()
+        self.setMinimumSize(1200, 800)
+        self.attendance_options = ["Attending", "Absent"]
+        self.attending_as_options = ["In-Person", "Virtual"]
+        self.committee = committee
+        self.config = config or app_config.load_config()
+        self.export_worker = None
+
+        # Load preloaded names and positions
+        self.load_preloaded_members()
+
+        self.init_ui()
+        self.show_committee_title()
+        self.start_file_watcher()
+        self.directory_signals = _DirectorySignals(self)
+        self.directory_signals.loaded.connect(self.member_directory_loaded)
+        self.load_member_directory()
+
+    def load_preloaded_members(self):
+        os.makedirs(self.config.data_dir, exist_ok=True)
+        self.store = attendance_store.AttendanceStore(self.config.store_path)
+        # Carry over a roster saved by older versions of the app, which only
+        # knew the one committee
+        self.store.import_members_json(attendance_records.DEFAULT_COMMITTEE, self.config.members_path)
+        self.data_version = self.store.data_version()
+        # Committees are read from the store only when they are opened
+        self.workspaces = committee_workspace.WorkspaceCache(self.store)
+        if self.committee is None:
+            committees = self.store.committees()
+            if not committees or attendance_records.DEFAULT_COMMITTEE in committees:
+                self.committee = attendance_records.DEFAULT_COMMITTEE
+            else:
+                self.committee = committees[0]
+        self.workspace = self.workspaces.get(self.committee)
+        self.preloaded_members = self.workspace.roster
+
+    def save_preloaded_members(self):
+        self.workspace.save_roster(self.preloaded_members)
+
+    def start_file_watcher(self):
+        """Watches the database, the watermark and the config file on a
+        background thread, so changes made outside the app are picked up
+        without checking the disk on every export or save."""
+        self.watch_signals = _WatchSignals(self)
+        self.watch_signals.changed.connect(self.file_changed)
+        self.watcher = file_watch.FileWatcher()
+        self.store_files = {self.watcher.watch(path, self.watch_signals.changed.emit)
+                            for path in (self.config.store_path, self.config.store_path + "-wal")}
+        self.watcher.watch(self.config.watermark_path, self.watch_signals.changed.emit)
+        if self.config.path:
+            self.watcher.watch(self.config.path, self.watch_signals.changed.emit)
+        self.watcher.start()
+
+    def load_member_directory(self):
+        """Builds the autocomplete directory of every known member on a
+        background thread with its own database connection; with a large
+        history this takes too long to do on the GUI thread."""
+        self.member_directory_changes = set()
+        loaded = self.directory_signals.loaded.emit
+        store_path = self.config.store_path
+
+        def load():
+            with attendance_store.AttendanceStore(store_path) as store:
+                positions = store.member_positions()
+            loaded(member_search.MemberDirectory(positions.items()))
+
+        threading.Thread(target=load, name="member-directory", daemon=True).start()
+
+    def member_directory_loaded(self, directory):
+        self.member_directory = directory
+        self.attendance_view.set_member_directory(directory)
+        # Saves made while it was loading may not be in it yet
+        changes, self.member_directory_changes = self.member_directory_changes or set(), None
+        self.update_member_directory(changes)
+
+    def update_member_directory(self, names):
+        """Brings just ``names`` up to date in the directory after a save."""
+        if self.member_directory_changes is not None:
+            self.member_directory_changes.update(names)
+        elif names:
+            self.member_directory.sync(names, self.store.member_positions(names))
+
+    def file_changed(self, path):
+        if path in self.store_files:
+            # Only commits from other processes change this; our own saves are cached already
+            version = self.store.data_version()
+            if version != self.data_version:
+                self.data_version = version
+                self.reload_committee_data()
+        elif self.config.path and path == os.path.abspath(self.config.path):
+            self.reload_config()
+        # A changed watermark needs nothing here: the next export passes its new mtime on
+
+    def reload_config(self):
+        try:
+            config = app_config.load_config(self.config.path)
+        except (OSError, ValueError) as e:
+            print(f"Keeping the previous settings: {e}", file=sys.stderr)
+            return
+        if config.watermark_path != self.config.watermark_path:
+            self.watcher.unwatch(self.config.watermark_path)
+            self.watcher.watch(config.watermark_path, self.watch_signals.changed.emit)
+        # The database stays where it was opened until the app restarts
+        config.data_dir = self.config.data_dir
+        self.config = config
+
+    def reload_committee_data(self):
+        """Re-reads committees, rosters and sessions that another process changed."""
+        self.workspaces.invalidate()
+        session_date = self.date_edit_attendance.date().toPyDate()
+        if self.workspace.rows is None:
+            self.entries = self.workspace.load_rows(session_date)
+            self.attendance_model.set_rows(self.entries)
+        self.preloaded_members = self.workspace.roster
+        self.load_member_directory()
+        names = {self.committee_selector.itemText(i) for i in range(self.committee_selector.count())}
+        if not names.issuperset(self.store.committees()):
+            self.committee_selector.blockSignals(True)
+            self.committee_selector.clear()
+            self.committee_selector.addItems(sorted(names.union(self.store.committees())))
+            self.committee_selector.setCurrentText(self.committee)
+            self.committee_selector.blockSignals(False)
+
+    def export_path(self, kind, title, file_filter):
+        """Returns where to save an export: straight into the configured export
+        directory if the config says not to ask, otherwise from a save dialog
+        that starts there. Empty if the user cancels."""
+        filename = attendance_records.default_filename(kind, self.committee)
+        if self.config.export_dir and not self.config.ask_export_path:
+            os.makedirs(self.config.export_dir, exist_ok=True)
+            return self.config.export_path(filename)
+        file_path, _ = QFileDialog.getSaveFileName(self, title, self.config.export_path(filename), file_filter)
+        return file_path
+
+    def show_committee_title(self):
+        title = f"{self.committee} Attendance/Weekly Report Generator"
+        self.setWindowTitle(title)
+        self.title_label.setText(title)
+
+    def init_ui(self):
+        main_layout = QVBoxLayout()
+        self.setLayout(main_layout)
+
+        # Header without Image
+        header_layout = QHBoxLayout()
+        main_layout.addLayout(header_layout)
+
+        self.title_label = QLabel()
+        title_font = QFont("Arial", 20, QFont.Weight.Bold)
+        self.title_label.setFont(title_font)
+        self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        header_layout.addWidget(self.title_label)
+
+        # Committee Selector
+        committee_layout = QHBoxLayout()
+        main_layout.addLayout(committee_layout)
+
+        committee_label = QLabel("Committee:")
+        committee_label.setFont(QFont("Arial", 12))
+        committee_layout.addWidget(committee_label)
+
+        self.committee_selector = QComboBox()
+        self.committee_selector.setMinimumWidth(300)
+        self.committee_selector.addItems(sorted(set(self.store.committees()) | {self.committee}))
+        self.committee_selector.setCurrentText(self.committee)
+        self.committee_selector.currentTextChanged.connect(self.switch_committee)
+        committee_layout.addWidget(self.committee_selector)
+
+        new_committee_button = QPushButton("New Committee")
+        new_committee_button.setStyleSheet("background-color: #6C757D; color: white; padding: 10px;")
+        new_committee_button.clicked.connect(self.add_committee)
+        committee_layout.addWidget(new_committee_button)
+
+        # Spacer
+        committee_layout.addStretch()
+
+        # Tab Widget
+        self.tabs = QTabWidget()
+        main_layout.addWidget(self.tabs)
+
+        # Attendance Tab
+        self.attendance_tab = QWidget()
+        self.tabs.addTab(self.attendance_tab, "Attendance")
+        self.init_attendance_tab()
+
+        # Weekly Report Tab
+        self.report_tab = QWidget()
+        self.tabs.addTab(self.report_tab, "Weekly Report")
+        self.init_report_tab()
+
+    def init_attendance_tab(self):
+        layout = QVBoxLayout()
+        self.attendance_tab.setLayout(layout)
+
+        # Date Input
+        date_layout = QHBoxLayout()
+        layout.addLayout(date_layout)
+
+        date_label = QLabel("Date:")
+        date_label.setFont(QFont("Arial", 12))
+        date_layout.addWidget(date_label)
+
+        self.date_edit_attendance = QDateEdit()
+        self.date_edit_attendance.setCalendarPopup(True)
+        self.date_edit_attendance.setDate(QDate.currentDate())
+        self.date_edit_attendance.setDisplayFormat("MM/dd/yyyy")
+        self.date_edit_attendance.dateChanged.connect(self.attendance_date_changed)
+        date_layout.addWidget(self.date_edit_attendance)
+
+        # Spacer
+        date_layout.addStretch()
+
+        # Find member: autocompletes from everyone the store knows about and
+        # jumps to their row, so people already listed aren't added twice
+        find_label = QLabel("Find member:")
+        find_label.setFont(QFont("Arial", 12))
+        date_layout.addWidget(find_label)
+
+        self.member_directory = None
+        self.find_member_edit = QLineEdit()
+        self.find_member_edit.setPlaceholderText("Name")
+        self.find_member_edit.setMinimumWidth(250)
+        self.find_member_edit.returnPressed.connect(self.find_member)
+        completer = attendance_grid.attach_completer(self.find_member_edit, self.suggest_members)
+        completer.activated.connect(self.find_member)
+        date_layout.addWidget(self.find_member_edit)
+
+        # Attendance grid: only the visible rows are painted, and the rows
+        # themselves live in a compact store rather than per-row widgets. The
+        # grid shows the meeting saved for the selected date, or the roster
+        # padded with blank rows.
+        self.entries = self.workspace.load_rows(self.date_edit_attendance.date().toPyDate())
+        self.attendance_model = attendance_grid.AttendanceTableModel(self.entries)
+        self.attendance_model.dataChanged.connect(self.mark_attendance_changed)
+        self.attendance_model.rowsInserted.connect(self.mark_attendance_changed)
+        self.attendance_model.rowsRemoved.connect(self.mark_attendance_changed)
+        self.attendance_view = attendance_grid.AttendanceTableView(self.attendance_model)
+        layout.addWidget(self.attendance_view)
+
+        form_layout = QVBoxLayout()
+        layout.addLayout(form_layout)
+
+        # Buttons Layout
+        button_layout = QHBoxLayout()
+        form_layout.addLayout(button_layout)
+
+        save_button = QPushButton("Save Attendance")
+        save_button.setStyleSheet("background-color: #007BFF; color: white; padding: 10px;")
+        save_button.clicked.connect(self.save_data_attendance)
+        button_layout.addWidget(save_button)
+
+        export_csv_button = QPushButton("Export to CSV")
+        export_csv_button.setStyleSheet("background-color: #28A745; color: white; padding: 10px;")
+        export_csv_button.clicked.connect(self.export_to_csv)
+        button_layout.addWidget(export_csv_button)
+
+        export_attendance_pdf_button = QPushButton("Export Attendance to PDF")
+        export_attendance_pdf_button.setStyleSheet("background-color: #17A2B8; color: white; padding: 10px;")
+        export_attendance_pdf_button.clicked.connect(self.export_to_pdf)
+        button_layout.addWidget(export_attendance_pdf_button)
+
+        export_packet_button = QPushButton("Export Meeting Packet")
+        export_packet_button.setStyleSheet("background-color: #6F42C1; color: white; padding: 10px;")
+        export_packet_button.clicked.connect(self.export_meeting_packet)
+        button_layout.addWidget(export_packet_button)
+
+        self.include_prior_sessions = QCheckBox(f"Include last {PACKET_PRIOR_SESSIONS} meetings")
+        self.include_prior_sessions.setChecked(True)
+        button_layout.addWidget(self.include_prior_sessions)
+
+        # Spacer
+        button_layout.addStretch()
+
+        # Add and Delete Member Buttons
+        manage_layout = QHBoxLayout()
+        form_layout.addLayout(manage_layout)
+
+        add_member_button = QPushButton("Add Member")
+        add_member_button.setStyleSheet("background-color: #17A2B8; color: white; padding: 10px;")
+        add_member_button.clicked.connect(self.add_member)
+        manage_layout.addWidget(add_member_button)
+
+        delete_member_button = QPushButton("Delete Member")
+        delete_member_button.setStyleSheet("background-color: #DC3545; color: white; padding: 10px;")
+        delete_member_button.clicked.connect(self.delete_member)
+        manage_layout.addWidget(delete_member_button)
+
+    def init_report_tab(self):
+        layout = QVBoxLayout()
+        self.report_tab.setLayout(layout)
+
+        # Date Input
+        date_layout = QHBoxLayout()
+        layout.addLayout(date_layout)
+
+        date_label = QLabel("Date:")
+        date_label.setFont(QFont("Arial", 12))
+        date_layout.addWidget(date_label)
+
+        self.date_edit_report = QDateEdit()
+        self.date_edit_report.setCalendarPopup(True)
+        self.date_edit_report.setDate(QDate.currentDate())
+        self.date_edit_report.setDisplayFormat("MM/dd/yyyy")
+        self.date_edit_report.dateChanged.connect(self.schedule_report_preview)
+        date_layout.addWidget(self.date_edit_report)
+
+        # Spacer
+        date_layout.addStretch()
+
+        # Weekly Report Input, with a live preview of the current page beside it
+        editor_layout = QHBoxLayout()
+        layout.addLayout(editor_layout)
+        report_layout = QVBoxLayout()
+        editor_layout.addLayout(report_layout, 3)
+
+        report_label = QLabel("Weekly Report:")
+        report_label.setFont(QFont("Arial", 12))
+        report_layout.addWidget(report_label)
+
+        self.report_text = QTextEdit()
+        self.report_text.setFixedHeight(400)  # Increased height for better input
+        self.report_text.setPlainText(self.workspace.report_template)
+        self.report_text.textChanged.connect(self.schedule_report_preview)
+        self.report_text.cursorPositionChanged.connect(self.schedule_report_preview)
+        report_layout.addWidget(self.report_text)
+
+        self.report_preview = report_preview.ReportPreview()
+        self.report_preview.setFixedHeight(430)
+        editor_layout.addWidget(self.report_preview, 2)
+
+        # Export Button
+        export_layout = QHBoxLayout()
+        layout.addLayout(export_layout)
+
+        export_report_pdf_button = QPushButton("Export Report to PDF")
+        export_report_pdf_button.setStyleSheet("background-color: #FFC107; color: white; padding: 10px;")
+        export_report_pdf_button.clicked.connect(self.export_weekly_report_pdf)
+        export_layout.addWidget(export_report_pdf_button)
+
+        save_template_button = QPushButton("Save as Template")
+        save_template_button.setStyleSheet("background-color: #6C757D; color: white; padding: 10px;")
+        save_template_button.clicked.connect(self.save_report_template)
+        export_layout.addWidget(save_template_button)
+
+        # Spacer
+        export_layout.addStretch()
+
+    def schedule_report_preview(self):
+        self.report_preview.schedule(self.report_text.toPlainText(),
+                                     self.date_edit_report.date().toString('MM/dd/yyyy'),
+                                     self.committee, self.report_text.textCursor().position())
+
+    def switch_committee(self, committee):
+        """Shows another committee's roster, attendance and report draft."""
+        if not committee or committee == self.committee:
+            return
+        if not self.confirm_leave_committee():
+            # Put the selector back without switching again
+            self.committee_selector.blockSignals(True)
+            self.committee_selector.setCurrentText(self.committee)
+            self.committee_selector.blockSignals(False)
+            return
+        self.workspace.report_text = self.report_text.toPlainText()
+
+        self.committee = committee
+        self.workspace = self.workspaces.get(committee)
+        session_date = self.date_edit_attendance.date().toPyDate()
+        if self.workspace.rows is None or self.workspace.rows_date != attendance_store.to_iso_date(session_date):
+            self.workspace.load_rows(session_date)
+        self.entries = self.workspace.rows
+        self.attendance_model.set_rows(self.entries)
+        self.preloaded_members = self.workspace.roster
+
+        report_text = self.workspace.report_text
+        self.report_text.setPlainText(self.workspace.report_template if report_text is None else report_text)
+        self.schedule_report_preview()
+        self.show_committee_title()
+
+    def confirm_leave_committee(self):
+        """Offers to save unsaved attendance; returns False to stay put."""
+        if not self.workspace.dirty:
+            return True
+        answer = QMessageBox.question(
+            self, "Unsaved Attendance", f"Save the attendance for {self.committee} before switching?",
+            QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard
+            | QMessageBox.StandardButton.Cancel)
+        if answer == QMessageBox.StandardButton.Save:
+            return self.save_data_attendance()
+        if answer == QMessageBox.StandardButton.Discard:
+            # Reloaded from the store next time the committee is opened
+            self.workspace.rows = None
+            self.workspace.dirty = False
+            return True
+        return False
+
+    def add_committee(self):
+        name, ok = QInputDialog.getText(self, "New Committee", "Committee name:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        if self.committee_selector.findText(name) < 0:
+            self.store.add_committee(name)
+            names = sorted(self.committee_selector.itemText(i) for i in range(self.committee_selector.count()))
+            self.committee_selector.blockSignals(True)
+            self.committee_selector.clear()
+            self.committee_selector.addItems(sorted(names + [name]))
+            self.committee_selector.setCurrentText(self.committee)
+            self.committee_selector.blockSignals(False)
+        self.committee_selector.setCurrentText(name)
+
+    def mark_attendance_changed(self, *args):
+        self.workspace.dirty = True
+
+    def attendance_date_changed(self, qdate):
+        # Show what was saved for the new date, unless the grid has edits
+        if not self.workspace.dirty:
+            self.entries = self.workspace.load_rows(qdate.toPyDate())
+            self.attendance_model.set_rows(self.entries)
+
+    def save_report_template(self):
+        try:
+            self.workspace.save_report_template(self.report_text.toPlainText())
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error saving report template: {e}")
+            return
+        QMessageBox.information(self, "Template Saved",
+                                f"New weekly reports for {self.committee} will start from this text.")
+
+    def save_data_attendance(self):
+        """Saves the roster and this meeting's attendance; returns True if saved."""
+        self.saved_data = []
+        new_preloaded_members = []
+        for row in self.entries:
+            name = row[0].strip()
+            position = row[1].strip()
+            attending_as = row[2]
+            attendance = row[3]
+            if name or position:
+                if not name:
+                    QMessageBox.warning(self, "Incomplete Data", "Member name cannot be empty.")
+                    return False
+                self.saved_data.append([name, position, attending_as, attendance])
+                new_preloaded_members.append({'name': name, 'position': position})
+        duplicates = attendance_store.duplicate_names(self.saved_data)
+        if duplicates:
+            QMessageBox.warning(self, "Duplicate Members",
+                                f"{', '.join(duplicates)} listed more than once. "
+                                "Remove the extra rows before saving.")
+            return False
+        # Save preloaded members and this meeting's attendance
+        session_date = self.date_edit_attendance.date().toPyDate()
+        # Everyone who was or now is on the roster or in this meeting, for the directory
+        changed = {m['name'] for m in self.preloaded_members + new_preloaded_members}
+        changed.update(r[0] for r in self.store.session_records(self.committee, session_date))
+        self.preloaded_members = new_preloaded_members
+        try:
+            self.save_preloaded_members()
+            self.workspace.record_session(session_date, self.saved_data)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error saving attendance: {e}")
+            return False
+        self.update_member_directory(changed)
+        QMessageBox.information(self, "Data Saved", "Attendance data saved successfully!")
+        return True
+
+    def read_entries(self):
+        """Returns the grid contents as [name, position, attending_as, attendance] rows."""
+        return list(self.entries)
+
+    def export_to_csv(self):
+        file_path = self.export_path("csv", "Save CSV", "CSV Files (*.csv)")
+
+        if file_path:
+            trace = instrumentation.export_trace("csv", path=file_path)
+            # Snapshot the grid here; the worker thread never touches widgets
+            with trace.stage('read_widgets'):
+                records = self.read_entries()
+                date_text = self.date_edit_attendance.date().toString('MM/dd/yyyy')
+                session_date = self.date_edit_attendance.date().toPyDate()
+                committee = self.committee
+
+            def render(warnings, progress):
+                import attendance_export
+                return attendance_export.attendance_csv_bytes(records, date_text, committee)
+            self.run_export(render, file_path, "CSV Exported", "Attendance data exported to",
+                            "Error exporting data", trace, ("csv", committee, session_date))
+        else:
+            QMessageBox.warning(self, "No File Selected", "Please choose a file path.")
+
+    def export_to_pdf(self):
+        file_path = self.export_path("pdf", "Save PDF", "PDF Files (*.pdf)")
+
+        if file_path:
+            trace = instrumentation.export_trace("pdf", path=file_path)
+            with trace.stage('read_widgets'):
+                records = self.read_entries()
+                date_text = self.date_edit_attendance.date().toString('MM/dd/yyyy')
+                session_date = self.date_edit_attendance.date().toPyDate()
+                committee = self.committee
+                watermark_path = self.config.watermark_path
+                # The watcher has the file's mtime, so the export needn't stat it
+                watermark_mtime = self.watcher.mtime(watermark_path)
+
+            def render(warnings, progress):
+                import attendance_export
+                # Build PDF with full-page watermark
+                on_page = attendance_export.make_watermark(watermark_path, warnings, watermark_mtime)
+                return attendance_export.attendance_pdf_bytes(records, date_text, committee, on_page=on_page,
+                                                              progress=progress)
+            self.run_export(render, file_path, "PDF Exported", "Attendance data exported to",
+                            "Error exporting data", trace, ("pdf", committee, session_date))
+        else:
+            QMessageBox.warning(self, "No File Selected", "Please choose a file path.")
+
+    def export_weekly_report_pdf(self):
+        file_path = self.export_path("report", "Save Weekly Report PDF", "PDF Files (*.pdf)")
+
+        if file_path:
+            trace = instrumentation.export_trace("report", path=file_path)
+            with trace.stage('read_widgets'):
+                report_text = self.report_text.toPlainText()
+                date_text = self.date_edit_report.date().toString('MM/dd/yyyy')
+                session_date = self.date_edit_report.date().toPyDate()
+                committee = self.committee
+                watermark_path = self.config.watermark_path
+                # The watcher has the file's mtime, so the export needn't stat it
+                watermark_mtime = self.watcher.mtime(watermark_path)
+
+            def render(warnings, progress):
+                import attendance_export
+                # Build PDF with full-page watermark
+                on_page = attendance_export.make_watermark(watermark_path, warnings, watermark_mtime)
+                return attendance_export.weekly_report_pdf_bytes(report_text, date_text, committee, on_page=on_page,
+                                                                 progress=progress)
+            self.run_export(render, file_path, "PDF Exported", "Weekly report exported to",
+                            "Error exporting weekly report", trace, ("report", committee, session_date))
+        else:
+            QMessageBox.warning(self, "No File Selected", "Please choose a file path.")
+
+    def export_meeting_packet(self):
+        file_path = self.export_path("packet", "Save Meeting Packet PDF", "PDF Files (*.pdf)")
+
+        if file_path:
+            trace = instrumentation.export_trace("packet", path=file_path)
+            with trace.stage('read_widgets'):
+                records = self.read_entries()
+                report_text = self.report_text.toPlainText()
+                date_text = self.date_edit_attendance.date().toString('MM/dd/yyyy')
+                session_date = self.date_edit_attendance.date().toPyDate()
+                committee = self.committee
+                watermark_path = self.config.watermark_path
+                # The watcher has the file's mtime, so the export needn't stat it
+                watermark_mtime = self.watcher.mtime(watermark_path)
+                prior_sessions = []
+                if self.include_prior_sessions.isChecked():
+                    # The store connection belongs to this thread, so read the appendix here
+                    iso = attendance_store.to_iso_date(self.date_edit_attendance.date().toPyDate())
+                    for prior in sorted(d for d in self.workspace.session_dates if d < iso)[-PACKET_PRIOR_SESSIONS:]:
+                        prior_sessions.append((date.fromisoformat(prior).strftime('%m/%d/%Y'),
+                                               self.store.session_records(committee, prior)))
+
+            def render(warnings, progress):
+                import attendance_export
+                # One document and one watermark for the whole packet
+                on_page = attendance_export.make_watermark(watermark_path, warnings, watermark_mtime)
+                return attendance_export.meeting_packet_pdf_bytes(records, report_text, date_text, committee,
+                                                                  prior_sessions, on_page=on_page, progress=progress)
+            self.run_export(render, file_path, "PDF Exported", "Meeting packet exported to",
+                            "Error exporting meeting packet", trace, ("packet", committee, session_date))
+        else:
+            QMessageBox.warning(self, "No File Selected", "Please choose a file path.")
+
+    def run_export(self, render, file_path, success_title, success_text, error_text, trace=None, archive_as=None):
+        """Runs an export on a worker thread behind a cancellable progress dialog.
+
+        ``archive_as`` is (kind, committee, session date); with an archive
+        directory configured, the export is also stored in the archive.
+        """
+        if self.export_worker is not None:
+            QMessageBox.warning(self, "Export Running", "Please wait for the current export to finish.")
+            return
+
+        after_write = None
+        if archive_as is not None and self.config.archive_dir:
+            archive_dir, compress_csv = self.config.archive_dir, self.config.archive_compress_csv
+            kind, committee, session_date = archive_as
+
+            def archive_export(data, warnings):
+                export_archive.archive_export(archive_dir, data, committee, session_date, kind, file_path,
+                                              warnings, compress_csv)
+            after_write = archive_export
+
+        progress_dialog = QProgressDialog("Exporting...", "Cancel", 0, 0, self)
+        progress_dialog.setWindowTitle("Exporting")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(300)
+
+        def on_progress(done, total):
+            # A total of 0 keeps the dialog in its busy state
+            progress_dialog.setMaximum(total)
+            if total:
+                progress_dialog.setValue(min(done, total))
+
+        def done():
+            self.export_worker = None
+            progress_dialog.reset()
+            progress_dialog.deleteLater()
+
+        def on_finished(path, warnings):
+            done()
+            if warnings:
+                QMessageBox.warning(self, "Export Warnings", "\n".join(warnings))
+            QMessageBox.information(self, success_title, f"{success_text} {path}")
+
+        def on_failed(error):
+            done()
+            QMessageBox.critical(self, "Error", f"{error_text}: {error}")
+
+        def on_cancelled():
+            done()
+            QMessageBox.information(self, "Export Cancelled", "The export was cancelled; no file was written.")
+
+        self.export_worker = export_worker.start_export(self, render, file_path, on_progress,
+                                                        on_finished, on_failed, on_cancelled, trace, after_write)
+        progress_dialog.canceled.connect(self.export_worker.cancel)
+
+    def closeEvent(self, event):
+        # Don't let the window (and the export thread it owns) go away mid-export
+        if self.export_worker is not None:
+            self.export_worker.cancel()
+            self.export_worker.thread().wait()
+        self.report_preview.wait()
+        self.watcher.stop()
+        super().closeEvent(event)
+
+    def add_member(self):
+        # Add a new member row at the end
+        row = self.attendance_model.append_row()
+        self.attendance_view.scrollToBottom()
+        self.attendance_view.setCurrentIndex(self.attendance_model.index(row, 0))
+        QMessageBox.information(self, "Member Added", f"Added a new member row ({row + 1}).")
+
+    def delete_member(self):
+        if self.attendance_model.remove_last_row():
+            QMessageBox.information(self, "Member Deleted", "Last member row has been deleted.")
+        else:
+            QMessageBox.warning(self, "No Members", "There are no members to delete.")
+
+    def suggest_members(self, text):
+        if self.member_directory is None:
+            return []
+        return self.member_directory.complete_names(text)
+
+    def find_member(self, text=None):
+        """Selects the member's row in the grid. A known member who isn't
+        listed yet gets a row with their last position; an unknown name is
+        only added after asking, since it's most likely a typo."""
+        name = (text if isinstance(text, str) else self.find_member_edit.text()).strip()
+        if not name:
+            return
+        key = member_search.normalize(name)
+        keys = [member_search.normalize(n) for n in self.entries.names]
+        if key in keys:
+            row = keys.index(key)
+        elif self.member_directory is not None and name in self.member_directory:
+            name = self.member_directory.names.get(name)
+            row = self.attendance_model.append_row(name, self.member_directory.position_of(name))
+        else:
+            # A partial name picks the first listed member with a word starting with it
+            row = next((i for i, k in enumerate(keys)
+                        if any(w.startswith(key) for w in (k, *k.split()))), None)
+            if row is None:
+                answer = QMessageBox.question(self, "Member Not Found",
+                                              f"No member named \"{name}\" is known. Add them to this meeting?")
+                if answer != QMessageBox.StandardButton.Yes:
+                    return
+                row = self.attendance_model.append_row(name)
+        index = self.attendance_model.index(row, attendance_grid.ATTENDANCE)
+        self.attendance_view.scrollTo(index)
+        self.attendance_view.setCurrentIndex(index)
+        self.attendance_view.setFocus()
+        self.find_member_edit.clear()
+
+# Delay before loading the PDF stack, so it doesn't compete with first paint
+PREWARM_DELAY_MS = 500
+# Earlier meetings included in the appendix of a meeting packet
+PACKET_PRIOR_SESSIONS = 4
+
+
+def prewarm_exports():
+    """Imports the export engine (and ReportLab/PIL) on a background thread so
+    the first export doesn't pay for it."""
+    threading.Thread(target=importlib.import_module, args=("attendance_export",),
+                     name="prewarm-exports", daemon=True).start()
+
+# Initialize the application
+def main():
+    parser = argparse.ArgumentParser(description="Committee attendance and weekly report generator.")
+    parser.add_argument("--committee", help="Committee to open at startup")
+    app_config.add_argument(parser)
+    instrumentation.add_arguments(parser)
+    # Anything else (e.g. -platform) is left for Qt
+    args, qt_args = parser.parse_known_args()
+    instrumentation.configure(args.trace, args.profile)
+    try:
+        config = app_config.load_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = AttendanceApp(args.committee, config)
+    window.show()
+    QTimer.singleShot(PREWARM_DELAY_MS, prewarm_exports)
+    sys.exit(app.exec())
+
+if __name__ == "__main__":
+    main()
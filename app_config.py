@@ -0,0 +1,121 @@
+"""Paths the app and the command line tools are configured with.
+
+Settings are read from a JSON file::
+
+    {
+        "watermark_path": "C:/scsuimage/sga.jpg",
+        "data_dir": "data",
+        "export_dir": "exports",
+        "ask_export_path": true,
+        "archive_dir": "archive",
+        "archive_compress_csv": false
+    }
+
+``data_dir`` holds attendance.db (and a members.json left by older
+versions); ``export_dir`` is where exports are saved by default. With
+``ask_export_path`` set to false, exports are written straight into
+``export_dir`` under their default names instead of asking with a save
+dialog. With ``archive_dir`` set, every export is also stored in that
+export archive (see export_archive), with CSVs gzipped if
+``archive_compress_csv`` is true. Relative paths are resolved against the
+config file's directory. Every key is optional: without a config file the
+watermark is read from WATERMARK_PATH and data lives in, and exports
+default to, the current directory.
+
+The file is ATTENDANCE_CONFIG if that environment variable is set, otherwise
+attendance_config.json next to the app. This module only uses the standard
+library.
+"""
+import os
+import json
+
+from attendance_records import WATERMARK_PATH
+
+CONFIG_ENV = "ATTENDANCE_CONFIG"
+CONFIG_FILENAME = "attendance_config.json"
+STORE_FILENAME = "attendance.db"
+MEMBERS_FILENAME = "members.json"
+
+_PATH_KEYS = ("watermark_path", "data_dir", "export_dir", "archive_dir")
+_FLAG_KEYS = ("ask_export_path", "archive_compress_csv")
+_KEYS = _PATH_KEYS + _FLAG_KEYS
+
+
+class AppConfig:
+    """Resolved settings; see the module docstring for the keys."""
+
+    def __init__(self, path=None, watermark_path=WATERMARK_PATH, data_dir=None, export_dir=None,
+                 ask_export_path=True, archive_dir=None, archive_compress_csv=False):
+        self.path = path
+        self.watermark_path = watermark_path
+        self.data_dir = data_dir or os.getcwd()
+        self.export_dir = export_dir
+        self.ask_export_path = ask_export_path
+        self.archive_dir = archive_dir
+        self.archive_compress_csv = archive_compress_csv
+
+    @property
+    def store_path(self):
+        return os.path.join(self.data_dir, STORE_FILENAME)
+
+    @property
+    def members_path(self):
+        return os.path.join(self.data_dir, MEMBERS_FILENAME)
+
+    def export_path(self, filename):
+        """Where an export named ``filename`` is saved by default."""
+        return os.path.join(self.export_dir, filename) if self.export_dir else filename
+
+
+def add_argument(parser):
+    """Adds the --config option to a command line parser."""
+    parser.add_argument("--config", metavar="FILE",
+                        help=f"Settings file (default: ${CONFIG_ENV} or {CONFIG_FILENAME} next to the app)")
+
+
+def default_config_path():
+    return os.environ.get(CONFIG_ENV) or os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                      CONFIG_FILENAME)
+
+
+def load_config(path=None):
+    """Reads the config file (default_config_path() if ``path`` is None).
+
+    A missing file gives the defaults; a file that isn't a JSON object, has
+    unknown keys, or has a path that isn't a string or a flag that isn't
+    true/false, raises ValueError naming the key. A null value is the
+    default.
+    """
+    path = os.path.abspath(path or default_config_path())
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+    except FileNotFoundError:
+        return AppConfig(path)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path}: {e}") from e
+    if not isinstance(settings, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    unknown = sorted(set(settings) - set(_KEYS))
+    if unknown:
+        raise ValueError(f"{path}: unknown setting(s) {', '.join(unknown)}")
+    for key in _PATH_KEYS:
+        if settings.get(key) is not None and not isinstance(settings[key], str):
+            raise ValueError(f"{path}: {key} must be a path string, not {json.dumps(settings[key])}")
+    for key in _FLAG_KEYS:
+        if settings.get(key) is not None and not isinstance(settings[key], bool):
+            raise ValueError(f"{path}: {key} must be true or false, not {json.dumps(settings[key])}")
+
+    base = os.path.dirname(path)
+
+    def resolve(key):
+        value = settings.get(key)
+        return os.path.normpath(os.path.join(base, os.path.expanduser(value))) if value else None
+
+    return AppConfig(path,
+                     watermark_path=resolve('watermark_path') or WATERMARK_PATH,
+                     data_dir=resolve('data_dir'),
+                     export_dir=resolve('export_dir'),
+                     ask_export_path=settings.get('ask_export_path') is not False,
+                     archive_dir=resolve('archive_dir'),
+                     archive_compress_csv=settings.get('archive_compress_csv') is True)
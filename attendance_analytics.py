@@ -0,0 +1,350 @@
+"""Attendance analytics over the full history in the attendance store.
+
+History is loaded once into flat NumPy columns (one entry per attendance
+row) and every summary is computed with vectorised group-bys (bincount,
+reduceat, lexsort) rather than per-member Python loops, so a multi-year
+history across all committees summarises in well under a second.
+
+    python attendance_analytics.py --db attendance.db -o summary.pdf
+"""
+import sys
+import io
+import time
+import argparse
+import numpy as np
+from reportlab.platypus import Spacer, PageBreak
+from reportlab.lib.units import inch
+
+import app_config
+import attendance_export
+import attendance_store
+import instrumentation
+import pdf_resources
+import report_markdown
+from attendance_records import DEFAULT_QUORUM
+
+
+class AttendanceFrame:
+    """Columnar attendance history.
+
+    ``committee`` and ``member`` are integer codes into ``committees`` and
+    ``members``; ``date`` is datetime64[D]; ``attended`` and ``virtual`` are
+    booleans. Every column has one entry per attendance row.
+    """
+
+    def __init__(self, date, committee, member, attended, virtual, committees, members):
+        self.date = date
+        self.committee = committee
+        self.member = member
+        self.attended = attended
+        self.virtual = virtual
+        self.committees = committees
+        self.members = members
+
+    def __len__(self):
+        return len(self.date)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Builds a frame from (date, committee, name, position, attending_as,
+        attendance) tuples as returned by AttendanceStore.attendance_rows()."""
+        committee_codes = {}
+        member_codes = {}
+        dates, committees, members, attended, virtual = [], [], [], [], []
+        for iso, committee, name, _position, attending_as, attendance in rows:
+            dates.append(iso)
+            committees.append(committee_codes.setdefault(committee, len(committee_codes)))
+            members.append(member_codes.setdefault(name, len(member_codes)))
+            attended.append(attendance == "Attending")
+            virtual.append(attending_as == "Virtual")
+        return cls(
+            np.array(dates, dtype='datetime64[D]'),
+            np.array(committees, dtype=np.int32),
+            np.array(members, dtype=np.int32),
+            np.array(attended, dtype=bool),
+            np.array(virtual, dtype=bool),
+            np.array(list(committee_codes), dtype=object),
+            np.array(list(member_codes), dtype=object),
+        )
+
+    @classmethod
+    def from_store(cls, store, committee=None, start=None, end=None):
+        return cls.from_rows(store.attendance_rows(committee, start, end))
+
+
+def _group(major, minor):
+    """Groups rows by two integer columns.
+
+    Returns (keys, inverse) where ``keys`` is an (n, 2) array of the distinct
+    (major, minor) pairs in sorted order and ``inverse`` maps every row to its
+    pair. The pair is packed into one int64 so a single 1-D unique does the work.
+    """
+    major = major.astype(np.int64)
+    minor = minor.astype(np.int64)
+    low = minor.min()
+    span = minor.max() - low + 1
+    packed, inverse = np.unique(major * span + (minor - low), return_inverse=True)
+    keys = np.stack([packed // span, packed % span + low], axis=1)
+    return keys, inverse.reshape(-1)
+
+
+TERMS = ("Spring", "Summer", "Fall")
+
+
+def _semester_codes(dates):
+    """Codes each date as year * 3 + term (Spring Jan-May, Summer Jun-Jul,
+    Fall Aug-Dec), which sorts chronologically."""
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    months = dates.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    terms = np.where(months <= 5, 0, np.where(months <= 7, 1, 2))
+    return years * 3 + terms
+
+
+def _semester_name(code):
+    return f"{TERMS[int(code) % 3]} {int(code) // 3}"
+
+
+def member_summary(frame):
+    """Per (committee, member): sessions, attended, attendance rate,
+    in-person/virtual counts and ratio, longest and current absence streaks.
+
+    Returns a list of dicts ordered by committee then member name.
+    """
+    if not len(frame):
+        return []
+    # Sort rows by committee, member, date so each member's history is contiguous
+    order = np.lexsort((frame.date, frame.member, frame.committee))
+    committee = frame.committee[order]
+    member = frame.member[order]
+    attended = frame.attended[order]
+    virtual = frame.virtual[order]
+
+    new_group = np.ones(len(order), dtype=bool)
+    new_group[1:] = (committee[1:] != committee[:-1]) | (member[1:] != member[:-1])
+    starts = np.flatnonzero(new_group)
+    ends = np.append(starts[1:], len(order)) - 1
+    group_id = np.cumsum(new_group) - 1
+    groups = len(starts)
+
+    sessions = np.bincount(group_id, minlength=groups)
+    present = np.bincount(group_id, weights=attended, minlength=groups).astype(int)
+    virtual_present = np.bincount(group_id, weights=attended & virtual, minlength=groups).astype(int)
+    in_person = present - virtual_present
+
+    # Absence streaks: length of the absence run ending at each row
+    absent = ~attended
+    index = np.arange(len(order))
+    prev_absent = np.zeros(len(order), dtype=bool)
+    prev_absent[1:] = absent[:-1]
+    run_start = absent & (new_group | ~prev_absent)
+    last_start = np.maximum.accumulate(np.where(run_start, index, 0))
+    streak = np.where(absent, index - last_start + 1, 0)
+    longest = np.maximum.reduceat(streak, starts)
+    current = streak[ends]
+
+    summary = []
+    for g in range(groups):
+        row = starts[g]
+        summary.append({
+            'committee': frame.committees[committee[row]],
+            'member': frame.members[member[row]],
+            'sessions': int(sessions[g]),
+            'attended': int(present[g]),
+            'rate': float(present[g] / sessions[g]),
+            'in_person': int(in_person[g]),
+            'virtual': int(virtual_present[g]),
+            'virtual_ratio': float(virtual_present[g] / present[g]) if present[g] else 0.0,
+            'longest_absence_streak': int(longest[g]),
+            'current_absence_streak': int(current[g]),
+        })
+    summary.sort(key=lambda s: (s['committee'], s['member']))
+    return summary
+
+
+def session_summary(frame, quorum=DEFAULT_QUORUM):
+    """Per session (committee, date): members, present, virtual, and whether
+    quorum (more than ``quorum`` of members present) was met."""
+    if not len(frame):
+        return []
+    keys, inverse = _group(frame.committee, frame.date.astype(np.int64))
+    members = np.bincount(inverse, minlength=len(keys))
+    present = np.bincount(inverse, weights=frame.attended, minlength=len(keys)).astype(int)
+    virtual = np.bincount(inverse, weights=frame.attended & frame.virtual, minlength=len(keys)).astype(int)
+    met = present > members * quorum
+
+    summary = []
+    for k, (committee, date) in enumerate(keys):
+        summary.append({
+            'committee': frame.committees[committee],
+            'date': np.datetime64(int(date), 'D').item(),
+            'members': int(members[k]),
+            'present': int(present[k]),
+            'virtual': int(virtual[k]),
+            'quorum_met': bool(met[k]),
+        })
+    summary.sort(key=lambda s: (s['committee'], s['date']))
+    return summary
+
+
+def committee_trends(frame, period='week', quorum=DEFAULT_QUORUM):
+    """Committee attendance rate, virtual share and quorum hit-rate per
+    ``period`` ('week' for ISO weeks starting Monday, or 'semester')."""
+    if not len(frame):
+        return []
+    days = frame.date.astype(np.int64)
+    if period == 'week':
+        # datetime64 day 0 (1970-01-01) was a Thursday; shift so weeks start Monday
+        period_codes = (days + 3) // 7 * 7 - 3
+
+        def period_name(code):
+            return str(np.datetime64(int(code), 'D'))
+    elif period == 'semester':
+        period_codes = _semester_codes(frame.date)
+        period_name = _semester_name
+    else:
+        raise ValueError(f"Unknown period: {period}")
+
+    keys, inverse = _group(frame.committee, period_codes)
+    rows = np.bincount(inverse, minlength=len(keys))
+    present = np.bincount(inverse, weights=frame.attended, minlength=len(keys))
+    virtual = np.bincount(inverse, weights=frame.attended & frame.virtual, minlength=len(keys))
+
+    # Quorum is judged per session, then counted per period
+    session_keys, session_inverse = _group(frame.committee, days)
+    session_rows = np.bincount(session_inverse, minlength=len(session_keys))
+    session_present = np.bincount(session_inverse, weights=frame.attended, minlength=len(session_keys))
+    session_period = np.zeros(len(session_keys), dtype=np.int64)
+    session_period[session_inverse] = inverse
+    sessions = np.bincount(session_period, minlength=len(keys))
+    quorum_met = np.bincount(session_period, weights=session_present > session_rows * quorum, minlength=len(keys))
+
+    # Committee codes follow first appearance, so order by name then period
+    order = sorted(range(len(keys)), key=lambda k: (frame.committees[keys[k][0]], keys[k][1]))
+    trends = []
+    for k in order:
+        committee, code = keys[k]
+        trends.append({
+            'committee': frame.committees[committee],
+            'period': period_name(code),
+            'sessions': int(sessions[k]),
+            'rate': float(present[k] / rows[k]),
+            'virtual_ratio': float(virtual[k] / present[k]) if present[k] else 0.0,
+            'quorum_rate': float(quorum_met[k] / sessions[k]) if sessions[k] else 0.0,
+        })
+    return trends
+
+
+def _percent(value):
+    return f"{value * 100:.0f}%"
+
+
+def summary_pdf_bytes(frame, title_period, on_page=None, quorum=DEFAULT_QUORUM):
+    """Renders a semester summary PDF: member rates and streaks, semester
+    trends and per-session quorum, in the attendance table style."""
+    if on_page is None:
+        on_page = attendance_export.make_watermark()
+    output = io.BytesIO()
+    doc = attendance_export.new_document(output)
+    styles = pdf_resources.get_styles()
+    elements = [
+        pdf_resources.get_paragraph("Attendance Summary", styles['title']),
+        pdf_resources.get_paragraph(report_markdown.escape(title_period), styles['subtitle']),
+    ]
+
+    members = member_summary(frame)
+    if not members:
+        elements.append(pdf_resources.get_paragraph("No attendance has been recorded for this period.",
+                                                    styles['body']))
+        attendance_export.build_document(doc, elements, on_page)
+        return output.getvalue()
+
+    elements.append(pdf_resources.get_paragraph("Member Attendance", styles['subtitle']))
+    rows = [[m['committee'], m['member'], f"{m['attended']}/{m['sessions']}", _percent(m['rate']),
+             _percent(m['virtual_ratio']), str(m['longest_absence_streak']), str(m['current_absence_streak'])]
+            for m in members]
+    elements.append(attendance_export.styled_table(
+        ["Committee", "Member", "Attended", "Rate", "Virtual", "Longest Absence", "Current Absence"],
+        rows, [1.3 * inch, 1.4 * inch, 0.8 * inch, 0.6 * inch, 0.7 * inch, 1.1 * inch, 1.1 * inch],
+        repeat_header=True))
+
+    elements.append(PageBreak())
+    elements.append(pdf_resources.get_paragraph("Committee Trends by Semester", styles['subtitle']))
+    rows = [[t['committee'], t['period'], str(t['sessions']), _percent(t['rate']),
+             _percent(t['virtual_ratio']), _percent(t['quorum_rate'])]
+            for t in committee_trends(frame, 'semester', quorum)]
+    elements.append(attendance_export.styled_table(
+        ["Committee", "Semester", "Sessions", "Attendance", "Virtual", "Quorum Met"],
+        rows, [1.8 * inch, 1.2 * inch, 0.9 * inch, 1.0 * inch, 0.9 * inch, 1.0 * inch],
+        repeat_header=True))
+    elements.append(Spacer(1, 0.2 * inch))
+
+    elements.append(pdf_resources.get_paragraph("Quorum by Session", styles['subtitle']))
+    rows = [[s['committee'], s['date'].strftime('%m/%d/%Y'), f"{s['present']}/{s['members']}",
+             str(s['virtual']), "Yes" if s['quorum_met'] else "No"]
+            for s in session_summary(frame, quorum)]
+    elements.append(attendance_export.styled_table(
+        ["Committee", "Date", "Present", "Virtual", "Quorum"],
+        rows, [2 * inch, 1.2 * inch, 1 * inch, 1 * inch, 1 * inch],
+        repeat_header=True))
+
+    attendance_export.build_document(doc, elements, on_page)
+    return output.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise attendance history and write a summary PDF.")
+    parser.add_argument("--db", help="Attendance database path (default: from the config file)")
+    parser.add_argument("--committee", help="Only include this committee")
+    parser.add_argument("--from", dest="start", help="First date to include (MM/DD/YYYY or YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="Last date to include (MM/DD/YYYY or YYYY-MM-DD)")
+    parser.add_argument("--quorum", type=float, default=DEFAULT_QUORUM,
+                        help="Fraction of members that must be exceeded for quorum (default: 0.5)")
+    parser.add_argument("-o", "--output", help="Write the summary PDF to this path")
+    parser.add_argument("--watermark", help="Watermark image path (default: from the config file)")
+    app_config.add_argument(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.configure(args.trace, args.profile)
+    try:
+        config = app_config.load_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    with attendance_store.AttendanceStore(args.db or config.store_path) as store:
+        load_start = time.perf_counter()
+        frame = AttendanceFrame.from_store(store, args.committee, args.start, args.end)
+    load_time = time.perf_counter() - load_start
+
+    start = time.perf_counter()
+    members = member_summary(frame)
+    sessions = session_summary(frame, args.quorum)
+    trends = committee_trends(frame, 'semester', args.quorum)
+    summary_time = time.perf_counter() - start
+
+    for t in trends:
+        print(f"{t['committee']:<30} {t['period']:<12} sessions={t['sessions']:<4} "
+              f"attendance={_percent(t['rate']):>4} virtual={_percent(t['virtual_ratio']):>4} "
+              f"quorum={_percent(t['quorum_rate']):>4}")
+    print(f"{len(frame)} attendance rows, {len(members)} member record(s), {len(sessions)} session(s): "
+          f"loaded in {load_time:.3f}s, summarised in {summary_time:.3f}s")
+
+    if args.output:
+        warnings = []
+        period = " to ".join(filter(None, [args.start, args.end])) or "All recorded sessions"
+        if args.committee:
+            period = f"{args.committee}: {period}"
+        on_page = attendance_export.make_watermark(args.watermark or config.watermark_path, warnings)
+        with instrumentation.export_trace("summary", path=args.output) as trace:
+            data = summary_pdf_bytes(frame, period, on_page, args.quorum)
+            with trace.stage('write'):
+                with open(args.output, 'wb') as f:
+                    f.write(data)
+            trace.count('bytes_written', len(data))
+        for warning in warnings:
+            print(f"Warning: {warning}", file=sys.stderr)
+        print(f"Summary written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
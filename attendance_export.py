@@ -0,0 +1,635 @@
+"""Headless export engine for attendance records and weekly reports.
+
+Everything in this module works on plain data (lists of attendance rows and
+report text) and returns CSV/PDF bytes, so it can be driven from the desktop
+app or from the command line without starting a QApplication. Nothing here
+imports PyQt6.
+
+Run ``python attendance_export.py SESSIONS_DIR -o OUTPUT_DIR`` to render every
+session file in a directory in a single process.
+"""
+import sys
+import os
+import io
+import csv
+import json
+import argparse
+from datetime import datetime
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import Table, TableStyle, SimpleDocTemplate, Paragraph, Spacer, PageBreak
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+
+import app_config
+import export_archive
+import instrumentation
+import pdf_resources
+import report_markdown
+from attendance_records import (
+    DEFAULT_COMMITTEE, WATERMARK_PATH, ATTENDANCE_HEADERS, ATTENDING_AS_OPTIONS, ATTENDANCE_OPTIONS,
+    DATE_FORMAT, DEFAULT_QUORUM, ExportCancelled, committee_file_prefix, default_filename, normalize_record,
+)
+
+EXPORT_KINDS = ("csv", "pdf", "report", "packet")
+# What the command line tools write when no formats are given
+DEFAULT_EXPORT_KINDS = ("csv", "pdf", "report")
+
+
+def attendance_csv_bytes(records, date_text, committee=DEFAULT_COMMITTEE):
+    """Renders attendance records to CSV bytes in the format written by the app."""
+    buffer = io.StringIO(newline='')
+    write_attendance_csv_stream(records, buffer, date_text, committee)
+    return buffer.getvalue().encode('utf-8')
+
+
+def make_watermark(watermark_path=WATERMARK_PATH, warnings=None, mtime=None):
+    """Returns an onPage callback that draws the full-page watermark.
+
+    The image comes from the shared pdf_resources cache and is looked up once
+    per document; ``mtime`` is passed on to pdf_resources.get_watermark().
+    Problems are appended to ``warnings`` (when given) instead of being shown
+    in a dialog, so the callback is safe to use without a GUI.
+    """
+    resolved = []
+
+    def add_watermark(canvas_obj, doc):
+        if not resolved:
+            try:
+                watermark = pdf_resources.get_watermark(watermark_path, mtime)
+                if watermark is None and warnings is not None:
+                    warnings.append(f"Watermark image not found at {watermark_path}.")
+            except Exception as img_e:
+                watermark = None
+                if warnings is not None:
+                    warnings.append(f"Failed to add watermark image: {img_e}")
+            resolved.append(watermark)
+        watermark = resolved[0]
+        if watermark is not None:
+            with instrumentation.current().stage('watermark'):
+                canvas_obj.saveState()
+                watermark.draw(canvas_obj)
+                canvas_obj.restoreState()
+    return add_watermark
+
+
+def new_document(output, progress=None):
+    """Creates the letter-sized document template used by every export.
+
+    ``progress(done, total)`` is called as flowables are laid out; it may
+    raise ExportCancelled to stop the build.
+    """
+    doc = SimpleDocTemplate(output, pagesize=letter,
+                            rightMargin=72, leftMargin=72,
+                            topMargin=72, bottomMargin=72)
+    if progress is not None:
+        total = [0]
+
+        def on_progress(kind, value):
+            if kind == 'SIZE_EST':
+                total[0] = value
+            elif kind == 'PROGRESS':
+                progress(value, total[0])
+        doc.setProgressCallBack(on_progress)
+    return doc
+
+
+def build_document(doc, flowables, on_page):
+    """Lays out ``flowables`` with ``on_page`` drawn on every page."""
+    trace = instrumentation.current()
+    with trace.stage('layout'):
+        doc.build(flowables, onFirstPage=on_page, onLaterPages=on_page)
+    trace.count('pages', doc.page)
+
+
+ATTENDANCE_COL_WIDTHS = [2 * inch, 2 * inch, 1.5 * inch, 1.5 * inch]
+ATTENDANCE_TABLE_WIDTH = sum(ATTENDANCE_COL_WIDTHS)
+ROW_COLORS = [colors.whitesmoke, colors.lightgrey]
+
+# Rows per table chunk in streaming mode when the page geometry can't be measured
+STREAM_CHUNK_ROWS = 40
+# Rosters with more rows than this are rendered page by page with repeated headers
+STREAM_THRESHOLD_ROWS = 200
+
+
+def attendance_table_style(first_row=1):
+    """Red header and alternating row colours for an attendance table.
+
+    Striping uses a single ROWBACKGROUNDS command; ``first_row`` is the
+    position of the table's first data row in the whole roster, so chunks of a
+    streamed table keep the same colour sequence as one big table.
+    """
+    row_colors = ROW_COLORS if first_row % 2 == 1 else ROW_COLORS[::-1]
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.red),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), row_colors),
+    ])
+
+
+def styled_table(header, rows, col_widths, first_row=1, repeat_header=False):
+    """Builds a centred Table in the attendance table style (red header row,
+    grid and alternating row colours)."""
+    trace = instrumentation.current()
+    with trace.stage('table'):
+        table = Table([list(header)] + rows, colWidths=col_widths,
+                      repeatRows=1 if repeat_header else 0)
+    with trace.stage('table_style'):
+        table.setStyle(attendance_table_style(first_row))
+    table.hAlign = 'CENTER'
+    return table
+
+
+def attendance_table(rows, first_row=1, repeat_header=False):
+    """Builds one attendance Table (header plus ``rows``)."""
+    return styled_table(ATTENDANCE_HEADERS, rows, ATTENDANCE_COL_WIDTHS, first_row, repeat_header)
+
+
+def attendance_heading(committee, date_text):
+    """Title and date paragraphs at the top of the attendance PDF."""
+    styles = pdf_resources.get_styles()
+    return [
+        Paragraph(f"{report_markdown.escape(committee)} Attendance Record", styles['title']),
+        Paragraph(f"Date: {report_markdown.escape(date_text)}", styles['subtitle']),
+    ]
+
+
+def attendance_pdf_bytes(records, date_text, committee=DEFAULT_COMMITTEE, on_page=None, progress=None):
+    """Renders the attendance table to PDF bytes.
+
+    ``on_page`` is the watermark callback; it defaults to make_watermark().
+    Rosters longer than STREAM_THRESHOLD_ROWS are laid out page by page with
+    write_attendance_pdf_stream().
+    """
+    if on_page is None:
+        on_page = make_watermark()
+    records = [normalize_record(r) for r in records]
+    output = io.BytesIO()
+    if len(records) > STREAM_THRESHOLD_ROWS:
+        stream_progress = None
+        if progress is not None:
+            def report_rows(done, _total):
+                progress(done, len(records))
+            stream_progress = report_rows
+        write_attendance_pdf_stream(records, output, date_text, committee, on_page, stream_progress)
+        return output.getvalue()
+
+    instrumentation.current().count('rows', len(records))
+    doc = new_document(output, progress)
+    elements = attendance_heading(committee, date_text)
+    elements.append(attendance_table(records))
+    elements.append(Spacer(1, 0.2 * inch))
+
+    build_document(doc, elements, on_page)
+    return output.getvalue()
+
+
+class _FlowableStream(list):
+    """A flowable list that refills itself from a generator.
+
+    doc.build() consumes its list from the front and checks len() before each
+    flowable, so only the flowables currently being laid out are held in
+    memory.
+    """
+
+    def __init__(self, source):
+        super().__init__()
+        self._source = source
+        self._refill()
+
+    def _refill(self):
+        while list.__len__(self) < 2 and self._source is not None:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._refill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._refill()
+        return list.__getitem__(self, index)
+
+
+def _stream_chunk_sizes(doc, heading):
+    """Works out how many rows fit on the first page (below the heading) and on
+    every later page, so each chunk fills exactly one page."""
+    # The default frame has 6pt of padding on every side
+    width = doc.width - 12
+    available = doc.height - 12
+    sample = attendance_table([["Name", "Position", ATTENDING_AS_OPTIONS[0], ATTENDANCE_OPTIONS[0]]])
+    sample.wrap(width, available)
+    header_height, row_height = sample._rowHeights[0], sample._rowHeights[1]
+    if row_height <= 0:
+        return STREAM_CHUNK_ROWS, STREAM_CHUNK_ROWS
+    heading_height = 0
+    for i, flowable in enumerate(heading):
+        heading_height += flowable.wrap(width, available)[1] + flowable.getSpaceAfter()
+        if i:
+            heading_height += flowable.getSpaceBefore()
+    later = max(1, int((available - header_height - 1) // row_height))
+    first = max(1, int((available - heading_height - header_height - 1) // row_height))
+    return first, later
+
+
+def _attendance_chunks(records, first_size, later_size, progress=None):
+    trace = instrumentation.current()
+    chunk = []
+    size = first_size
+    first_row = 1
+    for record in records:
+        chunk.append(normalize_record(record))
+        if len(chunk) == size:
+            trace.count('rows', len(chunk))
+            yield attendance_table(chunk, first_row, repeat_header=True)
+            first_row += len(chunk)
+            chunk = []
+            size = later_size
+            if progress is not None:
+                progress(first_row - 1, 0)
+    if chunk or first_row == 1:
+        trace.count('rows', len(chunk))
+        yield attendance_table(chunk, first_row, repeat_header=True)
+
+
+def write_attendance_pdf_stream(records, output, date_text, committee=DEFAULT_COMMITTEE, on_page=None,
+                                progress=None):
+    """Writes the attendance PDF for a very large roster to ``output`` (a path
+    or binary file object).
+
+    ``records`` may be any iterable, e.g. a database cursor. Rows are pulled
+    lazily and emitted as page-sized tables, each with its own header row, so
+    memory stays bounded and layout time grows linearly with the row count.
+    ``progress(rows_done, 0)`` is called after each page-sized chunk, since
+    the total isn't known up front.
+    """
+    if on_page is None:
+        on_page = make_watermark()
+    doc = new_document(output)
+    heading = attendance_heading(committee, date_text)
+    first_size, later_size = _stream_chunk_sizes(doc, heading)
+
+    def flowables():
+        yield from heading
+        yield from _attendance_chunks(iter(records), first_size, later_size, progress)
+        yield Spacer(1, 0.2 * inch)
+
+    build_document(doc, _FlowableStream(flowables()), on_page)
+
+
+def write_attendance_csv_stream(records, output, date_text, committee=DEFAULT_COMMITTEE):
+    """Writes attendance rows from any iterable to a text file object as CSV."""
+    trace = instrumentation.current()
+    rows = 0
+    with trace.stage('csv'):
+        writer = csv.writer(output)
+        writer.writerow([f"{committee} Attendance Record ({date_text})"])
+        writer.writerow(ATTENDANCE_HEADERS)
+        for record in records:
+            writer.writerow(normalize_record(record))
+            rows += 1
+    trace.count('rows', rows)
+
+
+def report_block_flowables(block, styles, width):
+    """Turns one report_markdown block into flowables."""
+    if block.kind == 'heading':
+        return [pdf_resources.get_paragraph(block.content, styles[f'heading{block.level}'])]
+    if block.kind == 'bullet':
+        text = f"<bullet>{block.marker}</bullet>{block.content}"
+        return [pdf_resources.get_paragraph(text, styles[f'bullet{block.level + 1}'])]
+    if block.kind == 'table':
+        header, rows = block.content
+        col_widths = [(width - 12) / len(header)] * len(header)
+        header = [pdf_resources.get_paragraph(cell, styles['table_header']) for cell in header]
+        rows = [[pdf_resources.get_paragraph(cell, styles['table_cell']) for cell in row] for row in rows]
+        return [styled_table(header, rows, col_widths, repeat_header=True), Spacer(1, 0.2 * inch)]
+    return [pdf_resources.get_paragraph(block.content, styles['body']), Spacer(1, 0.1 * inch)]
+
+
+def report_flowables(report_text, styles, width):
+    """Returns the flowables for the body of a weekly report. Each block's
+    flowables carry the block index as ``tag``."""
+    elements = []
+    blocks = list(report_markdown.parse_blocks(report_text))
+    if not blocks:
+        return [pdf_resources.get_paragraph("No weekly report content provided.", styles['body']),
+                Spacer(1, 0.1 * inch)]
+    for index, block in enumerate(blocks):
+        flowables = report_block_flowables(block, styles, width)
+        for flowable in flowables:
+            flowable.tag = index
+        elements.extend(flowables)
+        # A list is spaced like one paragraph
+        if block.kind == 'bullet' and (index + 1 == len(blocks) or blocks[index + 1].kind != 'bullet'):
+            elements.append(Spacer(1, 0.1 * inch))
+    return elements
+
+
+def weekly_report_pdf_bytes(report_text, date_text, committee=DEFAULT_COMMITTEE, on_page=None, progress=None,
+                            block_pages=None):
+    """Renders the weekly report text to PDF bytes.
+
+    The text is Markdown-style (headings, lists, bold/italic and pipe tables,
+    see report_markdown); plain paragraphs are separated by blank lines and
+    single newlines are kept as line breaks. ``on_page`` is the watermark
+    callback. Paragraphs come from the pdf_resources cache, so only blocks
+    that changed since the last export are parsed and measured again. If
+    ``block_pages`` is a list, it is filled with the page number each report
+    block starts on.
+    """
+    if on_page is None:
+        on_page = make_watermark()
+    output = io.BytesIO()
+    doc = new_document(output, progress)
+    styles = pdf_resources.get_styles()
+    elements = []
+
+    # Title
+    elements.append(pdf_resources.get_paragraph(
+        f"{report_markdown.escape(committee)} Weekly Report", styles['title']))
+
+    # Date as Subtitle
+    elements.append(pdf_resources.get_paragraph(f"Date: {report_markdown.escape(date_text)}", styles['subtitle']))
+
+    # Weekly Report Content
+    elements.extend(report_flowables(report_text, styles, doc.width))
+
+    if block_pages is not None:
+        def after_flowable(flowable):
+            # The first piece of each block to be drawn marks its page
+            tag = getattr(flowable, 'tag', None)
+            if tag is not None and tag >= len(block_pages):
+                block_pages.extend([doc.page] * (tag + 1 - len(block_pages)))
+        doc.afterFlowable = after_flowable
+
+    build_document(doc, elements, on_page)
+    return output.getvalue()
+
+
+def attendance_summary(records, quorum=DEFAULT_QUORUM):
+    """Counts members, attendance and attendance mode for one meeting.
+
+    Rows without a name (blank sign-in rows) are not counted. Quorum is met
+    when more than ``quorum`` of the members attended.
+    """
+    summary = {'members': 0, 'attending': 0, 'in_person': 0, 'virtual': 0, 'absent': 0}
+    for name, _position, attending_as, attendance in records:
+        if not name.strip():
+            continue
+        summary['members'] += 1
+        if attendance == ATTENDANCE_OPTIONS[0]:
+            summary['attending'] += 1
+            summary['in_person' if attending_as == ATTENDING_AS_OPTIONS[0] else 'virtual'] += 1
+        else:
+            summary['absent'] += 1
+    summary['quorum_met'] = summary['attending'] > summary['members'] * quorum
+    return summary
+
+
+def attendance_summary_table(summary):
+    """A one-row table of attendance_summary() counts."""
+    header = ["Members", "Attending", "In-Person", "Virtual", "Absent", "Quorum"]
+    row = [str(summary['members']), str(summary['attending']), str(summary['in_person']),
+           str(summary['virtual']), str(summary['absent']), "Met" if summary['quorum_met'] else "Not met"]
+    return styled_table(header, [row], [ATTENDANCE_TABLE_WIDTH / len(header)] * len(header))
+
+
+def _section(flowable, title):
+    # afterFlowable in meeting_packet_pdf_bytes adds an outline entry for it
+    flowable.outline = title
+    return flowable
+
+
+def meeting_packet_pdf_bytes(records, report_text, date_text, committee=DEFAULT_COMMITTEE, prior_sessions=(),
+                             on_page=None, progress=None):
+    """Renders a meeting packet to PDF bytes in a single document build.
+
+    The packet has a cover page (attendance summary and contents), the
+    attendance record, the weekly report and, when ``prior_sessions`` (a
+    list of (date_text, records) pairs) is not empty, an appendix with the
+    attendance of those meetings. Every page shares one watermark, drawn by
+    ``on_page`` and embedded once, and the standard fonts, so the packet is
+    smaller and quicker to build than the separate exports. Sections get PDF
+    outline entries.
+    """
+    if on_page is None:
+        on_page = make_watermark()
+    records = [normalize_record(r) for r in records]
+    prior_sessions = [(prior_date, [normalize_record(r) for r in prior_records])
+                      for prior_date, prior_records in prior_sessions]
+    output = io.BytesIO()
+    doc = new_document(output, progress)
+    styles = pdf_resources.get_styles()
+    committee_text = report_markdown.escape(committee)
+    date_markup = report_markdown.escape(date_text)
+
+    # Cover page
+    elements = [
+        pdf_resources.get_paragraph(f"{committee_text} Meeting Packet", styles['title']),
+        pdf_resources.get_paragraph(f"Date: {date_markup}", styles['subtitle']),
+        attendance_summary_table(attendance_summary(records)),
+        Spacer(1, 0.3 * inch),
+        pdf_resources.get_paragraph("Contents", styles['heading2']),
+    ]
+    contents = ["Attendance Record", "Weekly Report"]
+    if prior_sessions:
+        contents.append(f"Appendix: Prior Sessions ({len(prior_sessions)})")
+    for number, title in enumerate(contents, start=1):
+        elements.append(pdf_resources.get_paragraph(f"<bullet>{number}.</bullet>{title}", styles['bullet1']))
+
+    # Attendance, in page-sized tables like the streamed attendance PDF
+    elements.append(PageBreak())
+    heading = attendance_heading(committee, date_text)
+    _section(heading[0], "Attendance Record")
+    first_size, later_size = _stream_chunk_sizes(doc, heading)
+    elements.extend(heading)
+    elements.extend(_attendance_chunks(records, first_size, later_size))
+
+    # Weekly report
+    elements.append(PageBreak())
+    elements.append(_section(pdf_resources.get_paragraph(f"{committee_text} Weekly Report", styles['title']),
+                             "Weekly Report"))
+    elements.append(pdf_resources.get_paragraph(f"Date: {date_markup}", styles['subtitle']))
+    elements.extend(report_flowables(report_text, styles, doc.width))
+
+    # Prior sessions
+    if prior_sessions:
+        elements.append(PageBreak())
+        elements.append(_section(pdf_resources.get_paragraph("Appendix: Prior Sessions", styles['title']),
+                                 "Appendix: Prior Sessions"))
+        for prior_date, prior_records in prior_sessions:
+            elements.append(pdf_resources.get_paragraph(
+                f"Meeting of {report_markdown.escape(prior_date)}", styles['heading2']))
+            elements.append(attendance_summary_table(attendance_summary(prior_records)))
+            elements.append(Spacer(1, 0.1 * inch))
+            instrumentation.current().count('rows', len(prior_records))
+            elements.append(attendance_table(prior_records, repeat_header=True))
+            elements.append(Spacer(1, 0.2 * inch))
+
+    sections = []
+
+    def after_flowable(flowable):
+        title = getattr(flowable, 'outline', None)
+        if title is not None:
+            key = f"section{len(sections)}"
+            sections.append(key)
+            doc.canv.bookmarkPage(key)
+            doc.canv.addOutlineEntry(title, key, level=0)
+    doc.afterFlowable = after_flowable
+
+    build_document(doc, elements, on_page)
+    return output.getvalue()
+
+
+def load_session(path):
+    """Reads a session file.
+
+    A session is a JSON object with a ``date`` (MM/DD/YYYY), an optional
+    ``committee`` name, a ``records`` list of attendance rows (lists or
+    dicts with name/position/attending_as/attendance), an optional
+    ``report`` string and an optional ``prior_sessions`` list of earlier
+    meetings (objects with a ``date`` and ``records``) for the appendix of
+    the meeting packet.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        session = json.load(f)
+    if 'date' not in session:
+        raise ValueError(f"{path}: session is missing a 'date'")
+    session['date_obj'] = datetime.strptime(session['date'], DATE_FORMAT)
+    session.setdefault('committee', DEFAULT_COMMITTEE)
+    session['records'] = [normalize_record(r) for r in session.get('records', [])]
+    session.setdefault('report', '')
+    session['prior_sessions'] = [(prior['date'], [normalize_record(r) for r in prior.get('records', [])])
+                                 for prior in session.get('prior_sessions', [])]
+    return session
+
+
+def find_session_files(directory):
+    """Returns every *.json session file under ``directory`` in sorted order."""
+    found = []
+    for root, _dirs, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith('.json'):
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def render_session(session, kind, watermark_path=WATERMARK_PATH, warnings=None):
+    """Renders one export kind for a loaded session and returns the bytes."""
+    committee = session['committee']
+    date_text = session['date']
+    if kind == "csv":
+        return attendance_csv_bytes(session['records'], date_text, committee)
+    on_page = make_watermark(watermark_path, warnings)
+    if kind == "pdf":
+        return attendance_pdf_bytes(session['records'], date_text, committee, on_page)
+    if kind == "report":
+        return weekly_report_pdf_bytes(session['report'], date_text, committee, on_page)
+    if kind == "packet":
+        return meeting_packet_pdf_bytes(session['records'], session['report'], date_text, committee,
+                                        session['prior_sessions'], on_page)
+    raise ValueError(f"Unknown export kind: {kind}")
+
+
+def write_export_file(path, data):
+    """Writes ``data`` to a temporary file next to ``path`` and swaps it in.
+
+    The temporary name carries the process id, so processes exporting the
+    same session at once never write into each other's file, and readers
+    only ever see a complete export. Nothing is left behind on failure.
+    """
+    partial_path = f"{path}.{os.getpid()}.part"
+    try:
+        with open(partial_path, 'wb') as f:
+            f.write(data)
+        os.replace(partial_path, path)
+    except BaseException:
+        try:
+            os.remove(partial_path)
+        except OSError:
+            pass
+        raise
+
+
+def export_session(session, output_dir, kinds=DEFAULT_EXPORT_KINDS, watermark_path=WATERMARK_PATH,
+                   archive_dir=None, compress_csv=False):
+    """Writes the requested exports for a session and returns (paths, warnings).
+
+    With ``archive_dir`` each export is also added to that export archive.
+    """
+    written = []
+    warnings = []
+    for kind in kinds:
+        if kind == "report" and not session['report'].strip():
+            continue
+        path = os.path.join(output_dir, default_filename(kind, session['committee'], session['date_obj']))
+        with instrumentation.export_trace(kind, path=path) as trace:
+            data = render_session(session, kind, watermark_path, warnings)
+            with trace.stage('write'):
+                write_export_file(path, data)
+            trace.count('bytes_written', len(data))
+        if archive_dir:
+            export_archive.archive_export(archive_dir, data, session['committee'], session['date_obj'], kind,
+                                          path, warnings, compress_csv)
+        written.append(path)
+    return written, warnings
+
+
+def parse_kinds(value):
+    kinds = [k.strip() for k in value.split(',') if k.strip()]
+    for kind in kinds:
+        if kind not in EXPORT_KINDS:
+            raise argparse.ArgumentTypeError(
+                f"unknown format '{kind}' (choose from {', '.join(EXPORT_KINDS)})")
+    return kinds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render attendance CSV/PDFs and weekly reports for a directory of session files.")
+    parser.add_argument("sessions", help="Directory containing session *.json files")
+    parser.add_argument("-o", "--output", default=".", help="Directory to write exports into")
+    parser.add_argument("-f", "--formats", type=parse_kinds, default=list(DEFAULT_EXPORT_KINDS),
+                        help="Comma separated list of csv, pdf, report, packet (default: csv,pdf,report)")
+    parser.add_argument("--watermark", help="Watermark image path (default: from the config file)")
+    app_config.add_argument(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.configure(args.trace, args.profile)
+    try:
+        config = app_config.load_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    watermark_path = args.watermark or config.watermark_path
+
+    os.makedirs(args.output, exist_ok=True)
+    failures = 0
+    count = 0
+    reported_warnings = set()
+    for path in find_session_files(args.sessions):
+        try:
+            session = load_session(path)
+            written, warnings = export_session(session, args.output, args.formats, watermark_path,
+                                               config.archive_dir, config.archive_compress_csv)
+        except Exception as e:
+            failures += 1
+            print(f"Error exporting {path}: {e}", file=sys.stderr)
+            continue
+        count += len(written)
+        for warning in warnings:
+            if warning not in reported_warnings:
+                reported_warnings.add(warning)
+                print(f"Warning: {warning}", file=sys.stderr)
+    print(f"Wrote {count} file(s) to {args.output}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
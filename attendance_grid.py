@@ -0,0 +1,280 @@
+"""Model/view attendance grid.
+
+The attendance tab used to create two QLineEdits and two QComboBoxes per row,
+so startup time and memory grew with the roster. Rows now live in a compact
+AttendanceRows store (parallel columns, with the two choice columns kept as
+byte arrays) exposed through a QAbstractTableModel. The QTableView only
+paints the visible rows, and an editor widget exists only for the cell being
+edited.
+
+Name and position cells autocomplete from a member_search.MemberDirectory once
+one is attached with set_member_directory(); picking a known name also fills
+in an empty position.
+"""
+from array import array
+from PyQt6.QtWidgets import (
+    QTableView, QStyledItemDelegate, QComboBox, QHeaderView, QAbstractItemView, QCompleter
+)
+from PyQt6.QtGui import QColor, QFont
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QStringListModel
+
+from attendance_records import ATTENDANCE_HEADERS, ATTENDING_AS_OPTIONS, ATTENDANCE_OPTIONS
+
+NAME, POSITION, ATTENDING_AS, ATTENDANCE = range(4)
+CHOICES = {ATTENDING_AS: ATTENDING_AS_OPTIONS, ATTENDANCE: ATTENDANCE_OPTIONS}
+PLACEHOLDERS = {NAME: "Enter name", POSITION: "Enter position"}
+
+
+def attach_completer(line_edit, suggest):
+    """Pops up ``suggest(text)`` under ``line_edit`` as the user types. The
+    suggestions arrive ranked (and may be fuzzy), so Qt's own prefix
+    filtering is turned off."""
+    model = QStringListModel(line_edit)
+    completer = QCompleter(model, line_edit)
+    completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+    completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    line_edit.setCompleter(completer)
+
+    def update(text):
+        model.setStringList(suggest(text) if text.strip() else [])
+        if model.rowCount():
+            completer.complete()
+        else:
+            completer.popup().hide()
+
+    line_edit.textEdited.connect(update)
+    return completer
+
+
+class AttendanceRows:
+    """Compact storage for the grid: one list per text column and one byte
+    array per choice column (an index into its options).
+
+    Iterating yields [name, position, attending_as, attendance] rows, the
+    same shape the exporters and the store use.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.positions = []
+        self.attending_as = array('b')
+        self.attendance = array('b')
+
+    @classmethod
+    def from_records(cls, records, minimum_rows=0):
+        """Builds rows from [name, position, attending_as, attendance] records,
+        padded with blank rows up to ``minimum_rows``."""
+        rows = cls()
+        for name, position, attending_as, attendance in records:
+            rows.append(name, position, ATTENDING_AS_OPTIONS.index(attending_as),
+                        ATTENDANCE_OPTIONS.index(attendance))
+        for _ in range(len(records), minimum_rows):
+            rows.append()
+        return rows
+
+    @classmethod
+    def from_members(cls, members, minimum_rows=0):
+        """Builds rows from roster dicts (name and position), padded with blank
+        rows up to ``minimum_rows``."""
+        rows = cls()
+        for member in members:
+            rows.append(member['name'], member['position'])
+        for _ in range(len(members), minimum_rows):
+            rows.append()
+        return rows
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        for i in range(len(self.names)):
+            yield self.row(i)
+
+    def row(self, i):
+        return [self.names[i], self.positions[i],
+                ATTENDING_AS_OPTIONS[self.attending_as[i]], ATTENDANCE_OPTIONS[self.attendance[i]]]
+
+    def append(self, name='', position='', attending_as=0, attendance=0):
+        self.names.append(name)
+        self.positions.append(position)
+        self.attending_as.append(attending_as)
+        self.attendance.append(attendance)
+
+    def pop(self):
+        self.attending_as.pop()
+        self.attendance.pop()
+        return [self.names.pop(), self.positions.pop()]
+
+    def clear(self):
+        self.__init__()
+
+    def get(self, row, column):
+        if column == NAME:
+            return self.names[row]
+        if column == POSITION:
+            return self.positions[row]
+        if column == ATTENDING_AS:
+            return ATTENDING_AS_OPTIONS[self.attending_as[row]]
+        return ATTENDANCE_OPTIONS[self.attendance[row]]
+
+    def set(self, row, column, value):
+        if column == NAME:
+            self.names[row] = value
+        elif column == POSITION:
+            self.positions[row] = value
+        elif column == ATTENDING_AS:
+            self.attending_as[row] = ATTENDING_AS_OPTIONS.index(value)
+        else:
+            self.attendance[row] = ATTENDANCE_OPTIONS.index(value)
+
+
+class AttendanceTableModel(QAbstractTableModel):
+    """Table model over an AttendanceRows store."""
+
+    def __init__(self, rows=None, parent=None):
+        super().__init__(parent)
+        self.rows = rows if rows is not None else AttendanceRows()
+        self._header_font = QFont("Arial", 12, QFont.Weight.Bold)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(ATTENDANCE_HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self.rows.get(index.row(), index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole and index.column() in CHOICES:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        if index.column() in CHOICES and value not in CHOICES[index.column()]:
+            return False
+        self.rows.set(index.row(), index.column(), value)
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return ATTENDANCE_HEADERS[section]
+            if role == Qt.ItemDataRole.FontRole:
+                return self._header_font
+        elif role == Qt.ItemDataRole.DisplayRole:
+            return str(section + 1)
+        return None
+
+    def set_members(self, members, minimum_rows=0):
+        """Replaces every row with ``members`` (dicts with name and position),
+        padding with blank rows up to ``minimum_rows``."""
+        self.beginResetModel()
+        self.rows.clear()
+        for member in members:
+            self.rows.append(member['name'], member['position'])
+        for _ in range(len(members), minimum_rows):
+            self.rows.append()
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        """Shows another AttendanceRows store; the old one is left untouched."""
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def append_row(self, name='', position=''):
+        row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.rows.append(name, position)
+        self.endInsertRows()
+        return row
+
+    def remove_last_row(self):
+        row = len(self.rows) - 1
+        if row < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.rows.pop()
+        self.endRemoveRows()
+        return True
+
+
+class AttendanceDelegate(QStyledItemDelegate):
+    """Combo box editors for the choice columns, autocomplete for names and
+    positions, and greyed placeholder text for empty name/position cells."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.directory = None
+
+    def createEditor(self, parent, option, index):
+        if index.column() in CHOICES:
+            editor = QComboBox(parent)
+            editor.addItems(CHOICES[index.column()])
+            # Commit as soon as a choice is picked instead of waiting for focus out
+            editor.activated.connect(lambda _i, e=editor: self.commitData.emit(e))
+            return editor
+        editor = super().createEditor(parent, option, index)
+        if index.column() in PLACEHOLDERS:
+            editor.setPlaceholderText(PLACEHOLDERS[index.column()])
+        if self.directory is not None and index.column() in (NAME, POSITION):
+            suggest = self.directory.complete_names if index.column() == NAME else self.directory.complete_positions
+            completer = attach_completer(editor, suggest)
+            completer.activated.connect(lambda _text, e=editor: self.commitData.emit(e))
+        return editor
+
+    def setEditorData(self, editor, index):
+        if isinstance(editor, QComboBox):
+            editor.setCurrentText(index.data(Qt.ItemDataRole.EditRole))
+        else:
+            super().setEditorData(editor, index)
+
+    def setModelData(self, editor, model, index):
+        if isinstance(editor, QComboBox):
+            model.setData(index, editor.currentText(), Qt.ItemDataRole.EditRole)
+            return
+        super().setModelData(editor, model, index)
+        if index.column() == NAME and self.directory is not None:
+            position = index.siblingAtColumn(POSITION)
+            if not position.data(Qt.ItemDataRole.EditRole):
+                known = self.directory.position_of(editor.text())
+                if known:
+                    model.setData(position, known, Qt.ItemDataRole.EditRole)
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        if not option.text and index.column() in PLACEHOLDERS:
+            option.text = PLACEHOLDERS[index.column()]
+            option.palette.setColor(option.palette.ColorRole.Text, QColor("gray"))
+
+
+class AttendanceTableView(QTableView):
+    """Table view styled like the old grid (red header, stretched columns)."""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(AttendanceDelegate(self))
+        self.setAlternatingRowColors(True)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectItems)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.AllEditTriggers)
+        header = self.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        header.setStyleSheet("QHeaderView::section { background-color: red; color: white; padding: 5px; }")
+        # Uniform row heights let the view skip measuring every row
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.verticalHeader().setDefaultSectionSize(30)
+
+    def set_member_directory(self, directory):
+        """Autocompletes names and positions from ``directory`` (None turns it off)."""
+        self.itemDelegate().directory = directory
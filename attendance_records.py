@@ -0,0 +1,65 @@
+"""Attendance record shapes and names shared by the app, the exporters and
+the importers.
+
+This module only uses the standard library, so the desktop window can import
+it at startup without loading ReportLab; the PDF stack is loaded on first
+export through attendance_export.
+"""
+from datetime import datetime
+
+DEFAULT_COMMITTEE = "Tech Fee Committee"
+WATERMARK_PATH = r"C:\scsuimage\sga.jpg"
+ATTENDANCE_HEADERS = ["Member Name", "Position", "Virtual/In-Person", "Attendance"]
+ATTENDING_AS_OPTIONS = ["In-Person", "Virtual"]
+ATTENDANCE_OPTIONS = ["Attending", "Absent"]
+DATE_FORMAT = "%m/%d/%Y"
+# A session has quorum when more than this fraction of its members attended
+DEFAULT_QUORUM = 0.5
+
+
+def committee_file_prefix(committee):
+    """Turns a committee name into the prefix used for exported file names.
+
+    Characters that are unsafe in file names (such as path separators) are
+    treated like spaces.
+    """
+    safe = "".join(c if c.isalnum() or c in "-_.&'()" else " " for c in committee)
+    return "_".join(safe.split())
+
+
+def default_filename(kind, committee=DEFAULT_COMMITTEE, date=None):
+    """Returns the conventional file name for an export, e.g.
+    Tech_Fee_Committee_Attendance_09-20-2024.pdf."""
+    if date is None:
+        date = datetime.now()
+    stamp = date.strftime('%m-%d-%Y')
+    prefix = committee_file_prefix(committee)
+    if kind == "csv":
+        return f"{prefix}_Attendance_{stamp}.csv"
+    if kind == "pdf":
+        return f"{prefix}_Attendance_{stamp}.pdf"
+    if kind == "report":
+        return f"{prefix}_Weekly_Report_{stamp}.pdf"
+    if kind == "packet":
+        return f"{prefix}_Meeting_Packet_{stamp}.pdf"
+    raise ValueError(f"Unknown export kind: {kind}")
+
+
+def normalize_record(record):
+    """Accepts a [name, position, attending_as, attendance] row or a dict with
+    the same fields and returns the list form used by the exporters."""
+    if isinstance(record, dict):
+        return [
+            record.get('name', ''),
+            record.get('position', ''),
+            record.get('attending_as', ATTENDING_AS_OPTIONS[0]),
+            record.get('attendance', ATTENDANCE_OPTIONS[0]),
+        ]
+    row = list(record)
+    if len(row) != 4:
+        raise ValueError(f"Attendance rows need 4 fields, got {len(row)}: {row!r}")
+    return row
+
+
+class ExportCancelled(Exception):
+    """Raised from a progress callback to abandon an export part way."""
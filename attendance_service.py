@@ -0,0 +1,496 @@
+"""Local HTTP/JSON service for recording attendance from many devices.
+
+Tablets and phones on the meeting network check members in at the same time
+instead of one person typing into the desktop grid:
+
+    python attendance_service.py --host 0.0.0.0 --port 8765
+
+Endpoints (request and response bodies are JSON; dates are MM/DD/YYYY or
+YYYY-MM-DD and default to today)::
+
+    GET  /committees                            {"committees": [...]}
+    GET  /roster?committee=NAME                 {"committee", "members": [{"name", "position"}]}
+    GET  /session?committee=NAME&date=DATE      {"committee", "date", "records": [[...], ...]}
+    POST /checkin  {"committee", "name", "date", "position", "attending_as", "attendance"}
+    POST /export   {"committee", "date", "formats", "report"}      202 {"job": ID}
+    GET  /export/ID                             {"job", "status", "files", "warnings", "error"}
+    GET  /stats                                 check-in and batch counters
+
+Only ``committee`` and ``name`` are required for a check-in. Check-ins are
+not committed one transaction each: they queue up, and a single writer
+thread commits everything that has arrived (up to MAX_BATCH) in one
+transaction while the next batch collects, so a room checking in at once
+costs a handful of commits. A check-in is answered once its batch is
+committed. Exports run in a pool of worker processes, as in batch_render, so
+a PDF build never holds up check-ins; poll ``/export/ID`` until its status
+is ``done`` or ``failed``. Finished jobs are forgotten after JOB_TTL
+seconds, or sooner once MAX_FINISHED_JOBS newer ones have finished.
+SIGTERM or Ctrl+C stops the service cleanly: requests in progress are
+answered, running exports finish, queued ones are cancelled and the worker
+processes exit.
+
+The service writes to the same attendance.db as the app (which picks the
+check-ins up through its file watcher) and reads the same config file.
+There is no authentication, so it listens on 127.0.0.1 unless ``--host``
+says otherwise. The HTTP handling is a small HTTP/1.1 subset on asyncio
+streams, with keep-alive, so only the standard library is needed (plus
+ReportLab for the exports).
+"""
+import sys
+import os
+import json
+import time
+import signal
+import asyncio
+import argparse
+import itertools
+import multiprocessing
+from datetime import date
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import app_config
+import attendance_export
+import attendance_store
+import instrumentation
+from attendance_records import ATTENDING_AS_OPTIONS, ATTENDANCE_OPTIONS, DATE_FORMAT, WATERMARK_PATH
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Check-ins committed together at most
+MAX_BATCH = 500
+MAX_BODY_BYTES = 64 * 1024
+# Pending connections the listening socket holds; a whole room connects at once
+BACKLOG = 1024
+# Seconds requests in progress get to finish when the service is stopped
+CLOSE_TIMEOUT = 5
+# Finished export jobs can be polled for this many seconds, and only the
+# most recent ones are kept
+JOB_TTL = 3600
+MAX_FINISHED_JOBS = 1000
+
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large", 414: "URI Too Long",
+            431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class ServiceError(Exception):
+    """An error reported to the client with an HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def export_job(session, output_dir, kinds, watermark_path, archive_dir=None, compress_csv=False):
+    """Renders one export request in a worker process; returns (paths, warnings)."""
+    written, warnings = attendance_export.export_session(session, output_dir, kinds, watermark_path,
+                                                         archive_dir, compress_csv)
+    # Every document repeats a missing-watermark warning
+    return written, list(dict.fromkeys(warnings))
+
+
+class StoreWriter:
+    """Owns the store connection on a single thread and batches check-ins.
+
+    SQLite connections belong to the thread that opened them, so every store
+    call, read or write, goes through ``call()``.
+    """
+
+    def __init__(self, store_path):
+        self.store_path = store_path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="attendance-store")
+        self._store = None
+        self._pending = None
+        self._task = None
+        self.check_ins = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    def _run(self, method, *args):
+        if self._store is None:
+            self._store = attendance_store.AttendanceStore(self.store_path)
+        return getattr(self._store, method)(*args)
+
+    async def call(self, method, *args):
+        """Runs ``store.method(*args)`` on the store thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._run, method, *args)
+
+    def start(self):
+        self._pending = asyncio.Queue()
+        self._task = asyncio.create_task(self._write_batches())
+
+    async def check_in(self, check_in):
+        """Queues one (committee, date, name, position, attending_as,
+        attendance) check-in and returns once it has been committed."""
+        done = asyncio.get_running_loop().create_future()
+        self._pending.put_nowait((check_in, done))
+        await done
+
+    async def _write_batches(self):
+        while True:
+            batch = [await self._pending.get()]
+            # Everything that arrived while the last batch was being committed
+            while len(batch) < MAX_BATCH and not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            try:
+                await self.call('record_check_ins', [check_in for check_in, _ in batch])
+            except Exception as e:
+                for _, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+                continue
+            self.check_ins += len(batch)
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for _, done in batch:
+                if not done.done():
+                    done.set_result(None)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._store is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._store.close)
+        self._executor.shutdown()
+
+
+class AttendanceService:
+    """The request handlers, the store writer and the export pool."""
+
+    def __init__(self, store_path, output_dir, watermark_path=WATERMARK_PATH, workers=None,
+                 archive_dir=None, compress_csv=False):
+        self.writer = StoreWriter(store_path)
+        self.output_dir = output_dir
+        self.watermark_path = watermark_path
+        self.archive_dir = archive_dir
+        self.compress_csv = compress_csv
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self._pool = None
+        self._committees = set()
+        self._job_ids = itertools.count(1)
+        self.jobs = {}
+        self._finished_jobs = {}   # job id -> time.monotonic() it finished, oldest first
+        self._connections = set()  # connection handler tasks
+        self._idle = set()         # writers of connections waiting for a request
+        self._closing = False
+        self._routes = {
+            ('GET', '/committees'): self.get_committees,
+            ('GET', '/roster'): self.get_roster,
+            ('GET', '/session'): self.get_session,
+            ('POST', '/checkin'): self.post_check_in,
+            ('POST', '/export'): self.post_export,
+            ('GET', '/stats'): self.get_stats,
+        }
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Starts listening and returns the asyncio server."""
+        self.writer.start()
+        return await asyncio.start_server(self.handle_connection, host, port, backlog=BACKLOG)
+
+    async def close(self):
+        """Stops the store writer and the export pool. Exports not yet started
+        are cancelled; running ones are waited for, off the event loop.
+        Idle connections are closed now, busy ones once their request is
+        answered."""
+        self._closing = True
+        for writer in self._idle:
+            writer.close()
+        if self._connections:
+            await asyncio.wait(self._connections, timeout=CLOSE_TIMEOUT)
+        await self.writer.close()
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: pool.shutdown(wait=True, cancel_futures=True))
+
+    # HTTP
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while not self._closing:
+                self._idle.add(writer)
+                try:
+                    request = await self._read_request(reader)
+                except ServiceError as e:
+                    await self._respond(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                finally:
+                    self._idle.discard(writer)
+                if request is None:
+                    break
+                method, target, keep_alive, body = request
+                status, payload = await self.dispatch(method, target, body)
+                keep_alive = keep_alive and not self._closing
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    @staticmethod
+    async def _read_line(reader, status, what):
+        """Reads one line; a line over the stream's limit (64 KiB) is answered
+        with ``status``."""
+        try:
+            return await reader.readline()
+        except ValueError:
+            # readline() turns asyncio.LimitOverrunError into ValueError
+            raise ServiceError(status, f"{what} too long") from None
+
+    async def _read_request(self, reader):
+        """Returns (method, target, keep_alive, body), or None at end of stream."""
+        line = await self._read_line(reader, 414, "request line")
+        if not line.strip():
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise ServiceError(400, "malformed request line") from None
+        headers = {}
+        while True:
+            line = await self._read_line(reader, 431, "header line")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise ServiceError(400, "bad Content-Length") from None
+        if length > MAX_BODY_BYTES:
+            raise ServiceError(413, f"request body over {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length > 0 else b''
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        return method.upper(), target, keep_alive, body
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def dispatch(self, method, target, body):
+        """Runs the handler for one request and returns (status, payload)."""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        path = url.path.rstrip('/') or '/'
+        try:
+            if path.startswith('/export/') and method == 'GET':
+                return 200, self.get_export(path[len('/export/'):])
+            handler = self._routes.get((method, path))
+            if handler is None:
+                if any(route_path == path for _, route_path in self._routes):
+                    raise ServiceError(405, f"{method} is not supported on {path}")
+                raise ServiceError(404, f"no such endpoint: {path}")
+            if method == 'POST':
+                try:
+                    data = json.loads(body or b'{}')
+                except ValueError as e:
+                    raise ServiceError(400, f"invalid JSON: {e}") from None
+                if not isinstance(data, dict):
+                    raise ServiceError(400, "expected a JSON object")
+                return await handler(data)
+            return 200, await handler(query)
+        except ServiceError as e:
+            return e.status, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+
+    # Validation
+
+    async def _committee(self, fields):
+        committee = fields.get('committee')
+        if not isinstance(committee, str) or not committee.strip():
+            raise ServiceError(400, "'committee' is required")
+        committee = committee.strip()
+        if committee not in self._committees:
+            # Committees are only added from the app, so refresh on a miss
+            self._committees = set(await self.writer.call('committees'))
+            if committee not in self._committees:
+                raise ServiceError(404, f"unknown committee: {committee}")
+        return committee
+
+    @staticmethod
+    def _date(fields):
+        value = fields.get('date') or date.today()
+        try:
+            return attendance_store.to_iso_date(value)
+        except (TypeError, ValueError):
+            raise ServiceError(400, f"bad date {value!r} (use MM/DD/YYYY or YYYY-MM-DD)") from None
+
+    @staticmethod
+    def _choice(fields, key, options):
+        value = fields.get(key, options[0])
+        if value not in options:
+            raise ServiceError(400, f"'{key}' must be one of {', '.join(options)}")
+        return value
+
+    # Handlers
+
+    async def get_committees(self, query):
+        self._committees = set(await self.writer.call('committees'))
+        return {'committees': sorted(self._committees)}
+
+    async def get_roster(self, query):
+        committee = await self._committee(query)
+        return {'committee': committee, 'members': await self.writer.call('roster', committee)}
+
+    async def get_session(self, query):
+        committee = await self._committee(query)
+        iso = self._date(query)
+        return {'committee': committee, 'date': iso,
+                'records': await self.writer.call('session_records', committee, iso)}
+
+    async def post_check_in(self, data):
+        committee = await self._committee(data)
+        name = data.get('name')
+        if not isinstance(name, str) or not name.strip():
+            raise ServiceError(400, "'name' is required")
+        position = data.get('position') or ''
+        if not isinstance(position, str):
+            raise ServiceError(400, "'position' must be a string")
+        check_in = (committee, self._date(data), name.strip(), position.strip(),
+                    self._choice(data, 'attending_as', ATTENDING_AS_OPTIONS),
+                    self._choice(data, 'attendance', ATTENDANCE_OPTIONS))
+        await self.writer.check_in(check_in)
+        return 200, {'committee': committee, 'date': check_in[1], 'name': check_in[2],
+                     'attending_as': check_in[4], 'attendance': check_in[5]}
+
+    async def post_export(self, data):
+        committee = await self._committee(data)
+        iso = self._date(data)
+        kinds = data.get('formats') or list(attendance_export.DEFAULT_EXPORT_KINDS)
+        if not isinstance(kinds, list) or any(kind not in attendance_export.EXPORT_KINDS for kind in kinds):
+            raise ServiceError(400, f"'formats' must be a list of {', '.join(attendance_export.EXPORT_KINDS)}")
+        report = data.get('report') or ''
+        if not isinstance(report, str):
+            raise ServiceError(400, "'report' must be a string")
+        records = await self.writer.call('session_records', committee, iso)
+        if not records:
+            raise ServiceError(404, f"no attendance recorded for {committee} on {iso}")
+
+        session_date = date.fromisoformat(iso)
+        session = {'committee': committee, 'date': session_date.strftime(DATE_FORMAT),
+                   'date_obj': session_date, 'records': records, 'report': report, 'prior_sessions': []}
+        self._expire_jobs()
+        job_id = str(next(self._job_ids))
+        job = self.jobs[job_id] = {'job': job_id, 'status': 'queued', 'files': [], 'warnings': [], 'error': None}
+        if self._pool is None:
+            # Spawned, not forked: this process already runs the store thread
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        os.makedirs(self.output_dir, exist_ok=True)
+        future = asyncio.get_running_loop().run_in_executor(
+            self._pool, export_job, session, self.output_dir, kinds, self.watermark_path,
+            self.archive_dir, self.compress_csv)
+        future.add_done_callback(lambda f: self._export_finished(job, f))
+        return 202, {'job': job_id}
+
+    def _export_finished(self, job, future):
+        if future.cancelled():
+            job['status'], job['error'] = 'failed', "cancelled"
+        elif future.exception() is not None:
+            error = future.exception()
+            job['status'], job['error'] = 'failed', f"{type(error).__name__}: {error}"
+        else:
+            job['files'], job['warnings'] = future.result()
+            job['status'] = 'done'
+        self._finished_jobs[job['job']] = time.monotonic()
+        self._expire_jobs()
+
+    def _expire_jobs(self):
+        """Forgets finished jobs older than JOB_TTL, and the oldest beyond
+        MAX_FINISHED_JOBS; queued jobs are always kept."""
+        cutoff = time.monotonic() - JOB_TTL
+        for job_id, finished in list(self._finished_jobs.items()):
+            if finished >= cutoff and len(self._finished_jobs) <= MAX_FINISHED_JOBS:
+                break
+            del self._finished_jobs[job_id]
+            del self.jobs[job_id]
+
+    def get_export(self, job_id):
+        self._expire_jobs()
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise ServiceError(404, f"no such export job: {job_id}")
+        return job
+
+    async def get_stats(self, query):
+        return {'check_ins': self.writer.check_ins, 'batches': self.writer.batches,
+                'largest_batch': self.writer.largest_batch,
+                'exports_pending': sum(job['status'] == 'queued' for job in self.jobs.values())}
+
+
+async def serve(service, host, port):
+    """Serves until SIGTERM or SIGINT, then stops listening and closes the
+    service, so the export worker processes exit with it."""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: Ctrl+C still raises KeyboardInterrupt, handled in main()
+            pass
+    server = await service.start(host, port)
+    sockname = server.sockets[0].getsockname()
+    print(f"Serving attendance on http://{sockname[0]}:{sockname[1]}", flush=True)
+    try:
+        await stop.wait()
+    finally:
+        server.close()
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve attendance check-in, roster and export endpoints.")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"Address to listen on (default: {DEFAULT_HOST}; use 0.0.0.0 for the whole LAN)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"Port to listen on (default: {DEFAULT_PORT}; 0 picks a free one)")
+    parser.add_argument("--db", help="Attendance database path (default: from the config file)")
+    parser.add_argument("-o", "--output", help="Directory to write exports into (default: the config "
+                                               "file's export directory, or the current directory)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of export worker processes (default: up to 4, one per CPU)")
+    parser.add_argument("--watermark", help="Watermark image path (default: from the config file)")
+    app_config.add_argument(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.configure(args.trace, args.profile)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    try:
+        config = app_config.load_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    store_path = args.db or config.store_path
+    os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+    service = AttendanceService(store_path, args.output or config.export_dir or os.getcwd(),
+                                args.watermark or config.watermark_path, args.jobs,
+                                config.archive_dir, config.archive_compress_csv)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
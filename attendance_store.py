@@ -0,0 +1,443 @@
+"""Persistent SQLite store for members, committees, sessions, attendance and
+report templates.
+
+Replaces rewriting members.json on every save: roster changes and attendance
+are written incrementally inside a transaction, and history queries such as
+"all sessions for committee X in a date range" are answered from indexes
+instead of re-reading exported files.
+
+Dates are stored as ISO strings (YYYY-MM-DD) so range queries sort correctly.
+"""
+import os
+import json
+import sqlite3
+from datetime import date, datetime
+
+from attendance_records import ATTENDING_AS_OPTIONS, ATTENDANCE_OPTIONS
+
+DEFAULT_STORE_PATH = 'attendance.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS committees (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS members (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS roster (
+    committee_id INTEGER NOT NULL REFERENCES committees(id) ON DELETE CASCADE,
+    member_id INTEGER NOT NULL REFERENCES members(id),
+    position TEXT NOT NULL DEFAULT '',
+    sort_order INTEGER NOT NULL,
+    PRIMARY KEY (committee_id, member_id)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    committee_id INTEGER NOT NULL REFERENCES committees(id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    UNIQUE (committee_id, date)
+);
+CREATE TABLE IF NOT EXISTS attendance (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    member_id INTEGER NOT NULL REFERENCES members(id),
+    row_order INTEGER NOT NULL,
+    position TEXT NOT NULL DEFAULT '',
+    attending_as TEXT NOT NULL,
+    attendance TEXT NOT NULL,
+    PRIMARY KEY (session_id, member_id)
+);
+CREATE TABLE IF NOT EXISTS report_templates (
+    committee_id INTEGER PRIMARY KEY REFERENCES committees(id) ON DELETE CASCADE,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imported_files (
+    content_hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    session_id INTEGER REFERENCES sessions(id) ON DELETE SET NULL,
+    imported_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);
+CREATE INDEX IF NOT EXISTS idx_attendance_member ON attendance(member_id);
+CREATE INDEX IF NOT EXISTS idx_roster_member ON roster(member_id);
+"""
+
+
+def to_iso_date(value):
+    """Accepts a date/datetime, an ISO string or an MM/DD/YYYY string."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if '/' in value:
+        return datetime.strptime(value, '%m/%d/%Y').date().isoformat()
+    return date.fromisoformat(value).isoformat()
+
+
+def duplicate_names(records):
+    """Returns the names listed more than once in ``records`` ([name, ...]
+    rows), in the order they first appear. A meeting holds one row per
+    member, so saving such records would keep only the last of each."""
+    seen = set()
+    duplicates = {}
+    for record in records:
+        if record[0] in seen:
+            duplicates[record[0]] = None
+        seen.add(record[0])
+    return list(duplicates)
+
+
+class AttendanceStore:
+    """A connection to the attendance database.
+
+    Use as a context manager or call close() when done. Every write method
+    runs in its own transaction.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if path != ':memory:':
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def data_version(self):
+        """A number that changes whenever another connection (another process
+        or tool) commits to the database; this connection's own writes leave
+        it unchanged."""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                              "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (key, value))
+
+    # Ids
+
+    def _committee_id(self, name, create=True):
+        row = self.conn.execute("SELECT id FROM committees WHERE name = ?", (name,)).fetchone()
+        if row:
+            return row[0]
+        if not create:
+            return None
+        return self.conn.execute("INSERT INTO committees (name) VALUES (?)", (name,)).lastrowid
+
+    def _member_ids(self, names):
+        """Returns {name: id} for ``names``, creating members that don't exist."""
+        self.conn.executemany("INSERT OR IGNORE INTO members (name) VALUES (?)",
+                              [(n,) for n in set(names)])
+        ids = {}
+        names = list(set(names))
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for member_id, name in self.conn.execute(
+                    f"SELECT id, name FROM members WHERE name IN ({marks})", chunk):
+                ids[name] = member_id
+        return ids
+
+    # Committees and rosters
+
+    def committees(self):
+        """Returns every committee name in alphabetical order."""
+        return [r[0] for r in self.conn.execute("SELECT name FROM committees ORDER BY name")]
+
+    def add_committee(self, name):
+        """Creates a committee (with an empty roster) if it doesn't exist."""
+        with self.conn:
+            self._committee_id(name)
+
+    def roster(self, committee):
+        """Returns the committee's members as [{'name': ..., 'position': ...}]."""
+        rows = self.conn.execute(
+            """SELECT m.name, r.position FROM roster r
+               JOIN committees c ON c.id = r.committee_id
+               JOIN members m ON m.id = r.member_id
+               WHERE c.name = ? ORDER BY r.sort_order""", (committee,))
+        return [{'name': name, 'position': position} for name, position in rows]
+
+    def save_roster(self, committee, members):
+        """Replaces the committee roster with ``members`` (dicts with name and
+        position), only touching rows that actually changed."""
+        with self.conn:
+            committee_id = self._committee_id(committee)
+            ids = self._member_ids([m['name'] for m in members])
+            wanted = {}
+            for order, member in enumerate(members):
+                wanted[ids[member['name']]] = (member.get('position', ''), order)
+            current = {member_id: (position, order) for member_id, position, order in self.conn.execute(
+                "SELECT member_id, position, sort_order FROM roster WHERE committee_id = ?", (committee_id,))}
+
+            removed = [(committee_id, member_id) for member_id in current if member_id not in wanted]
+            changed = [(committee_id, member_id, position, order)
+                       for member_id, (position, order) in wanted.items()
+                       if current.get(member_id) != (position, order)]
+            self.conn.executemany("DELETE FROM roster WHERE committee_id = ? AND member_id = ?", removed)
+            self.conn.executemany(
+                """INSERT INTO roster (committee_id, member_id, position, sort_order) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (committee_id, member_id)
+                   DO UPDATE SET position = excluded.position, sort_order = excluded.sort_order""",
+                changed)
+
+    def member_positions(self, names=None):
+        """Returns {name: position} for every member who is on a roster or has
+        attended a meeting, optionally limited to ``names``. The position is
+        the member's roster position or, failing that, the one from their
+        latest meeting. Names only ever typed in and then deleted are left
+        out, so typos don't live on as suggestions."""
+        query = """SELECT m.name, COALESCE(
+                       (SELECT r.position FROM roster r
+                        WHERE r.member_id = m.id AND r.position != '' LIMIT 1),
+                       (SELECT a.position FROM attendance a JOIN sessions s ON s.id = a.session_id
+                        WHERE a.member_id = m.id AND a.position != '' ORDER BY s.date DESC LIMIT 1),
+                       '')
+                   FROM members m
+                   WHERE (EXISTS (SELECT 1 FROM roster r WHERE r.member_id = m.id)
+                          OR EXISTS (SELECT 1 FROM attendance a WHERE a.member_id = m.id))"""
+        if names is None:
+            return dict(self.conn.execute(query))
+        positions = {}
+        names = list(set(names))
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            positions.update(self.conn.execute(f"{query} AND m.name IN ({marks})", chunk))
+        return positions
+
+    def import_members_json(self, committee, path='members.json'):
+        """One-off migration of a members.json roster; returns True if imported.
+
+        Runs at most once per database, so a roster the user empties on
+        purpose stays empty. A database where the committee already exists
+        (migrated before this was recorded) counts as migrated.
+        """
+        if self._meta('members_json_imported') is not None:
+            return False
+        imported = False
+        if self._committee_id(committee, create=False) is None:
+            if not os.path.exists(path):
+                return False
+            with open(path, 'r') as f:
+                members = json.load(f)
+            self.save_roster(committee, members)
+            imported = True
+        self._set_meta('members_json_imported', datetime.now().isoformat(timespec='seconds'))
+        return imported
+
+    def report_template(self, committee):
+        """Returns the text new weekly reports for the committee start from."""
+        row = self.conn.execute(
+            """SELECT t.text FROM report_templates t JOIN committees c ON c.id = t.committee_id
+               WHERE c.name = ?""", (committee,)).fetchone()
+        return row[0] if row else ''
+
+    def save_report_template(self, committee, text):
+        with self.conn:
+            self.conn.execute(
+                """INSERT INTO report_templates (committee_id, text) VALUES (?, ?)
+                   ON CONFLICT (committee_id) DO UPDATE SET text = excluded.text""",
+                (self._committee_id(committee), text))
+
+    # Sessions and attendance
+
+    def _session_id(self, committee_id, iso):
+        self.conn.execute("INSERT OR IGNORE INTO sessions (committee_id, date) VALUES (?, ?)",
+                          (committee_id, iso))
+        return self.conn.execute(
+            "SELECT id FROM sessions WHERE committee_id = ? AND date = ?", (committee_id, iso)).fetchone()[0]
+
+    def _write_session(self, committee, iso, records):
+        """Replaces one meeting's rows; returns (session_id, rows written).
+        Of rows with the same name only the last is kept."""
+        session_id = self._session_id(self._committee_id(committee), iso)
+        ids = self._member_ids([r[0] for r in records])
+        rows = {}
+        for order, (name, position, attending_as, attendance) in enumerate(records):
+            rows[ids[name]] = (session_id, ids[name], order, position, attending_as, attendance)
+        self.conn.execute("DELETE FROM attendance WHERE session_id = ?", (session_id,))
+        self.conn.executemany(
+            """INSERT INTO attendance (session_id, member_id, row_order, position, attending_as, attendance)
+               VALUES (?, ?, ?, ?, ?, ?)""", rows.values())
+        return session_id, len(rows)
+
+    def record_session(self, committee, session_date, records):
+        """Stores attendance for one meeting, replacing any earlier save for
+        the same committee and date. ``records`` are [name, position,
+        attending_as, attendance] rows. Returns the session id.
+
+        Raises ValueError, writing nothing, if a name is listed twice.
+        """
+        duplicates = duplicate_names(records)
+        if duplicates:
+            raise ValueError(f"listed more than once: {', '.join(duplicates)}")
+        with self.conn:
+            return self._write_session(committee, to_iso_date(session_date), records)[0]
+
+    def record_check_ins(self, check_ins):
+        """Records individual check-ins in a single transaction.
+
+        ``check_ins`` holds (committee, date, name, position, attending_as,
+        attendance) tuples. Unlike record_session() this only touches the
+        members checking in: a meeting that has no attendance yet starts from
+        the committee roster marked absent, a member already listed is
+        updated in place (keeping their roster position if ``position`` is
+        empty) and anyone else is added at the end. Returns the number of
+        check-ins written.
+        """
+        with self.conn:
+            ids = self._member_ids([c[2] for c in check_ins])
+            sessions = {}
+            for committee, session_date, name, position, attending_as, attendance in check_ins:
+                key = (committee, to_iso_date(session_date))
+                if key not in sessions:
+                    committee_id = self._committee_id(committee)
+                    session_id = self._session_id(committee_id, key[1])
+                    next_order = self.conn.execute("SELECT MAX(row_order) FROM attendance WHERE session_id = ?",
+                                                   (session_id,)).fetchone()[0]
+                    if next_order is None:
+                        self.conn.execute(
+                            """INSERT INTO attendance (session_id, member_id, row_order, position, attending_as, attendance)
+                               SELECT ?, member_id, sort_order, position, ?, ? FROM roster WHERE committee_id = ?""",
+                            (session_id, ATTENDING_AS_OPTIONS[0], ATTENDANCE_OPTIONS[1], committee_id))
+                        next_order = self.conn.execute("SELECT MAX(row_order) FROM attendance WHERE session_id = ?",
+                                                       (session_id,)).fetchone()[0]
+                    sessions[key] = [session_id, -1 if next_order is None else next_order]
+                session = sessions[key]
+                session[1] += 1
+                self.conn.execute(
+                    """INSERT INTO attendance (session_id, member_id, row_order, position, attending_as, attendance)
+                       VALUES (?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (session_id, member_id) DO UPDATE SET
+                           position = CASE WHEN excluded.position = '' THEN attendance.position
+                                           ELSE excluded.position END,
+                           attending_as = excluded.attending_as, attendance = excluded.attendance""",
+                    (session[0], ids[name], session[1], position, attending_as, attendance))
+        return len(check_ins)
+
+    def imported_hashes(self):
+        """Returns the content hashes of every file imported so far."""
+        return {r[0] for r in self.conn.execute("SELECT content_hash FROM imported_files")}
+
+    def _has_attendance(self, committee, iso):
+        return self.conn.execute(
+            """SELECT 1 FROM sessions s JOIN committees c ON c.id = s.committee_id
+               WHERE c.name = ? AND s.date = ?
+                 AND EXISTS (SELECT 1 FROM attendance a WHERE a.session_id = s.id)""",
+            (committee, iso)).fetchone() is not None
+
+    def import_sessions(self, sessions, overwrite=False):
+        """Stores a batch of imported sessions in a single transaction.
+
+        ``sessions`` holds (content_hash, path, committee, date, records)
+        tuples; files whose hash was already imported are skipped. A meeting
+        that already has attendance (saved in the app, or imported from
+        another file) is left alone unless ``overwrite`` is true, and its
+        file is not recorded as imported. Returns (path, rows written,
+        duplicate names, existed) for each remaining session, where
+        ``existed`` says the meeting was already stored (and rows is 0
+        unless it was overwritten); of rows repeating a name only the last
+        is stored.
+        """
+        results = []
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            for content_hash, path, committee, session_date, records in sessions:
+                seen = self.conn.execute("SELECT 1 FROM imported_files WHERE content_hash = ?",
+                                         (content_hash,)).fetchone()
+                if seen:
+                    continue
+                iso = to_iso_date(session_date)
+                existed = self._has_attendance(committee, iso)
+                if existed and not overwrite:
+                    results.append((path, 0, [], True))
+                    continue
+                session_id, rows = self._write_session(committee, iso, records)
+                self.conn.execute(
+                    "INSERT INTO imported_files (content_hash, path, session_id, imported_at) VALUES (?, ?, ?, ?)",
+                    (content_hash, path, session_id, now))
+                results.append((path, rows, duplicate_names(records), existed))
+        return results
+
+    def sessions(self, committee=None, start=None, end=None):
+        """Returns [{'id', 'committee', 'date'}] ordered by date, optionally
+        limited to one committee and an inclusive date range."""
+        query = ["SELECT s.id, c.name, s.date FROM sessions s JOIN committees c ON c.id = s.committee_id WHERE 1 = 1"]
+        params = []
+        if committee is not None:
+            query.append("AND c.name = ?")
+            params.append(committee)
+        if start is not None:
+            query.append("AND s.date >= ?")
+            params.append(to_iso_date(start))
+        if end is not None:
+            query.append("AND s.date <= ?")
+            params.append(to_iso_date(end))
+        query.append("ORDER BY s.date, c.name")
+        return [{'id': i, 'committee': c, 'date': d}
+                for i, c, d in self.conn.execute(" ".join(query), params)]
+
+    def session_dates(self, committee):
+        """Returns the ISO dates of every meeting saved for the committee."""
+        return [r[0] for r in self.conn.execute(
+            """SELECT s.date FROM sessions s JOIN committees c ON c.id = s.committee_id
+               WHERE c.name = ? ORDER BY s.date""", (committee,))]
+
+    def session_records(self, committee, session_date):
+        """Returns the [name, position, attending_as, attendance] rows saved for
+        one meeting, in grid order."""
+        rows = self.conn.execute(
+            """SELECT m.name, a.position, a.attending_as, a.attendance FROM attendance a
+               JOIN sessions s ON s.id = a.session_id
+               JOIN committees c ON c.id = s.committee_id
+               JOIN members m ON m.id = a.member_id
+               WHERE c.name = ? AND s.date = ? ORDER BY a.row_order""",
+            (committee, to_iso_date(session_date)))
+        return [list(r) for r in rows]
+
+    def attendance_rows(self, committee=None, start=None, end=None, member=None):
+        """Iterates (date, committee, name, position, attending_as, attendance)
+        tuples for the whole history, filtered by committee, date range and/or
+        member. Rows are streamed from the cursor, not loaded up front."""
+        query = ["""SELECT s.date, c.name, m.name, a.position, a.attending_as, a.attendance
+                    FROM attendance a
+                    JOIN sessions s ON s.id = a.session_id
+                    JOIN committees c ON c.id = s.committee_id
+                    JOIN members m ON m.id = a.member_id
+                    WHERE 1 = 1"""]
+        params = []
+        if committee is not None:
+            query.append("AND c.name = ?")
+            params.append(committee)
+        if start is not None:
+            query.append("AND s.date >= ?")
+            params.append(to_iso_date(start))
+        if end is not None:
+            query.append("AND s.date <= ?")
+            params.append(to_iso_date(end))
+        if member is not None:
+            query.append("AND m.name = ?")
+            params.append(member)
+        query.append("ORDER BY s.date, c.name, a.row_order")
+        return self.conn.execute(" ".join(query), params)
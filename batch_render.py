@@ -0,0 +1,162 @@
+"""Parallel batch rendering of attendance and weekly report exports.
+
+ReportLab document builds are CPU bound, so large runs (every committee for
+every week of a semester) are spread across a pool of worker processes. Each
+job renders one document for one session file. Output names follow the
+attendance_export.default_filename convention so reruns are deterministic.
+
+    python batch_render.py SESSIONS_DIR -o OUTPUT_DIR --jobs 8
+"""
+import sys
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import app_config
+import attendance_export
+import export_archive
+import instrumentation
+
+
+def plan_jobs(session_paths, output_dir, kinds=attendance_export.DEFAULT_EXPORT_KINDS):
+    """Works out every (session, kind, output path) to render.
+
+    Sessions are loaded once here so output names and empty reports are known
+    up front; two sessions that would write the same file are reported as
+    errors instead of silently overwriting each other.
+    """
+    jobs = []
+    errors = []
+    claimed = {}
+    for path in session_paths:
+        try:
+            session = attendance_export.load_session(path)
+        except Exception as e:
+            errors.append({'session': path, 'kind': None, 'output': None, 'error': str(e)})
+            continue
+        for kind in kinds:
+            if kind == "report" and not session['report'].strip():
+                continue
+            output = os.path.join(output_dir, attendance_export.default_filename(
+                kind, session['committee'], session['date_obj']))
+            if output in claimed:
+                errors.append({'session': path, 'kind': kind, 'output': output,
+                               'error': f"output name collides with {claimed[output]}"})
+                continue
+            claimed[output] = path
+            jobs.append((path, kind, output))
+    return jobs, errors
+
+
+def render_job(job, watermark_path=attendance_export.WATERMARK_PATH, archive_dir=None, compress_csv=False):
+    """Renders a single job and writes it to disk (and to the export archive
+    in ``archive_dir``, if given).
+
+    Runs inside a worker process, so it never raises; failures come back in
+    the result's ``error`` field.
+    """
+    path, kind, output = job
+    result = {'session': path, 'kind': kind, 'output': output,
+              'bytes': 0, 'seconds': 0.0, 'warnings': [], 'error': None}
+    start = time.perf_counter()
+    try:
+        with instrumentation.export_trace(kind, path=output, session=path) as trace:
+            session = attendance_export.load_session(path)
+            data = attendance_export.render_session(session, kind, watermark_path, result['warnings'])
+            with trace.stage('write'):
+                with open(output, 'wb') as f:
+                    f.write(data)
+            trace.count('bytes_written', len(data))
+        if archive_dir:
+            export_archive.archive_export(archive_dir, data, session['committee'], session['date_obj'], kind,
+                                          output, result['warnings'], compress_csv)
+        result['bytes'] = len(data)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(session_paths, output_dir, kinds=attendance_export.DEFAULT_EXPORT_KINDS,
+              workers=None, watermark_path=attendance_export.WATERMARK_PATH, archive_dir=None, compress_csv=False):
+    """Renders every job for ``session_paths`` and returns a summary dict.
+
+    ``workers`` is the process count (None means one per CPU, 1 renders in
+    this process). Results are returned in job order regardless of which
+    worker finished first.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    jobs, errors = plan_jobs(session_paths, output_dir, kinds)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs) or 1))
+
+    if workers == 1:
+        results = [render_job(job, watermark_path, archive_dir, compress_csv) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_job, job, watermark_path, archive_dir, compress_csv) for job in jobs]
+            results = [future.result() for future in futures]
+
+    elapsed = time.perf_counter() - start
+    failures = errors + [r for r in results if r['error']]
+    succeeded = [r for r in results if not r['error']]
+    return {
+        'results': results,
+        'failures': failures,
+        'documents': len(succeeded),
+        'bytes': sum(r['bytes'] for r in succeeded),
+        'workers': workers,
+        'seconds': elapsed,
+        'docs_per_second': len(succeeded) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render attendance and weekly report exports for many sessions in parallel.")
+    parser.add_argument("sessions", help="Directory containing session *.json files")
+    parser.add_argument("-o", "--output", default=".", help="Directory to write exports into")
+    parser.add_argument("-f", "--formats", type=attendance_export.parse_kinds,
+                        default=["pdf", "report"],
+                        help="Comma separated list of csv, pdf, report, packet (default: pdf,report)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes (default: one per CPU)")
+    parser.add_argument("--watermark", help="Watermark image path (default: from the config file)")
+    app_config.add_argument(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.configure(args.trace, args.profile)
+    try:
+        config = app_config.load_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    watermark_path = args.watermark or config.watermark_path
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    session_paths = attendance_export.find_session_files(args.sessions)
+    summary = run_batch(session_paths, args.output, args.formats, args.jobs, watermark_path,
+                        config.archive_dir, config.archive_compress_csv)
+
+    reported_warnings = set()
+    for result in summary['results']:
+        for warning in result['warnings']:
+            if warning not in reported_warnings:
+                reported_warnings.add(warning)
+                print(f"Warning: {warning}", file=sys.stderr)
+    for failure in summary['failures']:
+        kind = failure['kind'] or 'session'
+        print(f"Failed [{kind}] {failure['session']}: {failure['error']}", file=sys.stderr)
+
+    print(f"Rendered {summary['documents']} document(s) "
+          f"({summary['bytes'] / 1024:.1f} KiB) with {summary['workers']} worker(s) "
+          f"in {summary['seconds']:.2f}s: {summary['docs_per_second']:.1f} docs/sec, "
+          f"{len(summary['failures'])} failure(s)")
+    return 1 if summary['failures'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
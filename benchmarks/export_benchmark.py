@@ -0,0 +1,360 @@
+"""Benchmark suite for the export and persistence hot paths.
+
+Generates synthetic rosters and weekly reports, then times each path the way
+the desktop app runs it: ``export_to_csv``, ``export_to_pdf``,
+``export_weekly_report_pdf`` and ``export_meeting_packet`` go through the
+real window (with the save dialog answered automatically) and its background
+export thread. The watermark onPage callback, roster load/save and switching
+committees are timed on their own. Uses the offscreen Qt platform and a
+scratch directory, so it runs headless and never touches the real
+attendance.db.
+
+    python benchmarks/export_benchmark.py -o results.json
+    python benchmarks/export_benchmark.py --baseline results.json --max-regression 0.25
+
+Each case reports the best of ``--repeat`` runs. With ``--baseline`` the run
+fails (exit status 1) if any case is more than ``--max-regression`` slower
+than the same case in the baseline file; differences under ``--min-delta-ms``
+are ignored as noise.
+"""
+import sys
+import os
+import io
+import re
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import importlib.util
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(REPO_DIR, "Committee Attendance-Weekly Report Tool.py")
+sys.path.insert(0, REPO_DIR)
+
+DEFAULT_MEMBERS = [20, 500, 10000]
+DEFAULT_PAGES = [1, 20, 200]
+# A report page holds about this many of the generated paragraphs
+PARAGRAPHS_PER_PAGE = 4.4
+WORDS_PER_PARAGRAPH = 80
+# Watermark size matching a letter page scanned at 300 DPI
+WATERMARK_SIZE = (2550, 3300)
+
+FIRST_NAMES = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Avery", "Quinn", "Jamie", "Drew",
+               "Skyler", "Reese", "Rowan", "Sage", "Emerson", "Parker", "Hayden", "Kendall", "Logan", "Blake"]
+LAST_NAMES = ["Nguyen", "Smith", "Garcia", "Johnson", "Okafor", "Patel", "Kim", "Martinez", "Brown", "Lee",
+              "Davis", "Lopez", "Wilson", "Anderson", "Thomas", "Moore", "Jackson", "White", "Harris", "Clark"]
+POSITIONS = ["Senator", "Chair", "Vice Chair", "Treasurer", "Secretary", "Student Representative",
+             "Faculty Advisor", "At-Large Member"]
+REPORT_WORDS = ("budget committee laptop lab printing software license request funding approved student "
+                "senate proposal vote motion semester library wifi upgrade equipment review").split()
+
+
+def generate_roster(count, seed=0):
+    """Returns ``count`` members (dicts with a unique name and a position)."""
+    rng = random.Random(seed)
+    return [{'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i:05d}",
+             'position': rng.choice(POSITIONS)} for i in range(count)]
+
+
+def generate_report(pages, seed=0):
+    """Returns weekly report text that lays out to roughly ``pages`` pages."""
+    rng = random.Random(seed)
+    paragraphs = []
+    for _ in range(max(1, round(pages * PARAGRAPHS_PER_PAGE) - 1)):
+        words = " ".join(rng.choice(REPORT_WORDS) for _ in range(WORDS_PER_PARAGRAPH))
+        paragraphs.append(words.capitalize() + ".")
+    return "\n\n".join(paragraphs)
+
+
+def generate_watermark(path):
+    """Writes a smooth, logo-like JPEG. The PDF embeds the file's bytes
+    as they are (DCTDecode), so a noisy image would make every export
+    unrealistically large."""
+    from PIL import Image, ImageDraw
+    size = min(WATERMARK_SIZE)
+    red = Image.radial_gradient('L').resize((size, size))
+    green = Image.linear_gradient('L').resize((size, size))
+    image = Image.merge('RGB', (red, green, Image.new('L', (size, size), 160))).resize(WATERMARK_SIZE)
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((400, 600, 2150, 2700), outline=(200, 16, 46), width=60)
+    image.save(path, quality=90)
+
+
+def pdf_page_count(data):
+    return len(re.findall(rb"/Type /Page\b(?!s)", data))
+
+
+def load_app_module():
+    spec = importlib.util.spec_from_file_location("attendance_app", APP_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_of(repeat, func):
+    """Runs ``func`` ``repeat`` times; returns (best seconds, all seconds, last result)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), timings, result
+
+
+class AppHarness:
+    """The real window, with dialogs answered automatically."""
+
+    def __init__(self, app_module, watermark_path):
+        import app_config
+        from PyQt6.QtCore import QEventLoop
+        self.module = app_module
+        self.loop_flags = QEventLoop.ProcessEventsFlag.AllEvents
+        self.app = app_module.QApplication.instance() or app_module.QApplication([])
+        self.save_path = None
+        self.messages = []
+
+        harness = self
+
+        class Dialogs:
+            @staticmethod
+            def getSaveFileName(*args, **kwargs):
+                return harness.save_path, ""
+
+        def record(kind):
+            def show(_parent, title, text, *args, **kwargs):
+                harness.messages.append((kind, title, text))
+            return staticmethod(show)
+
+        class Messages:
+            information = record('information')
+            warning = record('warning')
+            critical = record('critical')
+
+        app_module.QFileDialog = Dialogs
+        app_module.QMessageBox = Messages
+        # Data lives in the (scratch) working directory; no config file is read
+        self.window = app_module.AttendanceApp(config=app_config.AppConfig(watermark_path=watermark_path))
+
+    def set_roster(self, members):
+        self.window.attendance_model.set_members(members)
+
+    def export(self, method, path):
+        """Runs one export through the window and waits for its thread."""
+        self.save_path = path
+        self.messages.clear()
+        getattr(self.window, method)()
+        while self.window.export_worker is not None:
+            self.app.processEvents(self.loop_flags, 50)
+        errors = [m for m in self.messages if m[0] == 'critical']
+        if errors or not os.path.exists(path):
+            raise RuntimeError(f"{method} failed: {errors or self.messages}")
+        return os.path.getsize(path)
+
+    def close(self):
+        self.window.watcher.stop()
+        self.window.store.close()
+        self.window.deleteLater()
+        self.app.processEvents()
+
+
+def bench_exports(harness, scratch, members_list, pages_list, repeat):
+    cases = []
+    for count in members_list:
+        harness.set_roster(generate_roster(count))
+        for kind, method in (("csv", "export_to_csv"), ("pdf", "export_to_pdf")):
+            path = os.path.join(scratch, f"attendance_{count}.{kind}")
+            best, timings, size = best_of(repeat, lambda: harness.export(method, path))
+            extra = {'bytes': size}
+            if kind == "pdf":
+                with open(path, 'rb') as f:
+                    extra['pages'] = pdf_page_count(f.read())
+            cases.append({'case': f"{method}[members={count}]", 'seconds': best, 'runs': timings, **extra})
+    for pages in pages_list:
+        harness.window.report_text.setPlainText(generate_report(pages))
+        path = os.path.join(scratch, f"report_{pages}.pdf")
+        best, timings, size = best_of(repeat, lambda: harness.export("export_weekly_report_pdf", path))
+        with open(path, 'rb') as f:
+            page_count = pdf_page_count(f.read())
+        cases.append({'case': f"export_weekly_report_pdf[pages={pages}]", 'seconds': best, 'runs': timings,
+                      'bytes': size, 'pages': page_count})
+    # The packet holds both, so compare it with the matching pdf and report cases
+    pages = min(pages_list)
+    harness.window.report_text.setPlainText(generate_report(pages))
+    for count in members_list:
+        harness.set_roster(generate_roster(count))
+        path = os.path.join(scratch, f"packet_{count}_{pages}.pdf")
+        best, timings, size = best_of(repeat, lambda: harness.export("export_meeting_packet", path))
+        with open(path, 'rb') as f:
+            page_count = pdf_page_count(f.read())
+        cases.append({'case': f"export_meeting_packet[members={count},pages={pages}]", 'seconds': best,
+                      'runs': timings, 'bytes': size, 'pages': page_count})
+    return cases
+
+
+def bench_watermark(watermark_path, pages_list, repeat):
+    """Times the onPage callback: the first page (decode and embed) and each later page."""
+    import attendance_export
+    import pdf_resources
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    cases = []
+    for pages in pages_list:
+        def draw_document():
+            pdf_resources.clear_caches()
+            c = canvas.Canvas(io.BytesIO(), pagesize=letter)
+            on_page = attendance_export.make_watermark(watermark_path, [])
+            start = time.perf_counter()
+            on_page(c, None)
+            first = time.perf_counter() - start
+            for _ in range(pages - 1):
+                c.showPage()
+                on_page(c, None)
+            return first
+        best, timings, first = best_of(repeat, draw_document)
+        cases.append({'case': f"watermark_callback[pages={pages}]", 'seconds': best, 'runs': timings,
+                      'first_page_seconds': first, 'pages': pages})
+    return cases
+
+
+def bench_members(harness, members_list, repeat):
+    """Times saving a roster (every position changed) and loading it back."""
+    window = harness.window
+    cases = []
+    for count in members_list:
+        rosters = [generate_roster(count, seed) for seed in (1, 2)]
+        state = {'next': 0}
+
+        def save():
+            # Alternate between two rosters so every save has real changes to write
+            window.preloaded_members = rosters[state['next'] % 2]
+            state['next'] += 1
+            window.save_preloaded_members()
+
+        def load():
+            window.store.close()
+            window.load_preloaded_members()
+            return len(window.preloaded_members)
+
+        best, timings, _ = best_of(repeat, save)
+        cases.append({'case': f"member_save[members={count}]", 'seconds': best, 'runs': timings})
+        best, timings, loaded = best_of(repeat, load)
+        if loaded != count:
+            raise RuntimeError(f"member_load returned {loaded} members, expected {count}")
+        cases.append({'case': f"member_load[members={count}]", 'seconds': best, 'runs': timings})
+    return cases
+
+
+def bench_committee_switch(harness, members_list, repeat):
+    """Times switching the window between two committees, first with their
+    workspaces read from the store (cold) and then from the workspace cache."""
+    window = harness.window
+    start_committee = window.committee
+    cases = []
+    for count in members_list:
+        committees = [f"Benchmark Committee {count} {side}" for side in "AB"]
+        for seed, committee in enumerate(committees):
+            window.store.save_roster(committee, generate_roster(count, seed))
+            window.committee_selector.addItem(committee)
+        state = {'next': 0}
+
+        def switch():
+            window.committee_selector.setCurrentText(committees[state['next'] % 2])
+            state['next'] += 1
+            return len(window.entries)
+
+        def cold_switch():
+            window.workspaces.clear()
+            return switch()
+
+        for name, func in (('cold', cold_switch), ('cached', switch)):
+            best, timings, rows = best_of(repeat, func)
+            if rows != max(count, 20):
+                raise RuntimeError(f"committee_switch showed {rows} rows, expected {count}")
+            cases.append({'case': f"committee_switch_{name}[members={count}]", 'seconds': best, 'runs': timings})
+    window.committee_selector.setCurrentText(start_committee)
+    return cases
+
+
+def run_suite(members_list, pages_list, repeat):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            watermark_path = os.path.join(scratch, "watermark.jpg")
+            generate_watermark(watermark_path)
+            harness = AppHarness(load_app_module(), watermark_path)
+            try:
+                # Load the PDF stack and decode the watermark before anything is timed
+                harness.set_roster(generate_roster(1))
+                harness.export("export_to_pdf", os.path.join(scratch, "warmup.pdf"))
+                cases = bench_exports(harness, scratch, members_list, pages_list, repeat)
+                cases += bench_watermark(watermark_path, pages_list, repeat)
+                cases += bench_members(harness, members_list, repeat)
+                cases += bench_committee_switch(harness, members_list, repeat)
+            finally:
+                harness.close()
+        finally:
+            os.chdir(cwd)
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'cases': cases,
+    }
+
+
+def compare(results, baseline, max_regression, min_delta):
+    """Returns a list of (case, baseline seconds, seconds) that regressed."""
+    previous = {case['case']: case['seconds'] for case in baseline['cases']}
+    regressions = []
+    for case in results['cases']:
+        before = previous.get(case['case'])
+        if before is None:
+            continue
+        if case['seconds'] - before > min_delta and case['seconds'] > before * (1 + max_regression):
+            regressions.append((case['case'], before, case['seconds']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark exports, the watermark callback, roster load/save and committee switching.")
+    parser.add_argument("--members", type=int, nargs='+', default=DEFAULT_MEMBERS, help="Roster sizes")
+    parser.add_argument("--pages", type=int, nargs='+', default=DEFAULT_PAGES, help="Weekly report lengths")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best is kept")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Fail if a case is more than this fraction slower than the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="Ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.members, args.pages, args.repeat)
+    for case in results['cases']:
+        detail = "".join(f"  {key}={case[key]}" for key in ('pages', 'bytes') if key in case)
+        print(f"{case['case']:<42} {case['seconds'] * 1000:>10.1f}ms{detail}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression, args.min_delta_ms / 1000)
+        for case, before, after in regressions:
+            print(f"REGRESSION {case}: {before * 1000:.1f}ms -> {after * 1000:.1f}ms "
+                  f"(+{(after / before - 1) * 100:.0f}%)", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No case regressed by more than {args.max_regression:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
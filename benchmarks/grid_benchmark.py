@@ -0,0 +1,115 @@
+"""Startup time and memory of the attendance grid: the old widget-per-cell
+QGridLayout against the model/view table.
+
+Each (implementation, row count) runs in a fresh process so RSS figures are
+not polluted by earlier runs. Uses the offscreen Qt platform, so it works
+headless.
+
+    python benchmarks/grid_benchmark.py --rows 20 500 5000
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_ROWS = [20, 500, 5000]
+
+
+def rss_kib():
+    """Current resident set size in KiB (Linux), falling back to peak RSS."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def build_widget_grid(rows):
+    """The grid as the attendance tab used to build it."""
+    from PyQt6.QtWidgets import QWidget, QScrollArea, QVBoxLayout, QGridLayout, QLabel, QLineEdit, QComboBox
+    from attendance_records import ATTENDANCE_HEADERS, ATTENDING_AS_OPTIONS, ATTENDANCE_OPTIONS
+    scroll = QScrollArea()
+    scroll.setWidgetResizable(True)
+    form_widget = QWidget()
+    scroll.setWidget(form_widget)
+    form_layout = QVBoxLayout()
+    form_widget.setLayout(form_layout)
+    grid_layout = QGridLayout()
+    form_layout.addLayout(grid_layout)
+    for col, header in enumerate(ATTENDANCE_HEADERS):
+        grid_layout.addWidget(QLabel(header), 0, col)
+    for row in range(1, rows + 1):
+        name_entry = QLineEdit()
+        name_entry.setText(f"Member {row}")
+        grid_layout.addWidget(name_entry, row, 0)
+        position_entry = QLineEdit()
+        position_entry.setText("Senator")
+        grid_layout.addWidget(position_entry, row, 1)
+        attending_as_combo = QComboBox()
+        attending_as_combo.addItems(ATTENDING_AS_OPTIONS)
+        grid_layout.addWidget(attending_as_combo, row, 2)
+        attendance_combo = QComboBox()
+        attendance_combo.addItems(ATTENDANCE_OPTIONS)
+        grid_layout.addWidget(attendance_combo, row, 3)
+    return scroll
+
+
+def build_table_view(rows):
+    import attendance_grid
+    model = attendance_grid.AttendanceTableModel()
+    model.set_members([{'name': f"Member {row}", 'position': "Senator"} for row in range(1, rows + 1)])
+    view = attendance_grid.AttendanceTableView(model)
+    # The view doesn't own its model; parent it so it lives as long as the view
+    model.setParent(view)
+    return view
+
+
+IMPLEMENTATIONS = {'widgets': build_widget_grid, 'model_view': build_table_view}
+
+
+def run_child(implementation, rows):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication([])
+    # Import the implementation's modules before measuring
+    IMPLEMENTATIONS[implementation](1).deleteLater()
+    app.processEvents()
+    base_rss = rss_kib()
+
+    start = time.perf_counter()
+    widget = IMPLEMENTATIONS[implementation](rows)
+    widget.resize(1200, 700)
+    widget.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'implementation': implementation, 'rows': rows,
+                      'startup_ms': elapsed * 1000, 'rss_kib': rss_kib() - base_rss}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare attendance grid implementations.")
+    parser.add_argument("--rows", type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument("--child", nargs=2, metavar=("IMPLEMENTATION", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+        return 0
+
+    print(f"{'rows':>6}  {'implementation':<12} {'startup':>10} {'RSS':>10}")
+    for rows in args.rows:
+        for implementation in IMPLEMENTATIONS:
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", implementation, str(rows)],
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{rows:>6}  {implementation:<12} {result['startup_ms']:>8.1f}ms "
+                  f"{result['rss_kib'] / 1024:>7.1f}MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""Keystroke latency of member autocomplete over a large historical directory.
+
+Builds a member_search.MemberDirectory of synthetic people, then types sample
+names one character at a time, both correctly and with two neighbouring
+letters swapped, timing the search after every keystroke. Also checks that
+each misspelt name still finds the person, and times adding and removing one
+member (what a roster save does).
+
+Names are made of a small set of syllables, so there are far more
+near-identical names than in a real roster; that is the slow case for the
+typo search.
+
+    python benchmarks/search_benchmark.py --people 50000 --max-keystroke-ms 5
+
+Exits with status 1 if a misspelt name isn't found, or if the 99th
+percentile keystroke exceeds ``--max-keystroke-ms``.
+"""
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SYLLABLES = ["an", "bel", "cor", "da", "el", "fin", "gar", "ha", "is", "jo", "ka", "lu", "mar",
+             "no", "or", "pe", "qui", "ra", "sa", "ta", "ul", "vi", "wen", "xa", "yo", "zu"]
+POSITIONS = ["Senator", "Chair", "Vice Chair", "Treasurer", "Secretary", "Member", "Advisor"]
+
+
+def generate_directory(people, seed=0):
+    """Returns {name: position} for ``people`` unique synthetic members."""
+    rng = random.Random(seed)
+
+    def word():
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+    # Far more combinations than people, so the loop below finishes quickly
+    first_names = [word() for _ in range(max(20, people // 125))]
+    last_names = [word() for _ in range(max(200, people // 15))]
+    directory = {}
+    while len(directory) < people:
+        directory[f"{rng.choice(first_names)} {rng.choice(last_names)}"] = rng.choice(POSITIONS)
+    return directory
+
+
+def misspell(name, rng):
+    """Swaps two neighbouring letters inside the last name."""
+    first, last = name.split(" ", 1)
+    i = rng.randrange(len(last) - 1)
+    return f"{first} {last[:i]}{last[i + 1]}{last[i]}{last[i + 2:]}"
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main(argv=None):
+    import member_search
+    parser = argparse.ArgumentParser(description="Time member autocomplete per keystroke.")
+    parser.add_argument("--people", type=int, default=50000, help="Members in the directory (default: 50000)")
+    parser.add_argument("--samples", type=int, default=200, help="Names typed (default: 200)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-keystroke-ms", type=float, default=None,
+                        help="Fail if the 99th percentile keystroke is above this")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    people = generate_directory(args.people, args.seed)
+    start = time.perf_counter()
+    directory = member_search.MemberDirectory(people.items())
+    build_seconds = time.perf_counter() - start
+
+    samples = rng.sample(sorted(people), min(args.samples, len(people)))
+    keystrokes = {'exact': [], 'typo': []}
+    missed = []
+    for name in samples:
+        typo = misspell(name, rng)
+        for kind, text in (('exact', name), ('typo', typo)):
+            for i in range(1, len(text) + 1):
+                start = time.perf_counter()
+                suggestions = directory.complete_names(text[:i])
+                keystrokes[kind].append((time.perf_counter() - start) * 1000)
+            if name not in suggestions:
+                missed.append(f"{text!r} did not suggest {name!r}")
+
+    start = time.perf_counter()
+    for name in samples:
+        directory.remove(name)
+        directory.add(name, people[name])
+    update_ms = (time.perf_counter() - start) * 1000 / len(samples)
+
+    all_ms = keystrokes['exact'] + keystrokes['typo']
+    summary = {
+        'people': args.people,
+        'build_seconds': build_seconds,
+        'keystroke_ms': {kind: {'mean': statistics.fmean(ms), 'p99': percentile(ms, 0.99), 'max': max(ms)}
+                         for kind, ms in keystrokes.items()},
+        'update_ms': update_ms,
+        'missed': missed,
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"{args.people} members indexed in {build_seconds * 1000:.0f}ms; "
+              f"remove + re-add one member {update_ms:.2f}ms")
+        for kind, stats in summary['keystroke_ms'].items():
+            print(f"  {kind:<6} keystroke mean {stats['mean']:.2f}ms  p99 {stats['p99']:.2f}ms  "
+                  f"max {stats['max']:.2f}ms")
+
+    failed = False
+    for problem in missed[:10]:
+        print(f"FAIL: {problem}", file=sys.stderr)
+        failed = True
+    if args.max_keystroke_ms is not None and percentile(all_ms, 0.99) > args.max_keystroke_ms:
+        print(f"FAIL: p99 keystroke {percentile(all_ms, 0.99):.2f}ms exceeds {args.max_keystroke_ms:.2f}ms",
+              file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Load test for attendance_service: a whole meeting checking in at once.
+
+Starts the service as a separate process on a scratch database, opens one
+keep-alive connection per simulated device, then sends every check-in at the
+same moment and reports per-request latency (from sending the request to
+reading the full response) and throughput. Afterwards it checks that every
+check-in was stored, and optionally times an export job end to end.
+
+    python benchmarks/service_load_test.py --people 300 --max-p95-ms 500
+
+Exits with status 1 if a check-in fails, if the stored meeting doesn't
+match what was sent, if the service doesn't exit cleanly on SIGTERM, or if
+the 95th percentile latency exceeds ``--max-p95-ms``.
+"""
+import sys
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+COMMITTEE = "Load Test Committee"
+SESSION_DATE = "09/20/2024"
+# Seconds the service gets to close its connections, store and export pool
+SHUTDOWN_TIMEOUT = 10
+
+
+class Connection:
+    """One device's keep-alive HTTP connection."""
+
+    def __init__(self, reader, writer, host):
+        self.reader = reader
+        self.writer = writer
+        self.host = host
+
+    @classmethod
+    async def open(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, host)
+
+    async def request(self, method, path, payload=None):
+        """Returns (status, decoded JSON body)."""
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                           ).encode('latin-1') + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        self.writer.close()
+
+
+def seed_store(path, people):
+    """Creates the committee with a roster; a tenth of the people who check
+    in are walk-ins who aren't on it."""
+    import attendance_store
+    roster = [{'name': f"Member {i:04d}", 'position': "Member"} for i in range(people - people // 10)]
+    with attendance_store.AttendanceStore(path) as store:
+        store.save_roster(COMMITTEE, roster)
+    return [m['name'] for m in roster] + [f"Walk-in {i:04d}" for i in range(people // 10)]
+
+
+def stop_service(process):
+    """Sends SIGTERM and waits for the service to shut down; returns a
+    problem description if it doesn't exit cleanly in time."""
+    process.terminate()
+    try:
+        process.wait(timeout=SHUTDOWN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        return f"service did not exit within {SHUTDOWN_TIMEOUT}s of SIGTERM"
+    if process.returncode != 0:
+        return f"service exited with status {process.returncode} after SIGTERM"
+    return None
+
+
+def start_service(scratch, store_path):
+    """Starts attendance_service.py on a free port; returns (process, port)."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_DIR, "attendance_service.py"), "--port", "0",
+         "--db", store_path, "-o", os.path.join(scratch, "exports"), "--jobs", "1"],
+        cwd=scratch, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("Serving"):
+        process.kill()
+        raise RuntimeError(f"service did not start: {line!r}")
+    return process, int(line.rsplit(":", 1)[1])
+
+
+async def run_meeting(host, port, names, seed):
+    """Checks everyone in at once; returns (latencies, failures, seconds, expected)."""
+    rng = random.Random(seed)
+    connections = await asyncio.gather(*(Connection.open(host, port) for _ in names))
+    expected = {}
+    go = asyncio.Event()
+
+    async def check_in(connection, name):
+        attending_as = rng.choice(("In-Person", "In-Person", "Virtual"))
+        expected[name] = attending_as
+        await go.wait()
+        start = time.perf_counter()
+        status, body = await connection.request('POST', '/checkin', {
+            'committee': COMMITTEE, 'date': SESSION_DATE, 'name': name, 'attending_as': attending_as})
+        return time.perf_counter() - start, None if status == 200 else f"{status}: {body}"
+
+    tasks = [asyncio.create_task(check_in(c, n)) for c, n in zip(connections, names)]
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    go.set()
+    results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    for connection in connections:
+        connection.close()
+    return [r[0] for r in results], [r[1] for r in results if r[1]], elapsed, expected
+
+
+async def check_results(host, port, expected, export):
+    """Reads the meeting back and optionally times an export job."""
+    connection = await Connection.open(host, port)
+    try:
+        _, session = await connection.request('GET', f"/session?committee={COMMITTEE.replace(' ', '+')}"
+                                                     f"&date={SESSION_DATE}")
+        stored = {name: attending_as for name, _, attending_as, attendance in session['records']
+                  if attendance == "Attending"}
+        problems = []
+        if stored != expected:
+            problems.append(f"stored {len(stored)} attending members, expected {len(expected)}")
+        _, stats = await connection.request('GET', '/stats')
+        export_seconds = None
+        if export:
+            start = time.perf_counter()
+            status, job = await connection.request('POST', '/export', {
+                'committee': COMMITTEE, 'date': SESSION_DATE, 'formats': ['csv', 'pdf']})
+            while status == 202 or job.get('status') == 'queued':
+                await asyncio.sleep(0.05)
+                status, job = await connection.request('GET', f"/export/{job['job']}")
+            export_seconds = time.perf_counter() - start
+            if job.get('status') != 'done':
+                problems.append(f"export failed: {job}")
+        return problems, stats, export_seconds
+    finally:
+        connection.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a meeting checking in to attendance_service at once.")
+    parser.add_argument("--people", type=int, default=300, help="Simultaneous check-ins (default: 300)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for in-person/virtual choices")
+    parser.add_argument("--export", action="store_true", help="Also time a CSV+PDF export job afterwards")
+    parser.add_argument("--max-p95-ms", type=float, default=None,
+                        help="Fail if the 95th percentile check-in latency is above this")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        store_path = os.path.join(scratch, "attendance.db")
+        names = seed_store(store_path, args.people)
+        process, port = start_service(scratch, store_path)
+        try:
+            latencies, failures, elapsed, expected = asyncio.run(
+                run_meeting("127.0.0.1", port, names, args.seed))
+            problems, stats, export_seconds = asyncio.run(
+                check_results("127.0.0.1", port, expected, args.export))
+        finally:
+            shutdown_problem = stop_service(process)
+        if shutdown_problem:
+            problems.append(shutdown_problem)
+
+    ms = [latency * 1000 for latency in latencies]
+    summary = {
+        'people': args.people,
+        'seconds': elapsed,
+        'check_ins_per_second': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'latency_ms': {'p50': statistics.median(ms), 'p95': percentile(ms, 0.95),
+                       'p99': percentile(ms, 0.99), 'max': max(ms)},
+        'failures': failures,
+        'problems': problems,
+        'batches': stats['batches'],
+        'largest_batch': stats['largest_batch'],
+        'export_seconds': export_seconds,
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        latency = summary['latency_ms']
+        print(f"{args.people} simultaneous check-ins in {elapsed * 1000:.0f}ms "
+              f"({summary['check_ins_per_second']:.0f}/sec), committed in {stats['batches']} batch(es), "
+              f"largest {stats['largest_batch']}")
+        print(f"  latency p50 {latency['p50']:.1f}ms  p95 {latency['p95']:.1f}ms  "
+              f"p99 {latency['p99']:.1f}ms  max {latency['max']:.1f}ms")
+        if export_seconds is not None:
+            print(f"  export job (csv+pdf) finished in {export_seconds * 1000:.0f}ms")
+
+    failed = False
+    for problem in failures[:10] + problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+        failed = True
+    if args.max_p95_ms is not None and summary['latency_ms']['p95'] > args.max_p95_ms:
+        print(f"FAIL: p95 latency {summary['latency_ms']['p95']:.0f}ms exceeds {args.max_p95_ms:.0f}ms",
+              file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
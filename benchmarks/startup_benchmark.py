@@ -0,0 +1,141 @@
+"""Cold start of the desktop app: time to first paint and where import time goes.
+
+Each run starts a fresh interpreter that loads the app script, builds the
+window and exits on its first paint event. Time to first paint is measured
+from just before the child process is spawned, so it includes interpreter
+start-up. A separate ``-X importtime`` run is grouped by top-level package to
+show which imports dominate. Uses the offscreen Qt platform, so it works
+headless, and runs in a scratch directory so the real attendance.db is not
+touched.
+
+    python benchmarks/startup_benchmark.py --runs 5 --max-first-paint-ms 1500
+
+Exits with status 1 if the PDF stack (ReportLab/PIL) is loaded before first
+paint, or if the median time to first paint exceeds ``--max-first-paint-ms``.
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from collections import defaultdict
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(REPO_DIR, "Committee Attendance-Weekly Report Tool.py")
+
+# Packages that must stay out of the startup path
+DEFERRED_PACKAGES = ("reportlab", "PIL", "numpy")
+
+
+def run_child(spawned_at):
+    """Loads the app, shows the window and reports timings at first paint."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, REPO_DIR)
+    import importlib.util
+    from PyQt6.QtCore import QObject, QEvent, QTimer
+
+    started = time.time()
+    spec = importlib.util.spec_from_file_location("attendance_app", APP_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    imported = time.time()
+
+    app = module.QApplication([])
+    window = module.AttendanceApp()
+    built = time.time()
+    result = {}
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and not result:
+                result.update({
+                    'first_paint_ms': (time.time() - spawned_at) * 1000,
+                    'interpreter_ms': (started - spawned_at) * 1000,
+                    'import_ms': (imported - started) * 1000,
+                    'window_ms': (built - imported) * 1000,
+                    'deferred_loaded': sorted(p for p in DEFERRED_PACKAGES if p in sys.modules),
+                })
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    paint_filter = FirstPaint()
+    window.installEventFilter(paint_filter)
+    window.show()
+    app.exec()
+    window.store.close()
+    print(json.dumps(result))
+
+
+def spawn_child(extra_args=()):
+    """Runs one child in a scratch directory; returns (result, stderr)."""
+    with tempfile.TemporaryDirectory() as scratch:
+        spawned_at = time.time()
+        completed = subprocess.run(
+            [sys.executable, *extra_args, os.path.abspath(__file__), "--child", repr(spawned_at)],
+            cwd=scratch, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def import_breakdown(stderr):
+    """Sums ``-X importtime`` self times (ms) per top-level package."""
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure desktop app cold start.")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to time")
+    parser.add_argument("--top", type=int, default=10, help="Packages to list in the import breakdown")
+    parser.add_argument("--max-first-paint-ms", type=float, default=None,
+                        help="Fail if the median time to first paint is above this")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        run_child(float(args.child))
+        return 0
+
+    runs = [spawn_child()[0] for _ in range(args.runs)]
+    importtime_run, stderr = spawn_child(("-X", "importtime"))
+    breakdown = import_breakdown(stderr)
+    first_paint = [run['first_paint_ms'] for run in runs]
+    summary = {
+        'runs': runs,
+        'first_paint_ms': {'median': statistics.median(first_paint), 'min': min(first_paint),
+                           'max': max(first_paint)},
+        'import_ms_by_package': dict(breakdown),
+        'deferred_loaded': sorted({p for run in runs + [importtime_run] for p in run['deferred_loaded']}),
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"time to first paint over {args.runs} run(s): median {summary['first_paint_ms']['median']:.0f}ms "
+              f"(min {summary['first_paint_ms']['min']:.0f}ms, max {summary['first_paint_ms']['max']:.0f}ms)")
+        for stage in ('interpreter_ms', 'import_ms', 'window_ms'):
+            print(f"  {stage[:-3]:<12} {statistics.median(run[stage] for run in runs):>7.0f}ms")
+        print("import time by package (-X importtime, self time):")
+        for name, ms in breakdown[:args.top]:
+            print(f"  {name:<24} {ms:>7.1f}ms")
+
+    failed = False
+    if summary['deferred_loaded']:
+        print(f"FAIL: loaded before first paint: {', '.join(summary['deferred_loaded'])}", file=sys.stderr)
+        failed = True
+    if args.max_first_paint_ms is not None and summary['first_paint_ms']['median'] > args.max_first_paint_ms:
+        print(f"FAIL: median first paint {summary['first_paint_ms']['median']:.0f}ms exceeds "
+              f"{args.max_first_paint_ms:.0f}ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Per-committee workspaces for the desktop app.
+
+A workspace holds what the window shows for one committee: its roster, the
+dates of its saved meetings, its weekly report template, and the grid rows
+and report draft being edited. Nothing is read from the store until it is
+first needed, so defining more committees costs nothing until they are
+opened.
+
+WorkspaceCache keeps the most recently used workspaces, up to a fixed
+capacity, so switching back to a committee just swaps its rows into the grid
+model. The window asks to save or discard unsaved attendance before it
+leaves a committee, so an evicted workspace never holds unsaved attendance;
+only its report draft is dropped.
+"""
+from collections import OrderedDict
+
+from attendance_grid import AttendanceRows
+from attendance_store import to_iso_date
+
+DEFAULT_CAPACITY = 8
+# Blank rows are added up to this many for filling in at the meeting
+MINIMUM_ROWS = 20
+
+
+class CommitteeWorkspace:
+    """One committee's data, read from the store on first use."""
+
+    def __init__(self, store, committee):
+        self.store = store
+        self.committee = committee
+        self._roster = None
+        self._session_dates = None
+        self._report_template = None
+        # Grid contents for the meeting on ``rows_date``; set by load_rows()
+        self.rows = None
+        self.rows_date = None
+        self.dirty = False
+        self.report_text = None
+
+    @property
+    def roster(self):
+        if self._roster is None:
+            self._roster = self.store.roster(self.committee)
+        return self._roster
+
+    @property
+    def session_dates(self):
+        if self._session_dates is None:
+            self._session_dates = set(self.store.session_dates(self.committee))
+        return self._session_dates
+
+    @property
+    def report_template(self):
+        if self._report_template is None:
+            self._report_template = self.store.report_template(self.committee)
+        return self._report_template
+
+    def load_rows(self, session_date):
+        """Fills the grid rows from the meeting saved on ``session_date``, or
+        from the roster if there is none, and returns them."""
+        iso = to_iso_date(session_date)
+        if iso in self.session_dates:
+            records = self.store.session_records(self.committee, iso)
+            self.rows = AttendanceRows.from_records(records, MINIMUM_ROWS)
+        else:
+            self.rows = AttendanceRows.from_members(self.roster, MINIMUM_ROWS)
+        self.rows_date = iso
+        self.dirty = False
+        return self.rows
+
+    def save_roster(self, members):
+        self.store.save_roster(self.committee, members)
+        self._roster = list(members)
+
+    def record_session(self, session_date, records):
+        """Saves one meeting's attendance; the grid rows count as saved."""
+        iso = to_iso_date(session_date)
+        self.store.record_session(self.committee, iso, records)
+        self.session_dates.add(iso)
+        self.rows_date = iso
+        self.dirty = False
+
+    def save_report_template(self, text):
+        self.store.save_report_template(self.committee, text)
+        self._report_template = text
+
+    def invalidate(self):
+        """Forgets what was read from the store so it is read again on next
+        use. Unsaved grid rows and report drafts are kept."""
+        self._roster = None
+        self._session_dates = None
+        self._report_template = None
+        if not self.dirty:
+            self.rows = None
+            self.rows_date = None
+
+
+class WorkspaceCache:
+    """The ``capacity`` most recently used workspaces of one store."""
+
+    def __init__(self, store, capacity=DEFAULT_CAPACITY):
+        self.store = store
+        self.capacity = capacity
+        self._workspaces = OrderedDict()
+
+    def get(self, committee):
+        """Returns the committee's workspace, creating it (without reading
+        anything yet) if it isn't cached."""
+        workspace = self._workspaces.get(committee)
+        if workspace is not None:
+            self._workspaces.move_to_end(committee)
+            return workspace
+        workspace = self._workspaces[committee] = CommitteeWorkspace(self.store, committee)
+        while len(self._workspaces) > self.capacity:
+            self._workspaces.popitem(last=False)
+        return workspace
+
+    def __contains__(self, committee):
+        return committee in self._workspaces
+
+    def __len__(self):
+        return len(self._workspaces)
+
+    def invalidate(self):
+        """Calls invalidate() on every cached workspace, e.g. after another
+        process has written to the store."""
+        for workspace in self._workspaces.values():
+            workspace.invalidate()
+
+    def clear(self):
+        self._workspaces.clear()
@@ -0,0 +1,227 @@
+"""Bulk import of historical attendance CSVs into the attendance store.
+
+Reads files written by "Export to CSV": a title row such as
+``Tech Fee Committee Attendance Record (09/20/2024)``, the header row, then
+one row per grid line. Blank padding rows from the fixed 20-row grid
+(``,,In-Person,Attending``) are dropped. The Virtual/In-Person and
+Attendance cells are matched to the app's options ignoring case, spaces and
+hyphens ("in person" is In-Person); a file with any other value is reported
+and skipped, since the grid can't show it. Files are deduplicated by a hash
+of their contents, so re-running an import over the same tree is a no-op.
+A meeting that already has attendance in the store (saved in the app, or
+from an edited copy of the file) is not replaced unless ``--overwrite`` is
+given; either way it is reported as a warning.
+
+    python csv_import.py EXPORTS_DIR --db attendance.db
+"""
+import sys
+import os
+import re
+import csv
+import time
+import hashlib
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import app_config
+import attendance_store
+from attendance_records import ATTENDANCE_HEADERS, ATTENDING_AS_OPTIONS, ATTENDANCE_OPTIONS, DATE_FORMAT
+
+TITLE_PATTERN = re.compile(r"^\s*(?P<committee>.+?) Attendance Record \((?P<date>\d{1,2}/\d{1,2}/\d{4})\)\s*$")
+
+# Below this many files, worker start-up costs more than it saves
+PARALLEL_THRESHOLD = 200
+BATCH_SIZE = 250
+
+
+class ImportFormatError(ValueError):
+    """Raised when a file is not an attendance CSV export."""
+
+
+def _option_key(value):
+    return re.sub(r"[\s_-]+", "", value).casefold()
+
+
+_CHOICES = {_option_key(option): option for option in ATTENDING_AS_OPTIONS}, \
+           {_option_key(option): option for option in ATTENDANCE_OPTIONS}
+
+
+def parse_attendance_csv(data, path='<bytes>'):
+    """Parses the bytes of an exported attendance CSV.
+
+    Returns (committee, date_text, records), where records are
+    [name, position, attending_as, attendance] rows with the blank padding
+    rows removed and the two choice columns spelt as the app spells them.
+    Raises ImportFormatError for a title date that doesn't exist and
+    listing the rows whose choices don't match.
+    """
+    text = data.decode('utf-8-sig')
+    reader = csv.reader(text.splitlines())
+    title = next(reader, None)
+    match = TITLE_PATTERN.match(title[0]) if title else None
+    if not match:
+        raise ImportFormatError(f"{path}: first row is not an attendance record title")
+    try:
+        datetime.strptime(match.group('date'), DATE_FORMAT)
+    except ValueError:
+        raise ImportFormatError(f"{path}: {match.group('date')!r} in the title is not a valid date") from None
+    header = next(reader, None)
+    if [h.strip() for h in header or []] != ATTENDANCE_HEADERS:
+        raise ImportFormatError(f"{path}: unexpected header row {header!r}")
+
+    records = []
+    invalid = []
+    for line, row in enumerate(reader, start=3):
+        if len(row) < 4:
+            row = row + [''] * (4 - len(row))
+        name = row[0].strip()
+        # Padding rows have neither a name nor a position
+        if not name:
+            continue
+        attending_as = _CHOICES[0].get(_option_key(row[2]))
+        attendance = _CHOICES[1].get(_option_key(row[3]))
+        if attending_as is None or attendance is None:
+            invalid.append(f"line {line} ({row[2].strip()!r}, {row[3].strip()!r})")
+            continue
+        records.append([name, row[1].strip(), attending_as, attendance])
+    if invalid:
+        raise ImportFormatError(
+            f"{path}: {ATTENDANCE_HEADERS[2]} must be {' or '.join(ATTENDING_AS_OPTIONS)} and "
+            f"{ATTENDANCE_HEADERS[3]} {' or '.join(ATTENDANCE_OPTIONS)}; not imported because of "
+            f"{', '.join(invalid[:5])}{f' and {len(invalid) - 5} more' if len(invalid) > 5 else ''}")
+    return match.group('committee'), match.group('date'), records
+
+
+def read_export(path):
+    """Reads, hashes and parses one file. Runs in a worker process, so errors
+    are returned rather than raised."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        content_hash = hashlib.sha256(data).hexdigest()
+        committee, date_text, records = parse_attendance_csv(data, path)
+        return {'path': path, 'hash': content_hash, 'committee': committee,
+                'date': date_text, 'records': records, 'error': None}
+    except Exception as e:
+        return {'path': path, 'error': str(e) if isinstance(e, ImportFormatError) else f"{path}: {e}"}
+
+
+def find_csv_files(directory):
+    """Returns every *.csv file under ``directory`` in sorted order."""
+    found = []
+    for root, _dirs, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith('.csv'):
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def import_directory(store, directory, workers=None, batch_size=BATCH_SIZE, overwrite=False):
+    """Imports every attendance CSV under ``directory`` into ``store``.
+
+    Files are read in parallel when there are many of them and written in
+    batches of ``batch_size`` sessions per transaction. Returns a summary
+    dict with counts, errors, warnings and files/sec and rows/sec rates.
+    ``rows`` counts the rows stored: a file listing a name twice keeps only
+    the last of those rows, which is reported as a warning. Files for
+    meetings the store already has are counted in ``existing`` and skipped,
+    or replace the stored meeting if ``overwrite`` is true; both are
+    reported as warnings.
+    """
+    start = time.perf_counter()
+    paths = find_csv_files(directory)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    known = store.imported_hashes()
+    summary = {'files': len(paths), 'imported': 0, 'duplicates': 0, 'existing': 0, 'rows': 0,
+               'errors': [], 'warnings': []}
+    batch = []
+
+    def flush():
+        dates = {path: (committee, date_text) for _, path, committee, date_text, _ in batch}
+        for path, rows, repeated, existed in store.import_sessions(batch, overwrite):
+            if existed:
+                committee, date_text = dates[path]
+                if not overwrite:
+                    summary['existing'] += 1
+                    summary['warnings'].append(
+                        (path, f"{path}: {committee} already has attendance for {date_text}; "
+                               f"not imported (use --overwrite to replace it)"))
+                    continue
+                summary['warnings'].append(
+                    (path, f"{path}: replaced the attendance already stored for {committee} on {date_text}"))
+            summary['imported'] += 1
+            summary['rows'] += rows
+            if repeated:
+                summary['warnings'].append(
+                    (path, f"{path}: {', '.join(repeated)} listed more than once; kept the last row"))
+        batch.clear()
+
+    if workers > 1 and len(paths) >= PARALLEL_THRESHOLD:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(read_export, paths, chunksize=max(1, len(paths) // (workers * 8)))
+    else:
+        pool = None
+        results = map(read_export, paths)
+    try:
+        for result in results:
+            if result['error']:
+                summary['errors'].append((result['path'], result['error']))
+                continue
+            if result['hash'] in known:
+                summary['duplicates'] += 1
+                continue
+            known.add(result['hash'])
+            batch.append((result['hash'], result['path'], result['committee'],
+                          result['date'], result['records']))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - start
+    summary['seconds'] = elapsed
+    summary['files_per_second'] = len(paths) / elapsed if elapsed > 0 else 0.0
+    summary['rows_per_second'] = summary['rows'] / elapsed if elapsed > 0 else 0.0
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import exported attendance CSVs into the attendance database.")
+    parser.add_argument("directory", help="Directory tree to scan for *.csv exports")
+    parser.add_argument("--db", help="Attendance database path (default: from the config file)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Worker processes for reading files (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="Sessions written per transaction")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Replace meetings that already have attendance in the database")
+    app_config.add_argument(parser)
+    args = parser.parse_args(argv)
+    try:
+        config = app_config.load_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    with attendance_store.AttendanceStore(args.db or config.store_path) as store:
+        summary = import_directory(store, args.directory, args.jobs, args.batch_size, args.overwrite)
+
+    for _path, error in summary['errors']:
+        print(f"Skipped {error}", file=sys.stderr)
+    for _path, warning in summary['warnings']:
+        print(f"Warning: {warning}", file=sys.stderr)
+    print(f"Scanned {summary['files']} file(s): {summary['imported']} imported, "
+          f"{summary['duplicates']} duplicate(s), {summary['existing']} already stored, "
+          f"{len(summary['errors'])} error(s), "
+          f"{summary['rows']} row(s) in {summary['seconds']:.2f}s "
+          f"({summary['files_per_second']:.0f} files/sec, {summary['rows_per_second']:.0f} rows/sec)")
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
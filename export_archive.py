@@ -0,0 +1,325 @@
+"""Content-addressed archive of exported PDFs and CSVs.
+
+Every export can be kept without re-exports costing extra space. Each file
+is stored once under ``objects/``, named by the SHA-256 of its content, and
+a small SQLite index (archive.db) records which committee, meeting date and
+export kind each archived export belongs to:
+
+    ARCHIVE_DIR/archive.db
+    ARCHIVE_DIR/objects/3f/3fa4...e1.pdf
+    ARCHIVE_DIR/objects/9b/9b07...c2.csv.gz     (CSVs, when compressed)
+
+ReportLab stamps every PDF with its creation time and a /ID derived from
+it, so PDFs are hashed with those fields blanked out: exporting an
+unchanged document again gives the same hash and only adds an index row
+(the first copy archived is the one kept). CSVs can be stored gzipped.
+
+Lookups such as "all packets for committee X this semester" are answered
+from the index on (committee, kind, date) instead of by listing
+directories. Turn archiving on with ``archive_dir`` in the config file (see
+app_config); this module also has a command line for adding existing
+exports and querying the archive. It only uses the standard library.
+
+    python export_archive.py add "Proof Image Folder/"
+    python export_archive.py find --committee "Tech Fee Committee" --kind packet --semester "Fall 2024"
+"""
+import sys
+import os
+import re
+import gzip
+import sqlite3
+import hashlib
+import argparse
+from datetime import date, datetime
+
+import app_config
+from attendance_records import default_filename
+from attendance_store import to_iso_date
+
+INDEX_FILENAME = "archive.db"
+OBJECTS_DIRNAME = "objects"
+KINDS = ("csv", "pdf", "report", "packet")
+# Semesters as attendance_analytics counts them: (first month, last month)
+SEMESTERS = {"Spring": (1, 5), "Summer": (6, 7), "Fall": (8, 12)}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exports (
+    id INTEGER PRIMARY KEY,
+    committee TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    date TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES objects(hash),
+    filename TEXT NOT NULL,
+    archived_at TEXT NOT NULL,
+    -- How many times this content was archived for the export
+    copies INTEGER NOT NULL DEFAULT 1,
+    -- Also the index for lookups by committee, kind and date
+    UNIQUE (committee, kind, date, hash)
+);
+CREATE INDEX IF NOT EXISTS idx_exports_date ON exports(date);
+"""
+
+# Fields ReportLab changes on every build of the same document
+_PDF_VOLATILE = re.compile(rb"/(?:CreationDate|ModDate) \(D:[^)]*\)|/ID\s*\[<[0-9a-fA-F]*><[0-9a-fA-F]*>\]")
+_EXPORT_NAME = re.compile(r"(?P<prefix>.+?)_(?P<what>Attendance|Weekly_Report|Meeting_Packet)_"
+                          r"(?P<stamp>\d{2}-\d{2}-\d{4})(?: \(\d+\))?\.(?P<ext>pdf|csv)$", re.IGNORECASE)
+_KIND_BY_NAME = {('attendance', 'csv'): 'csv', ('attendance', 'pdf'): 'pdf',
+                 ('weekly_report', 'pdf'): 'report', ('meeting_packet', 'pdf'): 'packet'}
+
+
+def content_hash(data, kind):
+    """The archive key for an export: a SHA-256 of its bytes, ignoring the
+    build time stamps in PDFs."""
+    if kind != "csv":
+        data = _PDF_VOLATILE.sub(b"", data)
+    return hashlib.sha256(data).hexdigest()
+
+
+def parse_export_filename(filename):
+    """Returns (committee, date, kind) for a file named by
+    attendance_records.default_filename() (a `` (2)`` style copy suffix is
+    allowed), or None. Underscores in the committee name become spaces."""
+    match = _EXPORT_NAME.match(os.path.basename(filename))
+    if not match:
+        return None
+    kind = _KIND_BY_NAME.get((match['what'].lower(), match['ext'].lower()))
+    if kind is None:
+        return None
+    session_date = datetime.strptime(match['stamp'], '%m-%d-%Y').date()
+    return match['prefix'].replace('_', ' '), session_date, kind
+
+
+def semester_dates(name):
+    """Returns the (first, last) dates of a semester such as "Fall 2024"."""
+    try:
+        term, year = name.split()
+        first_month, last_month = SEMESTERS[term.capitalize()]
+        year = int(year)
+    except (ValueError, KeyError):
+        raise ValueError(f"bad semester {name!r} (e.g. 'Fall 2024'; terms: {', '.join(SEMESTERS)})") from None
+    last_day = date(year + 1, 1, 1) if last_month == 12 else date(year, last_month + 1, 1)
+    return date(year, first_month, 1), date.fromordinal(last_day.toordinal() - 1)
+
+
+class ExportArchive:
+    """An archive directory and its index.
+
+    Use as a context manager or call close() when done. Like the attendance
+    store, one instance belongs to the thread that opened it; several
+    processes may write to the same archive.
+    """
+
+    def __init__(self, directory, compress_csv=False):
+        self.directory = directory
+        self.compress_csv = compress_csv
+        os.makedirs(os.path.join(directory, OBJECTS_DIRNAME), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, INDEX_FILENAME), timeout=30)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def add(self, data, committee, session_date, kind, filename=None):
+        """Archives one export; returns (hash, stored) where ``stored`` is
+        False if identical content was already in the archive."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown export kind: {kind}")
+        iso = to_iso_date(session_date)
+        digest = content_hash(data, kind)
+        if filename is None:
+            filename = default_filename(kind, committee, date.fromisoformat(iso))
+        stored = self.conn.execute("SELECT 1 FROM objects WHERE hash = ?", (digest,)).fetchone() is None
+        if stored:
+            # The object is in place before the index mentions it
+            path, stored_size = self._write_object(digest, data, kind)
+        with self.conn:
+            if stored:
+                self.conn.execute("INSERT OR IGNORE INTO objects (hash, path, size, stored_size) VALUES (?, ?, ?, ?)",
+                                  (digest, path, len(data), stored_size))
+            self.conn.execute(
+                """INSERT INTO exports (committee, kind, date, hash, filename, archived_at) VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (committee, kind, date, hash) DO UPDATE SET copies = copies + 1""",
+                (committee, kind, iso, digest, os.path.basename(filename),
+                 datetime.now().isoformat(timespec='seconds')))
+        return digest, stored
+
+    def _write_object(self, digest, data, kind):
+        name = digest + (".csv" if kind == "csv" else ".pdf")
+        if kind == "csv" and self.compress_csv:
+            name += ".gz"
+            # mtime=0 so the same CSV always compresses to the same bytes
+            data = gzip.compress(data, mtime=0)
+        path = os.path.join(OBJECTS_DIRNAME, digest[:2], name)
+        full_path = os.path.join(self.directory, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        partial_path = f"{full_path}.{os.getpid()}.part"
+        with open(partial_path, 'wb') as f:
+            f.write(data)
+        os.replace(partial_path, full_path)
+        return path, len(data)
+
+    def add_file(self, path):
+        """Archives an export file named by default_filename(); returns
+        (hash, stored), or None if the name isn't an export name."""
+        parsed = parse_export_filename(path)
+        if parsed is None:
+            return None
+        with open(path, 'rb') as f:
+            data = f.read()
+        return self.add(data, *parsed, filename=path)
+
+    def find(self, committee=None, kind=None, start=None, end=None):
+        """Returns [{'committee', 'kind', 'date', 'hash', 'filename',
+        'archived_at', 'size'}] ordered by date, optionally limited to one
+        committee, one kind and an inclusive date range."""
+        query = ["""SELECT e.committee, e.kind, e.date, e.hash, e.filename, e.archived_at, o.size
+                    FROM exports e JOIN objects o ON o.hash = e.hash WHERE 1 = 1"""]
+        params = []
+        if committee is not None:
+            query.append("AND e.committee = ?")
+            params.append(committee)
+        if kind is not None:
+            query.append("AND e.kind = ?")
+            params.append(kind)
+        if start is not None:
+            query.append("AND e.date >= ?")
+            params.append(to_iso_date(start))
+        if end is not None:
+            query.append("AND e.date <= ?")
+            params.append(to_iso_date(end))
+        query.append("ORDER BY e.date, e.committee, e.kind, e.archived_at")
+        columns = ('committee', 'kind', 'date', 'hash', 'filename', 'archived_at', 'size')
+        return [dict(zip(columns, row)) for row in self.conn.execute(" ".join(query), params)]
+
+    def read(self, digest):
+        """Returns the archived bytes for a hash (decompressed)."""
+        row = self.conn.execute("SELECT path FROM objects WHERE hash = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        with open(os.path.join(self.directory, row[0]), 'rb') as f:
+            data = f.read()
+        return gzip.decompress(data) if row[0].endswith(".gz") else data
+
+    def stats(self):
+        """Returns counts and sizes: ``exports`` counts every archived copy and
+        ``bytes`` is what they would take as separate files; ``stored_bytes``
+        is what they take here."""
+        exports, logical = self.conn.execute(
+            "SELECT COALESCE(SUM(e.copies), 0), COALESCE(SUM(e.copies * o.size), 0) "
+            "FROM exports e JOIN objects o ON o.hash = e.hash").fetchone()
+        objects, stored = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(stored_size), 0) FROM objects").fetchone()
+        return {'exports': exports, 'objects': objects, 'bytes': logical, 'stored_bytes': stored}
+
+
+def archive_export(directory, data, committee, session_date, kind, filename, warnings=None, compress_csv=False):
+    """Adds one export to the archive in ``directory``, opening and closing it
+    around the call so it can run on any export thread or worker process.
+    Archiving must never fail an export, so problems are appended to
+    ``warnings`` (when given) instead of raised."""
+    try:
+        with ExportArchive(directory, compress_csv) as archive:
+            archive.add(data, committee, session_date, kind, filename)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        if warnings is not None:
+            warnings.append(f"Could not archive {os.path.basename(filename)}: {e}")
+
+
+def _export_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _dirs, files in os.walk(path):
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add exports to the export archive or look them up.")
+    parser.add_argument("--archive", help="Archive directory (default: archive_dir from the config file)")
+    app_config.add_argument(parser)
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="Archive existing export files (or directories of them)")
+    add.add_argument("paths", nargs="+")
+    add.add_argument("--compress-csv", action="store_true", default=None,
+                     help="Store CSVs gzipped (default: archive_compress_csv from the config file)")
+    find = commands.add_parser("find", help="List archived exports")
+    find.add_argument("--committee")
+    find.add_argument("--kind", choices=KINDS)
+    find.add_argument("--from", dest="start", help="First date (MM/DD/YYYY or YYYY-MM-DD)")
+    find.add_argument("--to", dest="end", help="Last date (MM/DD/YYYY or YYYY-MM-DD)")
+    find.add_argument("--semester", help='A semester such as "Fall 2024" (instead of --from/--to)')
+    extract = commands.add_parser("extract", help="Write an archived export out to a file")
+    extract.add_argument("hash")
+    extract.add_argument("-o", "--output", required=True)
+    commands.add_parser("stats", help="Show how much space the archive saves")
+    args = parser.parse_args(argv)
+
+    try:
+        config = app_config.load_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    directory = args.archive or config.archive_dir
+    if not directory:
+        parser.error("no archive: pass --archive or set archive_dir in the config file")
+    compress_csv = getattr(args, 'compress_csv', None)
+    if compress_csv is None:
+        compress_csv = config.archive_compress_csv
+
+    with ExportArchive(directory, compress_csv) as archive:
+        if args.command == "add":
+            added = stored = skipped = 0
+            for path in _export_files(args.paths):
+                result = archive.add_file(path)
+                if result is None:
+                    skipped += 1
+                    continue
+                added += 1
+                stored += result[1]
+            print(f"Archived {added} export(s), {added - stored} already stored; "
+                  f"skipped {skipped} file(s) not named like exports")
+        elif args.command == "find":
+            start, end = args.start, args.end
+            try:
+                if args.semester:
+                    start, end = semester_dates(args.semester)
+                for entry in archive.find(args.committee, args.kind, start, end):
+                    print(f"{entry['date']}  {entry['kind']:<7} {entry['committee']:<30} "
+                          f"{entry['hash'][:12]}  {entry['filename']}")
+            except ValueError as e:
+                parser.error(str(e))
+        elif args.command == "extract":
+            try:
+                data = archive.read(args.hash)
+            except KeyError:
+                matches = [e['hash'] for e in archive.find() if e['hash'].startswith(args.hash)]
+                if len(set(matches)) != 1:
+                    parser.error(f"no single archived export matches {args.hash}")
+                data = archive.read(matches[0])
+            with open(args.output, 'wb') as f:
+                f.write(data)
+        else:
+            stats = archive.stats()
+            print(f"{stats['exports']} export(s) in {stats['objects']} object(s): "
+                  f"{stats['stored_bytes'] / 1024:.1f} KiB stored for {stats['bytes'] / 1024:.1f} KiB of exports")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Runs exports on a background thread so the window stays responsive.
+
+The GUI takes a snapshot of the rows/report text on the GUI thread and hands
+ExportWorker a render function that only touches that snapshot. The worker
+reports progress, honours cancellation between layout steps, and collects
+warnings (e.g. a missing watermark) so they can be shown once per export.
+When instrumentation is on, the render and the file write are recorded in
+the export's trace.
+"""
+import os
+import threading
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+import instrumentation
+from attendance_records import ExportCancelled
+
+
+class ExportWorker(QObject):
+    """Renders one export off the GUI thread and writes it to ``file_path``.
+
+    ``render(warnings, progress)`` must return the file's bytes; it is called
+    on the worker thread with a list to append warnings to and a
+    progress(done, total) callback. ``trace`` is the export's
+    instrumentation trace; it is entered on the worker thread.
+    ``after_write(data, warnings)``, if given, also runs on the worker thread
+    once the file is in place (the app uses it to archive the export).
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(str, list)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, render, file_path, trace=None, after_write=None):
+        super().__init__()
+        self.render = render
+        self.file_path = file_path
+        self.after_write = after_write
+        self.trace = trace if trace is not None else instrumentation.NULL_TRACE
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Asks the export to stop at the next progress step."""
+        self._cancel.set()
+
+    def _report_progress(self, done, total):
+        if self._cancel.is_set():
+            raise ExportCancelled()
+        self.progress.emit(done, total)
+
+    def run(self):
+        warnings = []
+        try:
+            with self.trace:
+                data = self.render(warnings, self._report_progress)
+                if self._cancel.is_set():
+                    raise ExportCancelled()
+                # Write next to the target and swap in, so a failure never leaves half a file
+                partial_path = self.file_path + ".part"
+                with self.trace.stage('write'):
+                    try:
+                        with open(partial_path, 'wb') as f:
+                            f.write(data)
+                        os.replace(partial_path, self.file_path)
+                    except BaseException:
+                        # Disk full, permission denied...: don't leave the .part behind
+                        try:
+                            os.remove(partial_path)
+                        except OSError:
+                            pass
+                        raise
+                self.trace.count('bytes_written', len(data))
+            if self.after_write is not None:
+                self.after_write(data, warnings)
+        except ExportCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        # Each warning once, in the order first seen
+        self.finished.emit(self.file_path, list(dict.fromkeys(warnings)))
+
+
+def start_export(parent, render, file_path, on_progress, on_finished, on_failed, on_cancelled, trace=None,
+                 after_write=None):
+    """Starts ``render`` on a new QThread and returns the worker.
+
+    The handlers are connected before the thread starts, so no signal is
+    missed; they run on the GUI thread. The thread quits and both objects are
+    cleaned up once the worker finishes, fails or is cancelled.
+    """
+    thread = QThread(parent)
+    worker = ExportWorker(render, file_path, trace, after_write)
+    worker.moveToThread(thread)
+    worker.progress.connect(on_progress)
+    worker.finished.connect(on_finished)
+    worker.failed.connect(on_failed)
+    worker.cancelled.connect(on_cancelled)
+    thread.started.connect(worker.run)
+    for signal in (worker.finished, worker.failed, worker.cancelled):
+        signal.connect(thread.quit)
+    thread.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    thread.start()
+    return worker
@@ -0,0 +1,93 @@
+"""A small polling file watcher.
+
+Files the app caches (the watermark image, the attendance database, the
+config file) are checked by one daemon thread every few seconds instead of
+on every export or page. A file counts as changed when its mtime or size
+differs from the last check, including when it appears or disappears.
+Callers that cache file contents ask mtime() for the last observed
+modification time and treat a different value as stale.
+
+Only uses the standard library, so it is safe to start before the PDF stack
+is loaded.
+"""
+import os
+import threading
+
+DEFAULT_INTERVAL = 2.0
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """Polls the watched paths every ``interval`` seconds once started.
+
+    Callbacks are called with the path on the watcher thread, so they must
+    be thread-safe (in the GUI, emit a signal from them).
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self._watched = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, path, callback=None):
+        """Starts watching ``path``; ``callback(path)`` runs when it changes."""
+        path = os.path.abspath(path)
+        signature = _signature(path)
+        with self._lock:
+            entry = self._watched.setdefault(path, [signature, []])
+            if callback is not None:
+                entry[1].append(callback)
+        return path
+
+    def unwatch(self, path):
+        with self._lock:
+            self._watched.pop(os.path.abspath(path), None)
+
+    def mtime(self, path):
+        """The modification time (ns) seen at the last check, or None if the
+        file is missing or not watched."""
+        with self._lock:
+            entry = self._watched.get(os.path.abspath(path))
+        return entry[0][0] if entry is not None and entry[0] is not None else None
+
+    def poll(self):
+        """Checks every watched path once and returns the ones that changed."""
+        with self._lock:
+            paths = list(self._watched)
+        changed = []
+        for path in paths:
+            signature = _signature(path)
+            with self._lock:
+                entry = self._watched.get(path)
+                if entry is None or entry[0] == signature:
+                    continue
+                entry[0] = signature
+                callbacks = list(entry[1])
+            changed.append(path)
+            for callback in callbacks:
+                callback(path)
+        return changed
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
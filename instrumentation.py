@@ -0,0 +1,196 @@
+"""Opt-in timing and profiling for exports.
+
+Every export runs inside ``export_trace()``. When tracing is off (the
+default) that returns a shared no-op trace, so the cost is a thread-local
+lookup per stage. When it is on, each export records:
+
+* per-stage wall time (``read_widgets``, ``table``, ``table_style``,
+  ``layout``, ``watermark``, ``csv``, ``write``; ``layout`` includes the
+  watermark and, for streamed rosters, table building, since ReportLab calls
+  those while it lays out pages),
+* counters (``rows``, ``pages``, ``bytes_written``, ``image_decodes``,
+  ``paragraph_cache_hits``, ``paragraph_cache_misses``),
+
+and appends them as one JSON object per line to the trace log. With a
+profile directory set, each export also gets a cProfile ``.pstats`` dump.
+
+Turn it on with the environment variables ATTENDANCE_TRACE_LOG (a JSON lines
+file) and/or ATTENDANCE_PROFILE_DIR, or with the ``--trace``/``--profile``
+flags of the app and the command line tools, which call configure(). The
+settings live in the environment so batch worker processes inherit them.
+
+Code deeper in the export path records into whichever trace is active on
+its thread::
+
+    trace = instrumentation.current()
+    with trace.stage('layout'):
+        doc.build(...)
+    trace.count('pages', doc.page)
+"""
+import os
+import sys
+import json
+import time
+import itertools
+import threading
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from attendance_records import ExportCancelled
+
+TRACE_LOG_ENV = "ATTENDANCE_TRACE_LOG"
+PROFILE_DIR_ENV = "ATTENDANCE_PROFILE_DIR"
+
+_local = threading.local()
+_log_lock = threading.Lock()
+_profile_ids = itertools.count(1)
+
+
+def configure(log_path=None, profile_dir=None):
+    """Turns on the trace log and/or per-export profiles for this process and
+    any worker processes it starts."""
+    if log_path:
+        os.environ[TRACE_LOG_ENV] = os.path.abspath(log_path)
+    if profile_dir:
+        os.environ[PROFILE_DIR_ENV] = os.path.abspath(profile_dir)
+
+
+def add_arguments(parser):
+    """Adds the --trace and --profile options to a command line parser."""
+    parser.add_argument("--trace", metavar="LOG",
+                        help=f"Append per-export timings to this JSON lines file (or set {TRACE_LOG_ENV})")
+    parser.add_argument("--profile", metavar="DIR",
+                        help=f"Write a cProfile .pstats file per export into DIR (or set {PROFILE_DIR_ENV})")
+
+
+class _NullTrace:
+    """Stands in for a trace when instrumentation is off."""
+
+    _stage = nullcontext()
+
+    def stage(self, name):
+        return self._stage
+
+    def count(self, name, amount=1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_TRACE = _NullTrace()
+
+
+class ExportTrace:
+    """Timings and counters for one export.
+
+    The clock starts when the trace is created, so work done before the
+    ``with`` block (such as reading the grid on the GUI thread) can be timed
+    with stage() and still counts. The trace is active, and the profiler
+    runs, only on the thread that enters it.
+    """
+
+    def __init__(self, export, log_path=None, profile_dir=None, **fields):
+        self.export = export
+        self.fields = fields
+        self.log_path = log_path
+        self.profile_dir = profile_dir
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.stages = defaultdict(float)
+        self.counters = defaultdict(int)
+        self._profiler = None
+
+    @contextmanager
+    def stage(self, name):
+        """Adds the time spent in the block to ``name``; repeated stages add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - start
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        if self.profile_dir and len(stack) == 1:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        profile_path = None
+        if self._profiler is not None:
+            self._profiler.disable()
+            profile_path = self._dump_profile()
+        _local.stack.pop()
+        if exc_type is None:
+            status = "ok"
+        elif issubclass(exc_type, ExportCancelled):
+            status = "cancelled"
+        else:
+            status = "error"
+        record = {
+            'export': self.export,
+            **self.fields,
+            'status': status,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'seconds': time.perf_counter() - self._start,
+            'stages': dict(self.stages),
+            'counters': dict(self.counters),
+            'pid': os.getpid(),
+        }
+        if status == "error":
+            record['error'] = f"{exc_type.__name__}: {exc}"
+        if profile_path:
+            record['profile'] = profile_path
+        if self.log_path:
+            self._write(record)
+        return False
+
+    def _dump_profile(self):
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))
+            path = os.path.join(self.profile_dir,
+                                f"{self.export}-{stamp}-{os.getpid()}-{next(_profile_ids)}.pstats")
+            self._profiler.dump_stats(path)
+            return path
+        except OSError as e:
+            print(f"Could not write export profile: {e}", file=sys.stderr)
+            return None
+
+    def _write(self, record):
+        line = json.dumps(record, default=str) + "\n"
+        try:
+            with _log_lock, open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        except OSError as e:
+            # Instrumentation must never fail an export
+            print(f"Could not write export trace: {e}", file=sys.stderr)
+
+
+def export_trace(export, **fields):
+    """Returns the trace for one export: a real ExportTrace when tracing or
+    profiling is configured, otherwise NULL_TRACE. ``fields`` (e.g. the
+    output path) are copied into the log record."""
+    log_path = os.environ.get(TRACE_LOG_ENV)
+    profile_dir = os.environ.get(PROFILE_DIR_ENV)
+    if not log_path and not profile_dir:
+        return NULL_TRACE
+    return ExportTrace(export, log_path, profile_dir, **fields)
+
+
+def current():
+    """The innermost trace entered on this thread, or NULL_TRACE."""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else NULL_TRACE
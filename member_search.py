@@ -0,0 +1,303 @@
+"""Fast prefix and fuzzy search over every known member name and position.
+
+Autocomplete has to answer on every keystroke, so nothing here scans the
+whole directory per query:
+
+- whole-string prefixes ("jane d") are a bisect into a sorted list of the
+  normalized strings;
+- word prefixes ("do" finds "Jane Doe") are a bisect into a sorted list of
+  (word, id) pairs, scanning only the rarest query word's range;
+- typos ("jnae doe") fall back to a symmetric-delete index over the distinct
+  words: every word is also filed under each spelling with one letter
+  dropped, so a query word reaches words one insertion, deletion,
+  substitution or swap away with a handful of dict lookups. The fallback
+  only runs when prefixes found too little.
+
+Entries can be added and removed one at a time, so saving a roster only
+touches the names that changed. Matching ignores case, accents and extra
+whitespace. Stdlib only.
+"""
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+
+DEFAULT_LIMIT = 10
+# Words shorter than this only match by prefix; one typo in two letters is
+# a different word
+MIN_FUZZY_LENGTH = 3
+# Caps the word-prefix scan for queries like "j s" whose words are all common
+MAX_SCAN = 5000
+
+_WORD = re.compile(r"\w+")
+_END = "\uffff"
+
+
+def normalize(text):
+    """Casefolds, strips accents and collapses whitespace."""
+    text = unicodedata.normalize('NFKD', text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())
+
+
+def _starts_words(words):
+    """A matcher for normalized strings in which every one of ``words``
+    starts a word, in any order."""
+    if len(words) == 1:
+        return re.compile(rf"\b{re.escape(words[0])}").search
+    return re.compile("".join(rf"(?=.*\b{re.escape(word)})" for word in words)).match
+
+
+def deletes(word):
+    """The spellings of ``word`` with one letter dropped."""
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class SearchIndex:
+    """An incrementally updated prefix/typo index over a set of strings.
+
+    Strings that normalize to the same key are one entry; the first spelling
+    added is the one returned.
+    """
+
+    def __init__(self, texts=()):
+        self._next_id = 0
+        self._ids = {}        # normalized -> id
+        self._texts = {}      # id -> (text, normalized, words)
+        self._sorted = []     # (normalized, id)
+        self._words = []      # (word, id)
+        self._word_ids = {}   # word -> set of ids
+        self._deletes = {}    # word with a letter dropped -> set of words
+        self.update(texts)
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, text):
+        return normalize(text) in self._ids
+
+    def __iter__(self):
+        return (entry[0] for entry in self._texts.values())
+
+    def get(self, text):
+        """The indexed spelling of ``text``, or None."""
+        entry_id = self._ids.get(normalize(text))
+        return None if entry_id is None else self._texts[entry_id][0]
+
+    def update(self, texts):
+        """Adds many strings at once, sorting once instead of per string."""
+        for text in texts:
+            self.add(text, _sort=False)
+        self._resort()
+
+    def _resort(self):
+        self._sorted.sort()
+        self._words.sort()
+
+    def add(self, text, _sort=True):
+        """Adds ``text``; returns False if it (or a spelling of it) was already there."""
+        key = normalize(text)
+        if not key or key in self._ids:
+            return False
+        insert = insort if _sort else list.append
+        entry_id = self._next_id
+        self._next_id += 1
+        words = tuple(dict.fromkeys(_WORD.findall(key)))
+        self._ids[key] = entry_id
+        self._texts[entry_id] = (text, key, words)
+        insert(self._sorted, (key, entry_id))
+        for word in words:
+            insert(self._words, (word, entry_id))
+            ids = self._word_ids.get(word)
+            if ids is None:
+                ids = self._word_ids[word] = set()
+                if len(word) >= MIN_FUZZY_LENGTH:
+                    for variant in deletes(word):
+                        self._deletes.setdefault(variant, set()).add(word)
+            ids.add(entry_id)
+        return True
+
+    def remove(self, text):
+        """Removes ``text``; returns False if it wasn't indexed."""
+        entry_id = self._ids.pop(normalize(text), None)
+        if entry_id is None:
+            return False
+        _, key, words = self._texts.pop(entry_id)
+        self._discard(self._sorted, (key, entry_id))
+        for word in words:
+            self._discard(self._words, (word, entry_id))
+            ids = self._word_ids[word]
+            ids.discard(entry_id)
+            if not ids:
+                del self._word_ids[word]
+                if len(word) >= MIN_FUZZY_LENGTH:
+                    for variant in deletes(word):
+                        spellings = self._deletes[variant]
+                        spellings.discard(word)
+                        if not spellings:
+                            del self._deletes[variant]
+        return True
+
+    @staticmethod
+    def _discard(items, item):
+        i = bisect_left(items, item)
+        if i < len(items) and items[i] == item:
+            del items[i]
+
+    @staticmethod
+    def _range(items, prefix):
+        return bisect_left(items, (prefix,)), bisect_left(items, (prefix + _END,))
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Returns up to ``limit`` indexed strings matching ``query``: whole
+        prefix matches first, then word prefix matches, then close spellings."""
+        key = normalize(query)
+        if not key or limit <= 0:
+            return []
+        found = []
+        seen = set()
+
+        lo, hi = self._range(self._sorted, key)
+        for _, entry_id in self._sorted[lo:min(hi, lo + limit)]:
+            found.append(entry_id)
+            seen.add(entry_id)
+
+        words = _WORD.findall(key)
+        if len(found) < limit and words:
+            self._word_matches(words, limit, found, seen)
+        if len(found) < limit and words:
+            self._fuzzy_matches(words, limit, found, seen)
+        return [self._texts[entry_id][0] for entry_id in found]
+
+    def _word_matches(self, words, limit, found, seen):
+        """Entries where every query word starts one of the entry's words."""
+        ranges = sorted((self._range(self._words, word) for word in words), key=lambda r: r[1] - r[0])
+        lo, hi = ranges[0]
+        matches = _starts_words(words) if len(words) > 1 else None
+        for _, entry_id in self._words[lo:min(hi, lo + MAX_SCAN)]:
+            if entry_id in seen:
+                continue
+            if matches is None or matches(self._texts[entry_id][1]):
+                found.append(entry_id)
+                seen.add(entry_id)
+                if len(found) >= limit:
+                    return
+
+    def _close_words(self, word):
+        """Indexed words within one edit (or one swap) of ``word``."""
+        close = set(self._deletes.get(word, ()))
+        for variant in deletes(word):
+            if variant in self._word_ids:
+                close.add(variant)
+            close.update(self._deletes.get(variant, ()))
+        close.discard(word)
+        return close
+
+    def _fuzzy_matches(self, words, limit, found, seen):
+        """Entries where every query word is a prefix or a close spelling of
+        one of the entry's words, fewest typos first."""
+        lookups = []
+        for word in words:
+            close = self._close_words(word) if len(word) >= MIN_FUZZY_LENGTH else set()
+            lo, hi = self._range(self._words, word)
+            size = hi - lo + sum(len(self._word_ids[w]) for w in close)
+            lookups.append((size, word, close, lo, min(hi, lo + MAX_SCAN)))
+        # Only the most selective word's entries are collected; the survivors
+        # are checked against the other words directly
+        lookups.sort(key=lambda lookup: lookup[0])
+        _, _, close, lo, hi = lookups[0]
+        typos = {}
+        for word in close:
+            for entry_id in self._word_ids[word]:
+                typos[entry_id] = 1
+        for _, entry_id in self._words[lo:hi]:
+            typos[entry_id] = 0
+        for _, word, close, _, _ in lookups[1:]:
+            starts_word = _starts_words([word])
+            for entry_id in list(typos):
+                _, key, entry_words = self._texts[entry_id]
+                if starts_word(key):
+                    continue
+                if close and not close.isdisjoint(entry_words):
+                    typos[entry_id] += 1
+                else:
+                    del typos[entry_id]
+        ranked = sorted((count, self._texts[entry_id][1], entry_id)
+                        for entry_id, count in typos.items() if count and entry_id not in seen)
+        for _, _, entry_id in ranked[:limit - len(found)]:
+            found.append(entry_id)
+            seen.add(entry_id)
+
+
+class MemberDirectory:
+    """Everyone the store knows about, with the position each last held,
+    indexed for name and position autocomplete."""
+
+    def __init__(self, members=()):
+        self.names = SearchIndex()
+        self.positions = SearchIndex()
+        self._positions = {}            # name -> position
+        self._holders = Counter()       # normalized position -> members holding it
+        for name, position in members:
+            self.add(name, position, _sort=False)
+        self.names._resort()
+        self.positions._resort()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def add(self, name, position='', _sort=True):
+        """Adds a member, or updates their position if they're already known."""
+        name = self.names.get(name) or name.strip()
+        if not name:
+            return
+        if name in self._positions:
+            self._release(self._positions[name])
+        else:
+            self.names.add(name, _sort)
+        position = position.strip()
+        self._positions[name] = position
+        if position:
+            self._holders[normalize(position)] += 1
+            self.positions.add(position, _sort)
+
+    def remove(self, name):
+        """Forgets a member; positions nobody else holds go with them."""
+        name = self.names.get(name)
+        if name is None:
+            return
+        self.names.remove(name)
+        self._release(self._positions.pop(name))
+
+    def _release(self, position):
+        if not position:
+            return
+        key = normalize(position)
+        self._holders[key] -= 1
+        if self._holders[key] <= 0:
+            del self._holders[key]
+            self.positions.remove(position)
+
+    def sync(self, names, positions):
+        """Brings ``names`` up to date with ``positions`` ({name: position}, as
+        read back from the store): names found there are added or updated,
+        the others removed."""
+        for name in names:
+            if name in positions:
+                self.add(name, positions[name])
+            else:
+                self.remove(name)
+
+    def position_of(self, name):
+        """The member's last known position, or '' if unknown. Any spelling
+        that normalizes to a known name works."""
+        return self._positions.get(self.names.get(name) or name.strip(), '')
+
+    def complete_names(self, text, limit=DEFAULT_LIMIT):
+        return self.names.search(text, limit)
+
+    def complete_positions(self, text, limit=DEFAULT_LIMIT):
+        return self.positions.search(text, limit)
@@ -0,0 +1,354 @@
+"""Process-wide cache for the resources every PDF export shares.
+
+The watermark is kept in memory as JPEG bytes keyed by (path, mtime). A JPEG
+file is kept exactly as it is and embedded with DCTDecode, so no document
+decodes or re-compresses it; other formats, and JPEG variants ReportLab
+can't embed, are converted to a 150 dpi JPEG once. The app passes the mtime from its file watcher, so a changed image is
+picked up without a stat per export. Inside a document it is drawn into a
+single form XObject on the first page and referenced from every later page.
+Paragraph styles are built once per process.
+
+Report paragraphs are cached by (text, style): the markup is parsed once,
+and the line breaks are computed once per frame width, so re-exporting a
+report after a small edit only re-measures the paragraphs that changed.
+"""
+import io
+import os
+import copy
+import struct
+import zlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from reportlab import rl_config
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfdoc import PDFError
+from reportlab.pdfbase.pdfutils import readJPEGInfo
+from reportlab.platypus import Paragraph
+from PIL import Image
+
+import instrumentation
+
+# Resolution non-JPEG watermarks are converted at. It is drawn at 10%
+# opacity behind the text, so anything finer only makes the PDF bigger.
+WATERMARK_DPI = 150
+WATERMARK_JPEG_QUALITY = 85
+WATERMARK_ALPHA = 0.1
+
+# Distinct (text, style) paragraphs kept; a 200-page report has about 900
+PARAGRAPH_CACHE_SIZE = 4096
+
+# ReportLab wraps every stream in ASCII85 by default, so PDFs survive 7-bit
+# mail gateways. Its encoder is pure Python here, and for the watermark JPEG
+# it cost more than building the rest of a short document; binary streams
+# are also a fifth smaller.
+rl_config.useA85 = 0
+
+_watermark_cache = {}
+_watermark_lock = threading.Lock()
+_paragraph_cache = OrderedDict()
+_paragraph_lock = threading.Lock()
+
+
+class Watermark:
+    """A watermark's JPEG bytes and its placement on a letter page."""
+
+    def __init__(self, path, mtime, jpeg, x, y, width, height):
+        self.path = path
+        self.mtime = mtime
+        self.jpeg = jpeg
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        # Unique per file version so a changed image never reuses a stale form
+        self.form_name = f"SGAWatermark{zlib.crc32(f'{path}:{mtime}'.encode('utf-8')):08x}"
+        self.image_key = self.form_name.encode('ascii')
+
+    def draw(self, canvas_obj):
+        """Draws the watermark, embedding it once per document as a form XObject."""
+        if not canvas_obj.hasForm(self.form_name):
+            canvas_obj.beginForm(self.form_name)
+            canvas_obj.setFillAlpha(WATERMARK_ALPHA)
+            # A fresh reader per document: ReportLab seeks the reader's file
+            # while embedding, and documents may be built on several threads
+            canvas_obj.drawImage(_JPEGReader(self.jpeg, self.image_key), self.x, self.y,
+                                 width=self.width, height=self.height)
+            canvas_obj.endForm()
+        canvas_obj.doForm(self.form_name)
+
+
+class _JPEGReader(ImageReader):
+    """An ImageReader over JPEG bytes, which ReportLab embeds as they are.
+
+    ReportLab names each image by hashing its decoded pixels, which would
+    decode the whole JPEG per document just for the name; the watermark
+    already has a unique key, so that is returned in place of the pixels.
+    """
+
+    def __init__(self, jpeg, key):
+        super().__init__(io.BytesIO(jpeg))
+        self._key = key
+
+    def getRGBData(self):
+        self._dataA = None
+        return self._key
+
+
+def _embeddable_jpeg(data):
+    """True if ReportLab can embed the JPEG ``data`` as it is. It rejects
+    some that PIL reads (12-bit, lossless, arithmetic coded), and would then
+    fall back to the pixels _JPEGReader doesn't provide."""
+    try:
+        readJPEGInfo(io.BytesIO(data))
+    except (PDFError, struct.error):
+        return False
+    return True
+
+
+def _load_watermark(path, mtime):
+    instrumentation.current().count('image_decodes')
+    with open(path, 'rb') as f:
+        data = f.read()
+    with Image.open(io.BytesIO(data)) as pil_image:
+        reencode = pil_image.format != 'JPEG' or not _embeddable_jpeg(data)
+        if reencode:
+            pil_image.load()
+        return _place_watermark(path, mtime, data, pil_image, reencode)
+
+
+def _place_watermark(path, mtime, data, pil_image, reencode):
+    page_width, page_height = letter
+    # Calculate scale to cover the entire page
+    img_width, img_height = pil_image.size
+    scale = max(page_width / img_width, page_height / img_height)
+    width = img_width * scale
+    height = img_height * scale
+    # Calculate position to center the image
+    x = (page_width - width) / 2
+    y = (page_height - height) / 2
+
+    if reencode:
+        data = _to_jpeg(pil_image, (max(1, round(width / 72 * WATERMARK_DPI)),
+                                    max(1, round(height / 72 * WATERMARK_DPI))))
+    return Watermark(path, mtime, data, x, y, width, height)
+
+
+def _to_jpeg(pil_image, target):
+    """Converts a watermark ReportLab can't embed as it is to JPEG bytes,
+    scaled down to ``target`` if larger. Transparent areas become white, which is what they show on
+    the page anyway."""
+    if pil_image.width > target[0] or pil_image.height > target[1]:
+        pil_image = pil_image.resize(target)
+    if pil_image.mode in ('RGBA', 'LA', 'P'):
+        pil_image = pil_image.convert('RGBA')
+        background = Image.new('RGB', pil_image.size, 'white')
+        background.paste(pil_image, mask=pil_image.getchannel('A'))
+        pil_image = background
+    elif pil_image.mode not in ('RGB', 'L', 'CMYK'):
+        pil_image = pil_image.convert('RGB')
+    out = io.BytesIO()
+    pil_image.save(out, 'JPEG', quality=WATERMARK_JPEG_QUALITY)
+    return out.getvalue()
+
+
+def get_watermark(path, mtime=None):
+    """Returns the cached Watermark for ``path``, reloading it when the file's
+    mtime changes. Returns None when the file does not exist; decode errors
+    propagate to the caller.
+
+    Callers that watch the file (see file_watch) pass the mtime they last saw,
+    so the cached image is used without touching the filesystem.
+    """
+    if mtime is None:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+    with _watermark_lock:
+        cached = _watermark_cache.get(path)
+        if cached is not None and cached.mtime == mtime:
+            return cached
+    watermark = _load_watermark(path, mtime)
+    with _watermark_lock:
+        _watermark_cache[path] = watermark
+    return watermark
+
+
+class _ParsedParagraph:
+    """The parse of one (text, style) pair and its line breaks by width."""
+
+    def __init__(self, paragraph, key_style):
+        # Holding the keyed style keeps its id from being reused while cached
+        self.key_style = key_style
+        self.text = paragraph.text
+        self.style = paragraph.style
+        self.frags = paragraph.frags
+        self.bullet_text = paragraph.bulletText
+        self.layouts = {}
+
+
+def _copy_lines(bl_para):
+    """Copies wrapped lines deeply enough for one document to use.
+
+    Paragraph.split() retypes and patches the words of the lines it splits,
+    so every document (and every thread) gets its own lines and words.
+    """
+    if bl_para.kind == 0:
+        lines = [(extra_space, [word if type(word) is str else copy.copy(word) for word in words])
+                 for extra_space, words in bl_para.lines]
+    else:
+        lines = []
+        for line in bl_para.lines:
+            line = line.clone()
+            line.words = [word.clone() for word in line.words]
+            lines.append(line)
+    bl_para = copy.copy(bl_para)
+    bl_para.lines = lines
+    return bl_para
+
+
+class CachedParagraph(Paragraph):
+    """A Paragraph built from a cached parse that also reuses the line breaks
+    computed at the same width. The pieces ReportLab splits off at page
+    breaks are ordinary (uncached) paragraphs of this class.
+
+    ``tag`` is free for the caller (e.g. a paragraph number) and is copied to
+    those pieces.
+    """
+
+    _parsed = None
+    tag = None
+
+    def wrap(self, availWidth, availHeight):
+        parsed = self._parsed
+        if parsed is None:
+            return super().wrap(availWidth, availHeight)
+        layout = parsed.layouts.get(availWidth)
+        if layout is None:
+            size = super().wrap(availWidth, availHeight)
+            if hasattr(self, 'blPara'):
+                parsed.layouts[availWidth] = (_copy_lines(self.blPara), self._wrapWidths, self.height)
+            return size
+        bl_para, self._wrapWidths, self.height = layout
+        self.blPara = _copy_lines(bl_para)
+        self.width = availWidth
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        parts = super().split(availWidth, availHeight)
+        for part in parts:
+            part.tag = self.tag
+        return parts
+
+
+def get_paragraph(text, style):
+    """Returns a Paragraph for ``text`` (ReportLab markup) in ``style``,
+    reusing the parse and line breaks of an identical earlier paragraph.
+
+    Styles are part of the key by identity, so pass the shared objects from
+    get_styles(). Markup errors raise ValueError, as Paragraph does.
+    """
+    key = (text, id(style))
+    trace = instrumentation.current()
+    with _paragraph_lock:
+        parsed = _paragraph_cache.get(key)
+        if parsed is not None:
+            _paragraph_cache.move_to_end(key)
+    if parsed is None:
+        trace.count('paragraph_cache_misses')
+        parsed = _ParsedParagraph(Paragraph(text, style), style)
+        with _paragraph_lock:
+            _paragraph_cache[key] = parsed
+            while len(_paragraph_cache) > PARAGRAPH_CACHE_SIZE:
+                _paragraph_cache.popitem(last=False)
+    else:
+        trace.count('paragraph_cache_hits')
+    paragraph = CachedParagraph(parsed.text, parsed.style, parsed.bullet_text, frags=parsed.frags)
+    paragraph._parsed = parsed
+    return paragraph
+
+
+def clear_caches():
+    """Drops every cached resource (used by tests and benchmarks)."""
+    with _watermark_lock:
+        _watermark_cache.clear()
+    with _paragraph_lock:
+        _paragraph_cache.clear()
+    get_styles.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    """Returns the paragraph styles shared by the PDFs: title, subtitle and
+    body, plus heading1-3, bullet1-3, table_cell and table_header for the
+    formatted parts of weekly reports.
+
+    The styles are shared across documents and must not be modified.
+    """
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'TitleStyle',
+        parent=styles['Title'],
+        fontName='Helvetica-Bold',
+        fontSize=24,
+        textColor=colors.red,
+        alignment=1,  # Center
+        spaceAfter=12
+    )
+    subtitle_style = ParagraphStyle(
+        'SubtitleStyle',
+        parent=styles['Normal'],
+        fontName='Helvetica',
+        fontSize=14,
+        textColor=colors.black,
+        alignment=1,  # Center
+        spaceAfter=24
+    )
+    body_style = ParagraphStyle(
+        'BodyStyle',
+        parent=styles['Normal'],
+        fontName='Helvetica',
+        fontSize=12,
+        textColor=colors.black,
+        leading=15,
+        alignment=0,  # Left align
+        spaceAfter=12
+    )
+    result = {'title': title_style, 'subtitle': subtitle_style, 'body': body_style}
+    for level, font_size in enumerate((18, 15, 13), start=1):
+        result[f'heading{level}'] = ParagraphStyle(
+            f'Heading{level}Style',
+            parent=body_style,
+            fontName='Helvetica-Bold',
+            fontSize=font_size,
+            leading=font_size + 4,
+            spaceBefore=6,
+            spaceAfter=6,
+            keepWithNext=1
+        )
+    for level in range(1, 4):
+        result[f'bullet{level}'] = ParagraphStyle(
+            f'Bullet{level}Style',
+            parent=body_style,
+            leftIndent=18 * level,
+            bulletIndent=18 * level - 14,
+            spaceAfter=3
+        )
+    result['table_cell'] = ParagraphStyle(
+        'TableCellStyle',
+        parent=body_style,
+        fontSize=10,
+        leading=12,
+        spaceAfter=0
+    )
+    result['table_header'] = ParagraphStyle(
+        'TableHeaderStyle',
+        parent=result['table_cell'],
+        fontName='Helvetica-Bold',
+        textColor=colors.white
+    )
+    return result
@@ -0,0 +1,260 @@
+"""Markdown-style formatting for weekly reports.
+
+Supports the subset committee reports need:
+
+* ``#``, ``##`` and ``###`` headings (deeper levels render as ``###``),
+* bullet (``-``, ``*``, ``+``) and numbered (``1.``) list items, nested by
+  indenting two spaces per level (up to three levels),
+* ``**bold**``/``__bold__`` and ``*italic*``/``_italic_``, with ``\\`` to
+  escape a literal marker,
+* pipe tables: a header row, a ``| --- | --- |`` separator, then rows,
+* everything else as paragraphs separated by blank lines, where a single
+  newline stays a line break (as plain-text reports always have).
+
+parse_blocks() reads the report once, line by line, and yields blocks whose
+text is already ReportLab paragraph markup: ``&``, ``<`` and ``>`` are
+escaped and emphasis becomes ``<b>``/``<i>`` tags that are always properly
+nested, so no input can make Paragraph fail to parse. Emphasis is matched
+with a delimiter stack in which every marker is pushed and popped at most
+once, so conversion time is linear in the report length. This module only
+uses the standard library; attendance_export turns the blocks into
+flowables.
+"""
+import re
+from collections import namedtuple
+
+# ``marker`` is the bullet text for list items; ``content`` is markup, or
+# (header cells, rows of cells) for tables
+Block = namedtuple('Block', 'kind start level marker content')
+
+MAX_HEADING_LEVEL = 3
+MAX_LIST_LEVEL = 3
+INDENT_PER_LEVEL = 2
+
+_LIST_ITEM = re.compile(r"([ \t]*)(?:([-*+])|(\d{1,9})[.)])[ \t]+(.*)$")
+_SEPARATOR_CELL = re.compile(r":?-+:?")
+
+_ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;'}
+# ReportLab's XML parser rejects C0 control characters other than tab
+_CONTROL_CHARACTERS = dict.fromkeys(c for c in range(32) if c not in (9, 10))
+# A backslash escape, or a run of emphasis markers
+_INLINE_TOKEN = re.compile(r"\\[\\*_#|\-+.()\[\]`]|\*+|_+")
+
+
+def escape(text):
+    """Escapes text for use inside ReportLab paragraph markup."""
+    text = text.translate(_CONTROL_CHARACTERS)
+    if '&' in text or '<' in text or '>' in text:
+        text = ''.join(_ESCAPES.get(c, c) for c in text)
+    return text
+
+
+class _Delimiters:
+    """A run of ``*`` or ``_`` and the tags matched against it."""
+
+    __slots__ = ('char', 'count', 'opening', 'closing')
+
+    def __init__(self, char, count):
+        self.char = char
+        self.count = count
+        self.opening = []
+        self.closing = []
+
+    def render(self):
+        # Unmatched markers stay literal, between the spans this run closes and opens
+        return ''.join(self.closing) + self.char * self.count + ''.join(reversed(self.opening))
+
+
+def inline_markup(text):
+    """Converts one line of report text to paragraph markup in a single pass."""
+    if not any(c in text for c in '*_\\&<>') and text.isprintable():
+        return text
+    parts = []
+    plain = []
+    openers = []
+    open_counts = {'*': 0, '_': 0}
+    length = len(text)
+    position = 0
+    for token in _INLINE_TOKEN.finditer(text):
+        i, end = token.span()
+        if i > position:
+            plain.append(text[position:i])
+        position = end
+        c = text[i]
+        if c == '\\':
+            plain.append(text[end - 1])
+            continue
+        before = text[i - 1] if i else ' '
+        after = text[end] if end < length else ' '
+        can_open = not after.isspace()
+        can_close = not before.isspace()
+        if c == '_':
+            # snake_case and the like are not emphasis
+            can_open = can_open and not before.isalnum()
+            can_close = can_close and not after.isalnum()
+        if plain:
+            parts.append(escape(''.join(plain)))
+            plain = []
+        run = _Delimiters(c, end - i)
+        parts.append(run)
+
+        if can_close and open_counts[c]:
+            while run.count and open_counts[c]:
+                # Openers of the other kind inside this span can't be closed any more
+                while openers[-1].char != c:
+                    discarded = openers.pop()
+                    open_counts[discarded.char] -= 1
+                opener = openers[-1]
+                used = 2 if opener.count >= 2 and run.count >= 2 else 1
+                tag = 'b' if used == 2 else 'i'
+                opener.opening.append(f"<{tag}>")
+                run.closing.append(f"</{tag}>")
+                opener.count -= used
+                run.count -= used
+                if not opener.count:
+                    openers.pop()
+                    open_counts[c] -= 1
+        if run.count and can_open:
+            openers.append(run)
+            open_counts[c] += 1
+    if position < length:
+        plain.append(text[position:])
+    if plain:
+        parts.append(escape(''.join(plain)))
+    return ''.join(part if isinstance(part, str) else part.render() for part in parts)
+
+
+def _split_cells(line):
+    """Splits a table row on unescaped pipes, dropping the outer ones."""
+    cells = []
+    cell = []
+    i = 0
+    while i < len(line):
+        c = line[i]
+        if c == '\\' and i + 1 < len(line) and line[i + 1] == '|':
+            cell.append('\\|')
+            i += 2
+            continue
+        if c == '|':
+            cells.append(''.join(cell))
+            cell = []
+        else:
+            cell.append(c)
+        i += 1
+    cells.append(''.join(cell))
+    if len(cells) > 1 and not cells[0].strip():
+        cells.pop(0)
+    if len(cells) > 1 and not cells[-1].strip():
+        cells.pop()
+    return [inline_markup(cell.strip()) for cell in cells]
+
+
+def _is_table_separator(line):
+    """True for a ``| --- | :---: |`` line."""
+    if '|' not in line:
+        return False
+    cells = line.strip().strip('|').split('|')
+    return all(_SEPARATOR_CELL.fullmatch(cell.strip()) for cell in cells)
+
+
+def _heading(stripped):
+    """Returns (level, text) for a ``## Heading ##`` line, or None."""
+    level = len(stripped) - len(stripped.lstrip('#'))
+    if not 1 <= level <= 6 or (len(stripped) > level and stripped[level] not in ' \t'):
+        return None
+    text = stripped[level:].strip()
+    # An optional closing run of #s, if set off by a space
+    unclosed = text.rstrip('#')
+    if not unclosed or unclosed[-1] in ' \t':
+        text = unclosed.rstrip()
+    return min(level, MAX_HEADING_LEVEL), text
+
+
+def _list_level(indent):
+    return min(len(indent.expandtabs(4)) // INDENT_PER_LEVEL, MAX_LIST_LEVEL - 1)
+
+
+def parse_blocks(report_text):
+    """Yields the report's blocks in order, each with the character offset of
+    the line it starts on."""
+    lines = (report_text or '').split('\n')
+    paragraph = []
+    paragraph_start = 0
+    item = None
+    table = None
+    separator = None
+    offset = 0
+
+    def flush():
+        nonlocal paragraph, item, table
+        if paragraph:
+            yield Block('paragraph', paragraph_start, 0, None, '<br/>'.join(paragraph))
+            paragraph = []
+        if item is not None:
+            start, level, marker, text = item
+            yield Block('bullet', start, level, marker, '<br/>'.join(text))
+            item = None
+        if table is not None:
+            start, header, rows = table
+            yield Block('table', start, 0, None, (header, rows))
+            table = None
+
+    for number, line in enumerate(lines):
+        start = offset
+        offset += len(line) + 1
+        if number == separator:
+            continue
+        stripped = line.strip()
+
+        if table is not None:
+            if '|' in stripped:
+                header = table[1]
+                cells = _split_cells(stripped)
+                table[2].append((cells + [''] * len(header))[:len(header)])
+                continue
+            yield from flush()
+
+        if not stripped:
+            yield from flush()
+            continue
+
+        heading = _heading(stripped) if stripped[0] == '#' else None
+        if heading:
+            yield from flush()
+            level, text = heading
+            yield Block('heading', start, level, None, inline_markup(text))
+            continue
+
+        list_item = _LIST_ITEM.match(line)
+        if list_item:
+            yield from flush()
+            indent, bullet, number_text, text = list_item.groups()
+            marker = '&bull;' if bullet else f"{number_text}."
+            item = (start, _list_level(indent), marker, [inline_markup(text.strip())])
+            continue
+
+        if '|' in stripped and number + 1 < len(lines) and _is_table_separator(lines[number + 1]):
+            yield from flush()
+            table = (start, _split_cells(stripped), [])
+            separator = number + 1
+            continue
+
+        if item is not None:
+            # Lines under a list item continue it
+            item[3].append(inline_markup(stripped))
+            continue
+        if not paragraph:
+            paragraph_start = start
+        paragraph.append(inline_markup(line.rstrip()))
+    yield from flush()
+
+
+def block_index(report_text, position):
+    """Returns the index of the block that the character at ``position`` is
+    in (or the last block before it)."""
+    index = 0
+    for i, block in enumerate(parse_blocks(report_text)):
+        if block.start > position:
+            break
+        index = i
+    return index
@@ -0,0 +1,155 @@
+"""Live preview of the weekly report page being edited.
+
+Typing restarts a short debounce timer; when it fires, the report is laid
+out on a background thread (paragraphs come from the pdf_resources cache, so
+only edited blocks are measured again) and only the page holding the
+cursor is rasterised. Moving the cursor to another page re-renders that page
+from the last layout without building the document again. The preview leaves
+out the watermark, which would add an image encode to every rebuild.
+"""
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QScrollArea
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, QBuffer, QByteArray, QIODevice, QSize, pyqtSignal
+from PyQt6.QtPdf import QPdfDocument
+
+PREVIEW_DEBOUNCE_MS = 400
+
+
+def _no_watermark(canvas_obj, doc):
+    pass
+
+
+class _PreviewSignals(QObject):
+    rendered = pyqtSignal(int, bytes, list)
+    failed = pyqtSignal(int, str)
+
+
+class _PreviewTask(QRunnable):
+    """Builds the preview PDF off the GUI thread."""
+
+    def __init__(self, generation, source, signals):
+        super().__init__()
+        self.generation = generation
+        self.source = source
+        self.signals = signals
+
+    def run(self):
+        try:
+            import attendance_export
+            report_text, date_text, committee = self.source
+            block_pages = []
+            data = attendance_export.weekly_report_pdf_bytes(report_text, date_text, committee,
+                                                             on_page=_no_watermark,
+                                                             block_pages=block_pages)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.rendered.emit(self.generation, data, block_pages)
+
+
+class ReportPreview(QWidget):
+    """Shows the page of the weekly report that the cursor is on.
+
+    Call schedule() whenever the text, date or cursor changes; the work
+    happens once the edits pause for PREVIEW_DEBOUNCE_MS.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+        self.page_label = QLabel("Preview appears as you type.")
+        layout.addWidget(self.page_label)
+        self.page_view = QLabel()
+        self.page_view.setAlignment(Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
+        self.scroll = QScrollArea()
+        self.scroll.setWidgetResizable(True)
+        self.scroll.setWidget(self.page_view)
+        layout.addWidget(self.scroll)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(PREVIEW_DEBOUNCE_MS)
+        self._timer.timeout.connect(self._refresh)
+        # One build at a time; edits made during a build are picked up after it
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _PreviewSignals(self)
+        self._signals.rendered.connect(self._on_rendered)
+        self._signals.failed.connect(self._on_failed)
+
+        self._requested = None
+        self._position = 0
+        self._building = None
+        self._generation = 0
+        self._built_source = None
+        self._block_pages = []
+        self._document = None
+        self._buffer = None
+
+    def schedule(self, report_text, date_text, committee, cursor_position):
+        """Asks for the page at ``cursor_position`` to be shown once edits pause."""
+        self._requested = (report_text, date_text, committee)
+        self._position = cursor_position
+        self._timer.start()
+
+    def wait(self):
+        """Blocks until a running build has finished (used when closing)."""
+        self._timer.stop()
+        self._pool.waitForDone()
+
+    def _refresh(self):
+        if self._requested is None:
+            return
+        if self._requested == self._built_source:
+            self._show_current_page()
+        elif self._building is None:
+            self._generation += 1
+            self._building = self._requested
+            self._pool.start(_PreviewTask(self._generation, self._requested, self._signals))
+
+    def _on_rendered(self, generation, data, block_pages):
+        if generation != self._generation:
+            return
+        self._built_source, self._building = self._building, None
+        self._block_pages = block_pages
+        # Keep the buffer alive as long as the document reads from it
+        buffer = QBuffer()
+        buffer.setData(QByteArray(data))
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        if self._document is None:
+            self._document = QPdfDocument(self)
+        self._document.load(buffer)
+        self._buffer = buffer
+        self._refresh()
+
+    def _on_failed(self, generation, error):
+        if generation != self._generation:
+            return
+        self._building = None
+        self.page_label.setText(f"Preview unavailable: {error}")
+        # The text may have been fixed while this build ran
+        if self._requested != self._built_source:
+            self._timer.start()
+
+    def _show_current_page(self):
+        import report_markdown
+        page_count = self._document.pageCount() if self._document is not None else 0
+        if page_count == 0:
+            return
+        report_text = self._requested[0]
+        index = report_markdown.block_index(report_text, self._position)
+        page = self._block_pages[index] if index < len(self._block_pages) else 1
+        page = min(max(page, 1), page_count)
+
+        point_size = self._document.pagePointSize(page - 1)
+        width = max(1, self.scroll.viewport().width() - 4)
+        height = max(1, round(width * point_size.height() / point_size.width()))
+        ratio = self.devicePixelRatioF()
+        image = self._document.render(page - 1, QSize(round(width * ratio), round(height * ratio)))
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(ratio)
+        self.page_view.setPixmap(pixmap)
+        self.page_label.setText(f"Page {page} of {page_count}")
@@ -0,0 +1,108 @@
+"""Tests for attendance_store: rosters, saved meetings, check-ins and the
+one-off members.json migration.
+
+    python -m pytest -q tests
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import attendance_store
+from attendance_store import AttendanceStore
+
+COMMITTEE = "Tech Fee Committee"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "attendance.db")
+
+
+@pytest.fixture
+def store(db_path):
+    with AttendanceStore(db_path) as store:
+        yield store
+
+
+@pytest.mark.parametrize('value, iso', [
+    ("09/20/2024", "2024-09-20"),
+    ("9/2/2024", "2024-09-02"),
+    ("2024-09-20", "2024-09-20"),
+])
+def test_to_iso_date(value, iso):
+    assert attendance_store.to_iso_date(value) == iso
+
+
+def test_duplicate_names_in_first_seen_order():
+    records = [["B"], ["A"], ["B"], ["C"], ["A"], ["B"]]
+    assert attendance_store.duplicate_names(records) == ["B", "A"]
+    assert attendance_store.duplicate_names([["A"], ["B"]]) == []
+
+
+def test_record_session_replaces_the_earlier_save(store):
+    store.record_session(COMMITTEE, "09/20/2024", [["Jane Doe", "Chair", "In-Person", "Attending"],
+                                                   ["Sam Lee", "", "Virtual", "Absent"]])
+    store.record_session(COMMITTEE, "2024-09-20", [["Sam Lee", "", "In-Person", "Attending"]])
+    assert store.session_records(COMMITTEE, "09/20/2024") == [["Sam Lee", "", "In-Person", "Attending"]]
+    assert store.session_dates(COMMITTEE) == ["2024-09-20"]
+
+
+def test_record_session_rejects_repeated_names(store):
+    saved = [["Jane Doe", "Chair", "In-Person", "Attending"]]
+    store.record_session(COMMITTEE, "09/20/2024", saved)
+    with pytest.raises(ValueError, match="Jane Doe"):
+        store.record_session(COMMITTEE, "09/20/2024", [["Jane Doe", "", "In-Person", "Absent"],
+                                                       ["Sam Lee", "", "Virtual", "Absent"],
+                                                       ["Jane Doe", "", "Virtual", "Attending"]])
+    assert store.session_records(COMMITTEE, "09/20/2024") == saved
+
+
+def test_save_roster_keeps_order_and_positions(store):
+    store.save_roster(COMMITTEE, [{'name': "Jane Doe", 'position': "Chair"}, {'name': "Sam Lee", 'position': ""}])
+    store.save_roster(COMMITTEE, [{'name': "Sam Lee", 'position': "Treasurer"}, {'name': "Ann Roe"}])
+    assert store.roster(COMMITTEE) == [{'name': "Sam Lee", 'position': "Treasurer"},
+                                       {'name': "Ann Roe", 'position': ""}]
+
+
+def test_first_check_in_lists_the_roster_as_absent(store):
+    store.save_roster(COMMITTEE, [{'name': "Jane Doe", 'position': "Chair"}, {'name': "Sam Lee", 'position': ""}])
+    store.record_check_ins([(COMMITTEE, "09/20/2024", "Sam Lee", "", "Virtual", "Attending"),
+                            (COMMITTEE, "09/20/2024", "Walk In", "Guest", "In-Person", "Attending")])
+    assert store.session_records(COMMITTEE, "09/20/2024") == [
+        ["Jane Doe", "Chair", "In-Person", "Absent"],
+        ["Sam Lee", "", "Virtual", "Attending"],
+        ["Walk In", "Guest", "In-Person", "Attending"],
+    ]
+
+
+def test_members_json_is_migrated_once(tmp_path, db_path):
+    members_path = tmp_path / "members.json"
+    members_path.write_text(json.dumps([{'name': "Jane Doe", 'position': "Chair"}]))
+    with AttendanceStore(db_path) as store:
+        assert store.import_members_json(COMMITTEE, str(members_path))
+        # A roster emptied on purpose stays empty
+        store.save_roster(COMMITTEE, [])
+    with AttendanceStore(db_path) as store:
+        assert not store.import_members_json(COMMITTEE, str(members_path))
+        assert store.roster(COMMITTEE) == []
+
+
+def test_members_json_migration_skips_existing_committees(tmp_path, store):
+    members_path = tmp_path / "members.json"
+    members_path.write_text(json.dumps([{'name': "Jane Doe", 'position': "Chair"}]))
+    store.add_committee(COMMITTEE)
+    assert not store.import_members_json(COMMITTEE, str(members_path))
+    assert store.roster(COMMITTEE) == []
+    assert not store.import_members_json(COMMITTEE, str(tmp_path / "missing.json"))
+
+
+def test_missing_members_json_is_not_recorded_as_migrated(tmp_path, store):
+    members_path = tmp_path / "members.json"
+    assert not store.import_members_json(COMMITTEE, str(members_path))
+    members_path.write_text(json.dumps([{'name': "Jane Doe", 'position': "Chair"}]))
+    assert store.import_members_json(COMMITTEE, str(members_path))
+    assert store.roster(COMMITTEE) == [{'name': "Jane Doe", 'position': "Chair"}]
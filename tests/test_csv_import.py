@@ -0,0 +1,221 @@
+"""Tests for csv_import: parsing exported attendance CSVs and importing a
+directory of them into the attendance store.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import attendance_store
+import csv_import
+from csv_import import ImportFormatError, import_directory, parse_attendance_csv
+
+COMMITTEE = "Tech Fee Committee"
+HEADER = "Member Name,Position,Virtual/In-Person,Attendance"
+
+
+def export_csv(date_text, rows, committee=COMMITTEE, padding=3):
+    """The bytes "Export to CSV" writes: title, header, rows, then blank grid rows."""
+    lines = [f"{committee} Attendance Record ({date_text})", HEADER]
+    lines += [",".join(row) for row in rows]
+    lines += [",,In-Person,Attending"] * padding
+    return ("\r\n".join(lines) + "\r\n").encode('utf-8')
+
+
+def write_export(directory, name, date_text, rows, **kwargs):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(export_csv(date_text, rows, **kwargs))
+    return path
+
+
+@pytest.fixture
+def store(tmp_path):
+    with attendance_store.AttendanceStore(str(tmp_path / "attendance.db")) as store:
+        yield store
+
+
+@pytest.fixture
+def exports(tmp_path):
+    directory = tmp_path / "exports"
+    directory.mkdir()
+    return str(directory)
+
+
+# Parsing
+
+def test_padding_rows_are_dropped():
+    data = export_csv("09/20/2024", [["Jane Doe", "Chair", "In-Person", "Attending"],
+                                     ["", "", "Virtual", "Absent"]], padding=17)
+    committee, date_text, records = parse_attendance_csv(data)
+    assert (committee, date_text) == (COMMITTEE, "09/20/2024")
+    assert records == [["Jane Doe", "Chair", "In-Person", "Attending"]]
+
+
+def test_byte_order_mark_and_short_padding_rows():
+    data = b"\xef\xbb\xbf" + export_csv("9/2/2024", [["Jane Doe", "", "In-Person", "Attending"], [""], [",,"]])
+    assert parse_attendance_csv(data) == (COMMITTEE, "9/2/2024", [["Jane Doe", "", "In-Person", "Attending"]])
+
+
+@pytest.mark.parametrize('attending_as, attendance', [
+    ("In-Person", "Attending"),
+    ("in person", "attending"),
+    ("IN-PERSON", " Attending "),
+    ("In_Person", "ATTENDING"),
+    ("inperson", "attending\t"),
+])
+def test_choices_are_normalised(attending_as, attendance):
+    data = export_csv("09/20/2024", [["Jane Doe", "Chair", attending_as, attendance],
+                                     ["Sam Lee", "", " virtual", "absent"]])
+    assert parse_attendance_csv(data)[2] == [["Jane Doe", "Chair", "In-Person", "Attending"],
+                                             ["Sam Lee", "", "Virtual", "Absent"]]
+
+
+def test_unknown_choices_reject_the_file():
+    rows = [["Jane Doe", "Chair", "In-Person", "Present"],
+            ["Sam Lee", "", "Hybrid", "Attending"],
+            ["Ann Roe", "", "", "Absent"],
+            ["Ok Person", "", "Virtual", "Absent"]]
+    with pytest.raises(ImportFormatError) as error:
+        parse_attendance_csv(export_csv("09/20/2024", rows), "bad.csv")
+    message = str(error.value)
+    assert message.startswith("bad.csv:")
+    assert "line 3 ('In-Person', 'Present')" in message
+    assert "line 4 ('Hybrid', 'Attending')" in message
+    assert "line 5 ('', 'Absent')" in message
+    assert "line 6" not in message
+
+
+@pytest.mark.parametrize('date_text', ["02/30/2024", "13/01/2024", "00/10/2024", "02/29/2023"])
+def test_invalid_title_dates_are_rejected(date_text):
+    with pytest.raises(ImportFormatError, match="not a valid date"):
+        parse_attendance_csv(export_csv(date_text, [["Jane Doe", "", "In-Person", "Attending"]]))
+
+
+def test_leap_day_is_a_valid_title_date():
+    assert parse_attendance_csv(export_csv("02/29/2024", []))[1] == "02/29/2024"
+
+
+@pytest.mark.parametrize('data', [
+    b"",
+    b"Not a title\r\n" + HEADER.encode(),
+    f"{COMMITTEE} Attendance Record (09/20/2024)\r\nName,Role\r\n".encode(),
+])
+def test_other_files_are_not_attendance_exports(data):
+    with pytest.raises(ImportFormatError):
+        parse_attendance_csv(data)
+
+
+# Importing
+
+def test_import_stores_sessions(store, exports):
+    write_export(exports, "a.csv", "09/20/2024", [["Jane Doe", "Chair", "In-Person", "Attending"],
+                                                  ["Sam Lee", "Member", "virtual", "absent"]])
+    summary = import_directory(store, exports, workers=1)
+    assert (summary['files'], summary['imported'], summary['rows']) == (1, 1, 2)
+    assert summary['errors'] == [] and summary['warnings'] == []
+    assert store.session_records(COMMITTEE, "09/20/2024") == [["Jane Doe", "Chair", "In-Person", "Attending"],
+                                                              ["Sam Lee", "Member", "Virtual", "Absent"]]
+
+
+def test_bad_files_are_skipped_without_losing_the_batch(store, exports):
+    write_export(exports, "a.csv", "09/20/2024", [["Jane Doe", "", "In-Person", "Attending"]])
+    write_export(exports, "b.csv", "02/30/2024", [["Jane Doe", "", "In-Person", "Attending"]])
+    write_export(exports, "c.csv", "09/27/2024", [["Jane Doe", "", "Hybrid", "Attending"]])
+    summary = import_directory(store, exports, workers=1)
+    assert summary['imported'] == 1
+    assert [os.path.basename(path) for path, _ in summary['errors']] == ["b.csv", "c.csv"]
+    assert store.session_dates(COMMITTEE) == ["2024-09-20"]
+
+
+def test_rerun_is_deduplicated_by_content_hash(store, exports):
+    write_export(exports, "a.csv", "09/20/2024", [["Jane Doe", "", "In-Person", "Attending"]])
+    write_export(exports, "b.csv", "09/27/2024", [["Sam Lee", "", "Virtual", "Absent"]])
+    assert import_directory(store, exports, workers=1)['imported'] == 2
+
+    # A renamed copy has the same contents
+    with open(os.path.join(exports, "a.csv"), 'rb') as f:
+        data = f.read()
+    with open(os.path.join(exports, "a (copy).csv"), 'wb') as f:
+        f.write(data)
+    summary = import_directory(store, exports, workers=1)
+    assert (summary['imported'], summary['duplicates'], summary['rows']) == (0, 3, 0)
+    assert summary['warnings'] == []
+    assert len(store.imported_hashes()) == 2
+
+
+def test_sessions_are_written_in_several_batches(store, exports):
+    for day in range(1, 8):
+        write_export(exports, f"{day:02d}.csv", f"10/{day:02d}/2024",
+                     [["Jane Doe", "", "In-Person", "Attending"], [f"Guest {day}", "", "Virtual", "Absent"]])
+    transactions = []
+    import_sessions = store.import_sessions
+
+    def counting(sessions, overwrite=False):
+        transactions.append(len(sessions))
+        return import_sessions(sessions, overwrite)
+
+    store.import_sessions = counting
+    summary = import_directory(store, exports, workers=1, batch_size=3)
+    assert transactions == [3, 3, 1]
+    assert (summary['imported'], summary['rows']) == (7, 14)
+    assert len(store.session_dates(COMMITTEE)) == 7
+    assert store.session_records(COMMITTEE, "10/07/2024")[1] == ["Guest 7", "", "Virtual", "Absent"]
+
+
+def test_repeated_names_keep_the_last_row(store, exports):
+    write_export(exports, "a.csv", "09/20/2024", [["Jane Doe", "", "In-Person", "Absent"],
+                                                  ["Sam Lee", "", "Virtual", "Attending"],
+                                                  ["Jane Doe", "Chair", "Virtual", "Attending"]])
+    summary = import_directory(store, exports, workers=1)
+    assert summary['rows'] == 2
+    assert "Jane Doe listed more than once" in summary['warnings'][0][1]
+    assert ["Jane Doe", "Chair", "Virtual", "Attending"] in store.session_records(COMMITTEE, "09/20/2024")
+
+
+def test_existing_sessions_are_not_overwritten(store, exports):
+    saved = [["Jane Doe", "Chair", "In-Person", "Attending"]]
+    store.record_session(COMMITTEE, "09/20/2024", saved)
+    path = write_export(exports, "a.csv", "09/20/2024", [["Jane Doe", "Chair", "Virtual", "Absent"]])
+
+    summary = import_directory(store, exports, workers=1)
+    assert (summary['imported'], summary['existing'], summary['rows']) == (0, 1, 0)
+    assert summary['warnings'] == [
+        (path, f"{path}: {COMMITTEE} already has attendance for 09/20/2024; "
+               f"not imported (use --overwrite to replace it)")]
+    assert store.session_records(COMMITTEE, "09/20/2024") == saved
+    # Not recorded as imported, so it is reported again rather than counted as a duplicate
+    assert import_directory(store, exports, workers=1)['existing'] == 1
+
+
+def test_edited_copy_does_not_replace_the_first_import(store, exports):
+    # Files are imported in sorted order, so the first one here wins
+    write_export(exports, "a.csv", "09/20/2024", [["Jane Doe", "", "In-Person", "Attending"]])
+    edited = write_export(exports, "a_2.csv", "09/20/2024", [["Jane Doe", "", "Virtual", "Absent"]])
+    summary = import_directory(store, exports, workers=1)
+    assert (summary['imported'], summary['existing']) == (1, 1)
+    assert [path for path, _ in summary['warnings']] == [edited]
+    assert store.session_records(COMMITTEE, "09/20/2024") == [["Jane Doe", "", "In-Person", "Attending"]]
+
+
+def test_overwrite_replaces_existing_sessions(store, exports):
+    store.record_session(COMMITTEE, "09/20/2024", [["Jane Doe", "Chair", "In-Person", "Attending"]])
+    path = write_export(exports, "a.csv", "09/20/2024", [["Sam Lee", "", "Virtual", "Absent"]])
+    summary = import_directory(store, exports, workers=1, overwrite=True)
+    assert (summary['imported'], summary['existing'], summary['rows']) == (1, 0, 1)
+    assert summary['warnings'] == [
+        (path, f"{path}: replaced the attendance already stored for {COMMITTEE} on 09/20/2024")]
+    assert store.session_records(COMMITTEE, "09/20/2024") == [["Sam Lee", "", "Virtual", "Absent"]]
+
+
+def test_main_reports_errors_in_the_exit_status(tmp_path, exports, capsys):
+    write_export(exports, "a.csv", "09/20/2024", [["Jane Doe", "", "In-Person", "Attending"]])
+    db = str(tmp_path / "cli.db")
+    assert csv_import.main([exports, "--db", db]) == 0
+    write_export(exports, "b.csv", "02/30/2024", [])
+    assert csv_import.main([exports, "--db", db]) == 1
+    assert "not a valid date" in capsys.readouterr().err
@@ -0,0 +1,208 @@
+"""Tests for report_markdown: hostile report text must still convert to
+markup that ReportLab can parse, escaped and properly nested, in time linear
+in the length of the report.
+
+    python -m pytest -q tests
+"""
+import gc
+import os
+import sys
+import time
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import attendance_export
+import pdf_resources
+import report_markdown
+from report_markdown import inline_markup, parse_blocks
+
+WIDTH = 450
+# The smaller input of a timing comparison takes at least this long
+MIN_TIMED_SECONDS = 0.005
+
+HOSTILE_LINES = [
+    "*" * 5000,
+    "_" * 5000,
+    "*a " * 2000,
+    "_a " * 2000,
+    "*_" * 2500 + "x",
+    "*_x" * 2000,
+    "**a *b" * 1000,
+    "***x** " * 1000 + "*",
+    "__a_ *b**_" * 500,
+    "<" * 5000,
+    "&" * 5000,
+    "<&>&lt;&amp;<b>not a tag</b>" * 200,
+    "\x00\x01\x08\x0b\x0c\x1b\x1f control \x7f\t tab",
+    "|",
+    "| a | b |",
+    "\\*escaped\\* \\_also\\_ \\\\ and a trailing \\",
+]
+
+
+def visible_text(markup):
+    """Parses ``markup`` as XML (so it must be escaped and nested properly)
+    and returns the text it shows."""
+    root = ElementTree.fromstring(f"<para>{markup}</para>")
+    for element in root.iter():
+        assert element.tag in ('para', 'b', 'i', 'br'), element.tag
+    return ''.join(root.itertext())
+
+
+def build_blocks(report_text):
+    """Turns every block into flowables and lays them out, as the PDF export does."""
+    styles = pdf_resources.get_styles()
+    blocks = list(parse_blocks(report_text))
+    for block in blocks:
+        for flowable in attendance_export.report_block_flowables(block, styles, WIDTH):
+            flowable.wrap(WIDTH, 10 ** 6)
+    return blocks
+
+
+def conversion_seconds(report_text, repeat=3):
+    best = float('inf')
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(parse_blocks(report_text))
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+@pytest.mark.parametrize('line', HOSTILE_LINES, ids=range(len(HOSTILE_LINES)))
+def test_hostile_line_is_well_formed(line):
+    visible_text(inline_markup(line))
+    assert build_blocks(line)
+
+
+@pytest.mark.parametrize('text, markup', [
+    ("**bold** and *italic*", "<b>bold</b> and <i>italic</i>"),
+    ("__bold__ and _italic_", "<b>bold</b> and <i>italic</i>"),
+    ("***both***", "<i><b>both</b></i>"),
+    ("*a **b** c*", "<i>a <b>b</b> c</i>"),
+    ("**a *b** c*", "<i><i>a <i>b</i></i> c</i>"),
+    ("*a _b* c_", "<i>a _b</i> c_"),
+    ("*unclosed", "*unclosed"),
+    ("**unclosed *x*", "**unclosed <i>x</i>"),
+    ("* spaced *", "* spaced *"),
+    ("snake_case_name", "snake_case_name"),
+    ("\\*literal\\*", "*literal*"),
+    ("a < b & c > d", "a &lt; b &amp; c &gt; d"),
+    ("<b>not markup</b>", "&lt;b&gt;not markup&lt;/b&gt;"),
+    ("x\x00y\x1bz\tw", "xyz\tw"),
+])
+def test_inline_markup(text, markup):
+    assert inline_markup(text) == markup
+
+
+def test_long_marker_runs_stay_literal():
+    for char in '*_':
+        run = char * 5000
+        assert inline_markup(run) == run
+        # Matching runs around a word nest 2500 bold spans deep
+        text = f"{run}x{run}"
+        assert visible_text(inline_markup(text)) == "x"
+        assert build_blocks(text)
+        text = f"{run}x"
+        assert visible_text(inline_markup(text)) == text
+
+
+def test_alternating_markers_keep_their_text():
+    text = "*_" * 500 + "x" + "_*" * 500
+    assert visible_text(inline_markup(text)).replace('*', '').replace('_', '') == 'x'
+    text = "*a _b *c _d " * 300
+    assert visible_text(inline_markup(text)) == text
+
+
+def test_escaping_keeps_every_character():
+    text = "<&>" * 2000 + " &amp; &#60; ]]>"
+    assert visible_text(inline_markup(text)) == text
+    assert report_markdown.escape(text) == inline_markup(text)
+
+
+def test_control_characters_are_dropped():
+    text = ''.join(chr(c) for c in range(32)) + "text"
+    markup = inline_markup(text)
+    # Only tab and newline are kept
+    assert visible_text(markup) == "\t\ntext"
+    assert build_blocks(text)
+
+
+def test_lone_pipes_are_paragraph_text():
+    blocks = list(parse_blocks("|\n| | |\na | b\n|||"))
+    assert [block.kind for block in blocks] == ['paragraph']
+    assert visible_text(blocks[0].content) == "|| | |a | b|||"
+
+
+def test_ragged_table_rows_are_padded_and_cut():
+    report = "\n".join([
+        "| Name | Role | Notes |",
+        "| --- | :---: | ---: |",
+        "| Jane |",
+        "| Sam | Chair | ok | extra | more |",
+        "|",
+        "no | outer | pipes",
+        "| escaped \\| pipe | *x* | <y> |",
+        "",
+        "after",
+    ])
+    blocks = build_blocks(report)
+    assert [block.kind for block in blocks] == ['table', 'paragraph']
+    header, rows = blocks[0].content
+    assert header == ['Name', 'Role', 'Notes']
+    assert rows == [
+        ['Jane', '', ''],
+        ['Sam', 'Chair', 'ok'],
+        ['', '', ''],
+        ['no', 'outer', 'pipes'],
+        ['escaped | pipe', '<i>x</i>', '&lt;y&gt;'],
+    ]
+    assert blocks[1].content == 'after'
+
+
+def test_every_block_of_a_hostile_report_builds():
+    report = "\n\n".join([
+        "# Heading with *unclosed and <tags> & stuff",
+        "####### too deep *_*_",
+        "- item **bold\n  continued _under_ it\n    - nested *x*\n      - deeper\n        - deepest",
+        "1. numbered <&>\n2) second \x01",
+        "| a | b |\n| --- | --- |\n| *x | y_ |\n| only one |",
+    ] + HOSTILE_LINES)
+    blocks = build_blocks(report)
+    assert {block.kind for block in blocks} == {'heading', 'bullet', 'paragraph', 'table'}
+    for block in blocks:
+        if block.kind == 'table':
+            header, rows = block.content
+            for cell in header + [cell for row in rows for cell in row]:
+                visible_text(cell)
+        else:
+            visible_text(block.content)
+    pdf = attendance_export.weekly_report_pdf_bytes(report, "2026-10-17", on_page=lambda canvas, doc: None)
+    assert pdf.startswith(b'%PDF')
+
+
+@pytest.mark.parametrize('prefix, unit', [
+    ("", "*a "),
+    ("", "_a "),
+    ("", "*_"),
+    ("", "**a *b "),
+    ("", "<&"),
+    ("", "|x"),
+    ("| a | b |\n| --- | --- |\n", "| a | b |\n"),
+    ("", "- *item\n"),
+], ids=['unclosed-star', 'unclosed-underscore', 'alternating', 'mixed', 'escapes', 'pipes', 'rows', 'items'])
+def test_conversion_time_is_linear(prefix, unit):
+    # Grow the input until timer and scheduler noise are small next to it
+    count = 1000
+    small_seconds = conversion_seconds(prefix + unit * count)
+    while small_seconds < MIN_TIMED_SECONDS and count < 2 ** 20:
+        count *= 2
+        small_seconds = conversion_seconds(prefix + unit * count)
+    # 8x the input; a quadratic pass would take about 64x as long
+    assert conversion_seconds(prefix + unit * count * 8) < small_seconds * 8 * 3